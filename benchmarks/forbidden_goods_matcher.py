@@ -0,0 +1,113 @@
+"""
+Benchmarks forbidden goods detection: the substring loop es_mercancia_valida
+used before find_forbidden_goods, over its original keyword list, and a
+substring loop that finds every current keyword, against the compiled
+FORBIDDEN_GOODS_PATTERN scan of find_forbidden_goods.
+
+Usage:
+    python -m benchmarks.forbidden_goods_matcher [--iterations 2000] [--repeats 5]
+"""
+import argparse
+import time
+
+from src.shared.utils.validations import (
+    FORBIDDEN_GOODS_KEYWORDS,
+    _normalize_text,
+    find_forbidden_goods,
+)
+
+SAMPLES = [
+    "muebles de oficina",
+    "repuestos para maquinaria agrícola",
+    "30 toneladas de cemento",
+    "llaves y herramientas",
+    "artículos de decoración y decoro",
+    "cajas con ropa y calzado",
+    "electrodomésticos",
+    "ganado en pie",
+    "oro y plata",
+    "gasolina",
+    "quiero enviar unos cerdos de Medellín a Santa Rosa de Osos",
+    "necesito distribución de última milla en Bogotá",
+    "bobinas de papel",
+    "materiales de construcción, varillas y ladrillos",
+]
+
+
+# The keywords es_mercancia_valida checked before find_forbidden_goods.
+BASELINE_KEYWORDS = [
+    "ultima milla", "desechos peligrosos", "residuos industriales",
+    "sustancias toxicas", "sustancias infecciosas", "radiactivas", "explosivos",
+    "polvora", "material pirotecnico", "fosforos", "liquidos inflamables",
+    "combustibles", "gasolina", "etanol", "semovientes", "animales vivos",
+    "animales muertos", "animal", "cerdos", "ganado", "reses", "aves", "carnes",
+    "despojos comestibles", "productos de origen animal", "objetos de arte",
+    "colecciones", "antiguedades", "perlas", "piedras preciosas", "metales preciosos",
+    "oro", "plata", "diamantes", "legumbres", "hortalizas", "plantas", "raices",
+    "tuberculos alimenticios", "pescados", "crustaceos", "moluscos",
+    "invertebrados acuaticos", "armas", "municiones", "aceites crudos de petroleo",
+    "minerales bituminosos", "alquitranes", "betunes", "asfaltos", "rocas asfalticas",
+    "vaselina", "parafina", "ceras minerales", "navegacion aerea",
+    "navegacion espacial", "navegacion maritima", "navegacion fluvial",
+    "energia electrica", "gas de hulla",
+]
+
+
+def baseline_match(text: str) -> bool:
+    """The previous matcher: stops at the first keyword found as a substring."""
+    normalized = _normalize_text(text)
+    if "ultima milla" in normalized:
+        return True
+    for keyword in BASELINE_KEYWORDS:
+        if keyword in normalized:
+            return True
+    return False
+
+
+def substring_match_all(text: str) -> list[str]:
+    """A substring loop over the current keywords, finding every match."""
+    normalized = _normalize_text(text)
+    return [keyword for keyword in FORBIDDEN_GOODS_KEYWORDS if keyword in normalized]
+
+
+def compiled_match(text: str) -> bool:
+    return bool(find_forbidden_goods(text))
+
+
+def run(name: str, match, iterations: int, repeats: int) -> float:
+    """Reports the best of `repeats` runs, which is the least noisy figure."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for sample in SAMPLES:
+                match(sample)
+        timings.append((time.perf_counter() - start) / (iterations * len(SAMPLES)))
+    per_call = min(timings)
+    print(f"{name:<12} {per_call * 1e6:7.2f} us/call")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{len(BASELINE_KEYWORDS)} baseline keywords, "
+        f"{len(FORBIDDEN_GOODS_KEYWORDS)} current keywords, {len(SAMPLES)} samples"
+    )
+    for sample in SAMPLES:
+        baseline, compiled = baseline_match(sample), compiled_match(sample)
+        if baseline != compiled:
+            print(f"  differs: {sample!r} baseline={baseline} compiled={compiled}")
+    baseline_time = run("baseline", baseline_match, args.iterations, args.repeats)
+    substring_time = run("substring", substring_match_all, args.iterations, args.repeats)
+    compiled_time = run("compiled", compiled_match, args.iterations, args.repeats)
+    print(f"compiled vs baseline: {baseline_time / compiled_time:.2f}x")
+    print(f"compiled vs substring: {substring_time / compiled_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
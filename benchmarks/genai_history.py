@@ -0,0 +1,79 @@
+"""
+Benchmarks get_genai_history against history length, with the conversion
+cache cold (every message converted, as before the cache) and warm (only
+the newest message converted, as on a real turn).
+
+Usage:
+    python -m benchmarks.genai_history [--lengths 10 50 100 200] [--calls-per-turn 3]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from src.shared.enums import InteractionType
+from src.shared.schemas import InteractionMessage
+from src.shared.utils import history
+from src.shared.utils.history import get_genai_history
+
+
+def build_message(i: int) -> InteractionMessage:
+    if i % 4 == 1:
+        parts = [
+            {"function_call": {"name": "buscar_nit", "args": {"nit": f"{900000000 + i}"}}},
+        ]
+        return InteractionMessage(role=InteractionType.MODEL, message=json.dumps(parts))
+    if i % 4 == 2:
+        parts = [
+            {
+                "function_response": {
+                    "name": "buscar_nit",
+                    "response": {"result": {"cliente": "Cliente S.A.S.", "estado": "ACTIVO"}},
+                }
+            }
+        ]
+        return InteractionMessage(role=InteractionType.TOOL, message=json.dumps(parts))
+    if i % 4 == 3:
+        return InteractionMessage(
+            role=InteractionType.MODEL,
+            message="Gracias. ¿Cuál es el origen, el destino y el tipo de mercancía?",
+        )
+    return InteractionMessage(
+        role=InteractionType.USER,
+        message=f"Necesito cotizar un envío de 20 toneladas de Bogotá a Cali ({i})",
+    )
+
+
+async def time_turn(messages: list[InteractionMessage], calls: int, cold: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        if cold:
+            history._content_cache.clear()
+        await get_genai_history(messages)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--calls-per-turn", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'messages':>8} {'cold ms/turn':>14} {'warm ms/turn':>14}")
+    for length in args.lengths:
+        messages = [build_message(i) for i in range(length)]
+        cold = warm = 0.0
+        for _ in range(args.repeat):
+            cold += await time_turn(messages, args.calls_per_turn, cold=True)
+            # Warm: the history up to the previous turn is already cached.
+            history._content_cache.clear()
+            await get_genai_history(messages[:-1])
+            warm += await time_turn(messages, args.calls_per_turn, cold=False)
+        print(
+            f"{length:>8} {cold / args.repeat * 1000:>14.3f} {warm / args.repeat * 1000:>14.3f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,159 @@
+"""
+Benchmarks webhook parsing on a mixed Evolution API event stream.
+
+Compares the previous handler behaviour (pretty-printed debug log and full
+validation of every event) with the pre-filter in
+src/api/webhook/prefilter.py.
+
+Usage:
+    python -m benchmarks.webhook_prefilter [--requests 20000] [--debug]
+"""
+import argparse
+import json
+import logging
+import random
+import time
+
+from src.api.webhook import prefilter
+from src.api.webhook.prefilter import parse_webhook_events
+from src.api.webhook.schemas import WebhookEvent
+
+# Approximate mix observed from Evolution: most events are delivery status
+# updates, presence and echoes of our own messages.
+EVENT_MIX = [
+    ("user_text", 0.20),
+    ("user_list_response", 0.05),
+    ("user_audio", 0.03),
+    ("from_me", 0.22),
+    ("messages_update", 0.35),
+    ("presence_update", 0.10),
+    ("contacts_update", 0.05),
+]
+
+
+def _key(from_me: bool, i: int) -> dict:
+    return {"remoteJid": f"57300{i % 5000:07d}@s.whatsapp.net", "fromMe": from_me, "id": f"3EB0{i:016X}"}
+
+
+def build_event(kind: str, i: int) -> dict:
+    if kind == "user_text":
+        return {
+            "event": "messages.upsert",
+            "instance": "bot",
+            "data": {
+                "key": _key(False, i),
+                "pushName": "Cliente",
+                "message": {
+                    "conversation": "Hola, necesito cotizar un envío de Bogotá a Medellín",
+                    "messageContextInfo": {"deviceListMetadata": {"senderKeyHash": "abc"}},
+                },
+                "messageType": "conversation",
+                "messageTimestamp": 1720000000 + i,
+                "source": "android",
+            },
+            "date_time": "2025-07-24T10:00:00.000Z",
+        }
+    if kind == "user_list_response":
+        event = build_event("user_text", i)
+        event["data"]["message"] = {"listResponseMessage": {"title": "Cliente activo"}}
+        return event
+    if kind == "user_audio":
+        event = build_event("user_text", i)
+        event["data"]["message"] = {"audioMessage": {"seconds": 4, "ptt": True}}
+        return event
+    if kind == "from_me":
+        event = build_event("user_text", i)
+        event["data"]["key"] = _key(True, i)
+        return event
+    if kind == "messages_update":
+        return {
+            "event": "messages.update",
+            "instance": "bot",
+            "data": {
+                "keyId": f"3EB0{i:016X}",
+                "remoteJid": f"57300{i % 5000:07d}@s.whatsapp.net",
+                "fromMe": True,
+                "status": "DELIVERY_ACK",
+            },
+        }
+    if kind == "presence_update":
+        return {
+            "event": "presence.update",
+            "instance": "bot",
+            "data": {"id": f"57300{i % 5000:07d}@s.whatsapp.net", "presences": {}},
+        }
+    return {
+        "event": "contacts.update",
+        "instance": "bot",
+        "data": [{"remoteJid": f"57300{i % 5000:07d}@s.whatsapp.net", "pushName": "Cliente"}],
+    }
+
+
+def build_bodies(count: int, seed: int = 7) -> list[bytes]:
+    rng = random.Random(seed)
+    kinds, weights = zip(*EVENT_MIX)
+    return [
+        json.dumps(build_event(rng.choices(kinds, weights)[0], i)).encode()
+        for i in range(count)
+    ]
+
+
+def legacy_parse(body: bytes, debug: bool) -> list[WebhookEvent]:
+    """The handler's parsing before the pre-filter was introduced."""
+    payload_json = json.loads(body)
+    if debug:
+        logging.getLogger("legacy").debug(f"Webhook payload: {json.dumps(payload_json, indent=2)}")
+    events = payload_json if isinstance(payload_json, list) else [payload_json]
+    validated = []
+    for raw_event in events:
+        try:
+            event = WebhookEvent.model_validate(raw_event)
+        except Exception:
+            continue
+        if event.event == "messages.upsert" and not event.data.key.fromMe:
+            validated.append(event)
+    return validated
+
+
+def prefiltered_parse(body: bytes, debug: bool) -> list[WebhookEvent]:
+    return parse_webhook_events(body)
+
+
+def run(name: str, parse, bodies: list[bytes], debug: bool) -> int:
+    kept = 0
+    start = time.perf_counter()
+    for body in bodies:
+        kept += len(parse(body, debug))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<12} {elapsed * 1000:9.1f} ms total  "
+        f"{elapsed / len(bodies) * 1e6:7.2f} us/request  kept={kept}"
+    )
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable DEBUG logging (to a null handler) to include log formatting cost.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        handlers=[logging.NullHandler()],
+    )
+    bodies = build_bodies(args.requests)
+    print(
+        f"{len(bodies)} requests, orjson={'yes' if prefilter.orjson else 'no'}, "
+        f"debug={args.debug}"
+    )
+    run("legacy", legacy_parse, bodies, args.debug)
+    run("prefilter", prefiltered_parse, bodies, args.debug)
+
+
+if __name__ == "__main__":
+    main()
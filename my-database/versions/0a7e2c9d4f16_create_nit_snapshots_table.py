@@ -0,0 +1,35 @@
+"""create nit_snapshots table
+
+Revision ID: 0a7e2c9d4f16
+Revises: f5c1d7e3a9b4
+Create Date: 2025-07-30 11:26:53.084417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7e2c9d4f16'
+down_revision: Union[str, None] = 'f5c1d7e3a9b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('nit_snapshots',
+    sa.Column('spreadsheet_id', sa.String(), nullable=False),
+    sa.Column('revision', sa.String(), nullable=True),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('synced_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('spreadsheet_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('nit_snapshots')
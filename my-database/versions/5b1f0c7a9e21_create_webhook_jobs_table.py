@@ -0,0 +1,43 @@
+"""create webhook_jobs table
+
+Revision ID: 5b1f0c7a9e21
+Revises: d20984f1e050
+Create Date: 2025-07-21 10:12:44.318502
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1f0c7a9e21'
+down_revision: Union[str, None] = 'd20984f1e050'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('webhook_jobs',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('session_id', sa.String(), nullable=True),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_jobs_session_id'), 'webhook_jobs', ['session_id'], unique=False)
+    op.create_index('ix_webhook_jobs_status_available_at', 'webhook_jobs', ['status', 'available_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_webhook_jobs_status_available_at', table_name='webhook_jobs')
+    op.drop_index(op.f('ix_webhook_jobs_session_id'), table_name='webhook_jobs')
+    op.drop_table('webhook_jobs')
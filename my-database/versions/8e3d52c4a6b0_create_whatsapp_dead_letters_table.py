@@ -0,0 +1,40 @@
+"""create whatsapp_dead_letters table
+
+Revision ID: 8e3d52c4a6b0
+Revises: 5b1f0c7a9e21
+Create Date: 2025-07-23 16:40:02.551870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3d52c4a6b0'
+down_revision: Union[str, None] = '5b1f0c7a9e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('whatsapp_dead_letters',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('phone_number', sa.String(), nullable=False),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_whatsapp_dead_letters_phone_number'), 'whatsapp_dead_letters', ['phone_number'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_whatsapp_dead_letters_phone_number'), table_name='whatsapp_dead_letters')
+    op.drop_table('whatsapp_dead_letters')
@@ -0,0 +1,34 @@
+"""create processed_webhook_messages table
+
+Revision ID: a3c9e1f47d25
+Revises: 8e3d52c4a6b0
+Create Date: 2025-07-24 10:12:45.203114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f47d25'
+down_revision: Union[str, None] = '8e3d52c4a6b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('processed_webhook_messages',
+    sa.Column('message_id', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('message_id')
+    )
+    op.create_index(op.f('ix_processed_webhook_messages_created_at'), 'processed_webhook_messages', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_processed_webhook_messages_created_at'), table_name='processed_webhook_messages')
+    op.drop_table('processed_webhook_messages')
@@ -0,0 +1,33 @@
+"""create classification_cache table
+
+Revision ID: c71d4b0e9f38
+Revises: a3c9e1f47d25
+Create Date: 2025-07-25 09:31:18.774402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71d4b0e9f38'
+down_revision: Union[str, None] = 'a3c9e1f47d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('classification_cache',
+    sa.Column('fingerprint', sa.String(), nullable=False),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('fingerprint')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('classification_cache')
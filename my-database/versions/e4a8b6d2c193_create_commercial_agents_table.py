@@ -0,0 +1,37 @@
+"""create commercial_agents table
+
+Revision ID: e4a8b6d2c193
+Revises: c71d4b0e9f38
+Create Date: 2025-07-25 15:12:44.208317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a8b6d2c193'
+down_revision: Union[str, None] = 'c71d4b0e9f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('commercial_agents',
+    sa.Column('fingerprint', sa.String(), nullable=False),
+    sa.Column('responsable_comercial', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('telefono', sa.String(), nullable=False),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('fingerprint')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('commercial_agents')
@@ -3,7 +3,7 @@ from typing import Optional, Tuple
 from datetime import datetime
 
 import google.genai as genai
-from google.genai import types, errors
+from google.genai import errors
 
 from .prompts import (
     CANDIDATO_A_EMPLEO_SYSTEM_PROMPT,
@@ -18,9 +18,12 @@ from src.shared.schemas import InteractionMessage
 from src.shared.tools import obtener_ayuda_humana
 from src.shared.utils.history import get_genai_history
 from src.services.google_sheets import GoogleSheetsService
+from src.services.sheet_exports import sheet_exporter
+from src.shared.utils.tool_registry import get_generate_config
 from src.shared.utils.functions import (
     get_response_text,
     invoke_model_with_retries,
+    labels_model_calls,
 )
 
 logger = logging.getLogger(__name__)
@@ -33,6 +36,10 @@ async def _write_candidato_a_empleo_to_sheet(
         logger.info("Data for job candidate has already been written to Google Sheet. Skipping.")
         return
 
+    if sheet_exporter.is_queued(interaction_data):
+        logger.info("Data for job candidate is already queued for Google Sheet. Skipping.")
+        return
+
     if not settings.GOOGLE_SHEET_ID_EXPORT or not sheets_service:
         logger.warning(
             "Spreadsheet ID for export not configured or sheets service not available. Skipping write."
@@ -40,14 +47,6 @@ async def _write_candidato_a_empleo_to_sheet(
         return
 
     try:
-        worksheet = sheets_service.get_worksheet(
-            spreadsheet_id=settings.GOOGLE_SHEET_ID_EXPORT,
-            worksheet_name="ASPIRANTES_EMPLEO",
-        )
-        if not worksheet:
-            logger.error("Could not find ASPIRANTES_EMPLEO worksheet.")
-            return
-
         fecha_perfilacion = datetime.now().strftime("%d/%m/%Y")
         nombre = interaction_data.get("nombre", "")
         cedula = interaction_data.get("cedula", "")
@@ -60,14 +59,19 @@ async def _write_candidato_a_empleo_to_sheet(
             vacante,
         ]
 
-        sheets_service.append_row(worksheet, row_to_append)
-        interaction_data["sheet_row_added"] = True
-        logger.info("Successfully wrote data for job candidate to Google Sheet and marked as added.")
+        sheet_exporter.enqueue(
+            interaction_data,
+            settings.GOOGLE_SHEET_ID_EXPORT,
+            "ASPIRANTES_EMPLEO",
+            row_to_append,
+        )
+        logger.info("Queued data for job candidate for Google Sheet.")
 
     except Exception as e:
-        logger.error(f"Failed to write to Google Sheet: {e}", exc_info=True)
+        logger.error(f"Failed to queue Google Sheet row: {e}", exc_info=True)
 
 
+@labels_model_calls
 async def handle_in_progress_candidato_a_empleo(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -84,12 +88,7 @@ async def handle_in_progress_candidato_a_empleo(
         obtener_ayuda_humana,
     ]
 
-    config = types.GenerateContentConfig(
-        tools=tools,
-        system_instruction=CANDIDATO_A_EMPLEO_SYSTEM_PROMPT,
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
-    )
+    config = get_generate_config(CANDIDATO_A_EMPLEO_SYSTEM_PROMPT, tools=tools)
 
     try:
         response = await invoke_model_with_retries(
@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 import google.genai as genai
@@ -24,17 +24,47 @@ from src.api.candidato_a_empleo.state import CandidatoAEmpleoState
 from src.api.transportista.state import TransportistaState
 from src.database import models
 from src.services.google_sheets import GoogleSheetsService
+from src.services.sheet_exports import sheet_exporter
 from src.shared.constants import (
     CLASSIFICATION_THRESHOLD,
     TIPO_DE_INTERACCION_MESSAGES_UNTIL_HUMAN,
 )
 from src.shared.state import GlobalState
 from src.shared.tools import obtener_ayuda_humana
+from src.shared.messages import (
+    SPECIAL_LIST_FIRST_OPTION,
+    SPECIAL_LIST_SECOND_OPTION,
+    SPECIAL_LIST_THIRD_OPTION,
+    SPECIAL_LIST_FOURTH_OPTION,
+    SPECIAL_LIST_FIFTH_OPTION,
+    SPECIAL_LIST_SIXTH_OPTION,
+)
+from src.shared.utils.validations import _normalize_text
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+# Options of the special list message. Selecting one states the intent, so
+# these replies are classified without calling the model.
+SPECIAL_LIST_OPTION_CATEGORIES = {
+    _normalize_text(SPECIAL_LIST_FIRST_OPTION): CategoriaClasificacion.CLIENTE_POTENCIAL,
+    _normalize_text(SPECIAL_LIST_SECOND_OPTION): CategoriaClasificacion.CLIENTE_ACTIVO,
+    _normalize_text(SPECIAL_LIST_THIRD_OPTION): CategoriaClasificacion.CANDIDATO_A_EMPLEO,
+    _normalize_text(SPECIAL_LIST_FOURTH_OPTION): CategoriaClasificacion.USUARIO_ADMINISTRATIVO,
+    _normalize_text(SPECIAL_LIST_FIFTH_OPTION): CategoriaClasificacion.PROVEEDOR_POTENCIAL,
+    _normalize_text(SPECIAL_LIST_SIXTH_OPTION): CategoriaClasificacion.TRANSPORTISTA_TERCERO,
+}
+
+
+def _preclassify_message(message: str) -> Optional[CategoriaClasificacion]:
+    """
+    Classifies a message with deterministic rules. Returns None when the
+    message is not an exact special list selection.
+    """
+    return SPECIAL_LIST_OPTION_CATEGORIES.get(_normalize_text(message))
+
+
 async def _chat_router_logic(
     interaction_request: InteractionRequest,
     client: genai.Client,
@@ -135,6 +165,21 @@ async def _chat_router_logic(
             classifiedAs=CategoriaClasificacion.OTRO,
         )
 
+    preclassified_as = _preclassify_message(interaction_request.message.message)
+    if preclassified_as:
+        logger.debug(
+            f"Session {session_id} selected a special list option. Classified as '{preclassified_as.value}' without calling the model."
+        )
+        return await _save_classification_and_route(
+            classified_as=preclassified_as,
+            interaction=interaction,
+            interaction_request=interaction_request,
+            client=client,
+            sheets_service=sheets_service,
+            db=db,
+            history_messages=history_messages,
+        )
+
     try:
         logger.debug(
             f"Session {session_id} not classified. Calling 'handle_tipo_de_interaccion'."
@@ -262,24 +307,9 @@ async def _chat_router_logic(
             logger.debug(
                 f"Routing session {session_id} to handler for '{classified_as.value}' because classification was successful and no immediate message was generated."
             )
-            if not interaction:
-                interaction = models.Interaction(
-                    session_id=session_id,
-                    messages=[msg.model_dump(mode="json") for msg in history_messages],
-                    user_data=interaction_request.userData,
-                )
-                db.add(interaction)
-            elif interaction_request.userData:
-                interaction.user_data = interaction_request.userData
-
-            if interaction.interaction_data is None:
-                interaction.interaction_data = {}
-            interaction.interaction_data["classifiedAs"] = classified_as.value
-            flag_modified(interaction, "interaction_data")
-            await db.commit()
-
-            return await _route_to_specific_handler(
+            return await _save_classification_and_route(
                 classified_as=classified_as,
+                interaction=interaction,
                 interaction_request=interaction_request,
                 client=client,
                 sheets_service=sheets_service,
@@ -360,6 +390,42 @@ async def chat_router(
     return await _chat_router_logic(interaction_request, client, sheets_service, db)
 
 
+async def _save_classification_and_route(
+    classified_as: CategoriaClasificacion,
+    interaction: Optional[models.Interaction],
+    interaction_request: InteractionRequest,
+    client: genai.Client,
+    sheets_service: GoogleSheetsService,
+    db: AsyncSession,
+    history_messages: List[InteractionMessage],
+) -> InteractionResponse:
+    """Stores the classification of a session and routes it to its specific handler."""
+    if not interaction:
+        interaction = models.Interaction(
+            session_id=interaction_request.sessionId,
+            messages=[msg.model_dump(mode="json") for msg in history_messages],
+            user_data=interaction_request.userData,
+        )
+        db.add(interaction)
+    elif interaction_request.userData:
+        interaction.user_data = interaction_request.userData
+
+    if interaction.interaction_data is None:
+        interaction.interaction_data = {}
+    interaction.interaction_data["classifiedAs"] = classified_as.value
+    flag_modified(interaction, "interaction_data")
+    await db.commit()
+
+    return await _route_to_specific_handler(
+        classified_as=classified_as,
+        interaction_request=interaction_request,
+        client=client,
+        sheets_service=sheets_service,
+        db=db,
+        history_messages=history_messages,
+    )
+
+
 async def _route_to_specific_handler(
     classified_as: CategoriaClasificacion,
     interaction_request: InteractionRequest,
@@ -537,6 +603,8 @@ async def _route_to_specific_handler(
             )
             db.add(interaction)
 
+        # Rows queued for the export sheets are saved with the turn.
+        await sheet_exporter.save_pending(db, interaction)
         await db.commit()
 
         return InteractionResponse(
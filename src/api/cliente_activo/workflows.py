@@ -3,7 +3,7 @@ from typing import Optional, Tuple
 from datetime import datetime
 
 import google.genai as genai
-from google.genai import types, errors
+from google.genai import errors
 
 from .prompts import (
     CLIENTE_ACTIVO_AWAITING_NIT_SYSTEM_PROMPT,
@@ -21,7 +21,6 @@ from .tools import (
     es_consulta_bloqueos_cartera,
     es_consulta_facturacion,
     es_consulta_cotizacion,
-    limpiar_datos_agente_comercial,
     obtener_informacion_cliente_activo,
 )
 from src.config import settings
@@ -30,12 +29,17 @@ from src.shared.enums import InteractionType, CategoriaClienteActivo
 from src.shared.schemas import InteractionMessage
 from src.shared.tools import obtener_ayuda_humana
 from src.shared.utils.history import get_genai_history
+from src.services.commercial_agents import commercial_agent_directory
 from src.services.google_sheets import GoogleSheetsService
+from src.services.sheet_exports import sheet_exporter
+from src.services.nit_index import nit_index
+from src.shared.utils.tool_registry import get_generate_config
 from src.shared.utils.functions import (
     get_response_text,
     invoke_model_with_retries,
     execute_tool_calls_and_get_response,
     get_final_text_response,
+    labels_model_calls,
 )
 
 logger = logging.getLogger(__name__)
@@ -48,6 +52,10 @@ async def _write_cliente_activo_to_sheet(
         logger.info("Data for active client has already been written to Google Sheet. Skipping.")
         return
 
+    if sheet_exporter.is_queued(interaction_data):
+        logger.info("Data for active client is already queued for Google Sheet. Skipping.")
+        return
+
     if not settings.GOOGLE_SHEET_ID_EXPORT or not sheets_service:
         logger.warning(
             "Spreadsheet ID for export not configured or sheets service not available. Skipping write."
@@ -55,14 +63,6 @@ async def _write_cliente_activo_to_sheet(
         return
 
     try:
-        worksheet = sheets_service.get_worksheet(
-            spreadsheet_id=settings.GOOGLE_SHEET_ID_EXPORT,
-            worksheet_name="CLIENTES_ACTUALES",
-        )
-        if not worksheet:
-            logger.error("Could not find CLIENTES_ACTUALES worksheet.")
-            return
-
         fecha_perfilacion = datetime.now().strftime("%d/%m/%Y")
         nit = interaction_data.get("nit", "")
         nombre_empresa = interaction_data.get("nombre_empresa", "")
@@ -77,71 +77,19 @@ async def _write_cliente_activo_to_sheet(
             descripcion_de_necesidad,
         ]
 
-        sheets_service.append_row(worksheet, row_to_append)
-        interaction_data["sheet_row_added"] = True
-        logger.info("Successfully wrote data for active client to Google Sheet and marked as added.")
-
-    except Exception as e:
-        logger.error(f"Failed to write to Google Sheet: {e}", exc_info=True)
-
-
-async def _clean_commercial_agent_data(
-    search_result: dict, client: genai.Client
-) -> dict:
-    """
-    Cleans commercial agent data using the model to determine if it's valid.
-
-    Returns:
-        dict with cleaned data or indication that no valid agent was found
-    """
-    responsable_comercial = search_result.get("responsable_comercial", "")
-    email = search_result.get("email", "")
-    telefono = search_result.get("phoneNumber", "")
-
-    if not responsable_comercial:
-        return {"agente_valido": False, "razon": "No se encontró responsable comercial"}
-
-    # Create a simple prompt for the data cleaning
-    cleaning_prompt = f"""
-    Analiza los siguientes datos de un agente comercial obtenidos de Google Sheets y determina si representan un agente válido:
-    
-    Responsable comercial: "{responsable_comercial}"
-    Email: "{email}"
-    Teléfono: "{telefono}"
-    
-    Usa la herramienta limpiar_datos_agente_comercial para procesar estos datos.
-    """
-
-    tools = [limpiar_datos_agente_comercial]
-
-    config = types.GenerateContentConfig(
-        tools=tools,
-        system_instruction="Eres un experto en limpieza de datos. Analiza los datos del agente comercial y determina si son válidos.",
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
-    )
-
-    try:
-        response = await invoke_model_with_retries(
-            client.aio.models.generate_content,
-            model=GEMINI_MODEL,
-            contents=[{"role": "user", "parts": [{"text": cleaning_prompt}]}],
-            config=config,
+        sheet_exporter.enqueue(
+            interaction_data,
+            settings.GOOGLE_SHEET_ID_EXPORT,
+            "CLIENTES_ACTUALES",
+            row_to_append,
         )
-
-        if response.function_calls:
-            function_call = response.function_calls[0]
-            if function_call.name == "limpiar_datos_agente_comercial":
-                return dict(function_call.args)
-
-        # Fallback if no function call
-        return {"agente_valido": False, "razon": "No se pudo procesar los datos del agente"}
+        logger.info("Queued data for active client for Google Sheet.")
 
     except Exception as e:
-        logger.error(f"Error cleaning commercial agent data: {e}")
-        return {"agente_valido": False, "razon": "Error al procesar los datos del agente"}
+        logger.error(f"Failed to queue Google Sheet row: {e}", exc_info=True)
 
 
+@labels_model_calls
 async def _workflow_awaiting_nit_cliente_activo(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -149,68 +97,6 @@ async def _workflow_awaiting_nit_cliente_activo(
     interaction_data: dict,
 ) -> Tuple[list[InteractionMessage], ClienteActivoState, Optional[str], dict]:
     """Handles the workflow when the assistant is waiting for the user's NIT."""
-
-    def buscar_nit(nit: str):
-        """Captura el NIT de la empresa proporcionado por el usuario y busca en Google Sheets."""
-        search_result = {}
-        if settings.GOOGLE_SHEET_ID_CLIENTES_POTENCIALES and sheets_service:
-            worksheet = sheets_service.get_worksheet(
-                spreadsheet_id=settings.GOOGLE_SHEET_ID_CLIENTES_POTENCIALES,
-                worksheet_name="NITS",
-            )
-            if worksheet:
-                records = sheets_service.read_data(worksheet)
-                found_record = None
-                for record in records:
-                    if str(record.get("NIT - 10 DIGITOS")) == nit or str(
-                        record.get("NIT - 9 DIGITOS")
-                    ) == nit:
-                        found_record = record
-                        break
-
-                if found_record:
-                    logger.info(
-                        f"Columns found in sheet for NIT {nit}: {list(found_record.keys())}"
-                    )
-                    logger.info(f"Found NIT {nit} in Google Sheet: {found_record}")
-                    search_result = {
-                        "cliente": found_record.get(" CLIENTE"),
-                        "estado": found_record.get(" ESTADO DEL CLIENTE"),
-                        "responsable_comercial": found_record.get(
-                            " RESPONSABLE COMERCIAL"
-                        ),
-                        "phoneNumber": found_record.get(" CELULAR"),
-                        "email": found_record.get(" CORREO"),
-                    }
-                    # Strip whitespace from string values
-                    for key, value in search_result.items():
-                        if isinstance(value, str):
-                            search_result[key] = value.strip()
-                else:
-                    logger.info(f"NIT {nit} not found in Google Sheet.")
-                    search_result = {
-                        "cliente": "No encontrado",
-                        "estado": "No encontrado",
-                        "responsable_comercial": "No encontrado",
-                    }
-            else:
-                logger.error("Could not access NITS worksheet.")
-                search_result = {
-                    "cliente": "Error de sistema",
-                    "estado": "Error de sistema",
-                    "responsable_comercial": "Error de sistema",
-                }
-        else:
-            logger.warning(
-                "GOOGLE_SHEET_ID_CLIENTES_POTENCIALES is not set or sheets_service is not available. Skipping NIT check."
-            )
-            search_result = {
-                "cliente": "No verificado",
-                "estado": "No verificado",
-                "responsable_comercial": "No verificado",
-            }
-        return search_result
-
     tools = [
         buscar_nit_tool,
         obtener_informacion_cliente_activo,
@@ -218,12 +104,7 @@ async def _workflow_awaiting_nit_cliente_activo(
     ]
 
     genai_history = await get_genai_history(history_messages)
-    config = types.GenerateContentConfig(
-        tools=tools,
-        system_instruction=CLIENTE_ACTIVO_AWAITING_NIT_SYSTEM_PROMPT,
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
-    )
+    config = get_generate_config(CLIENTE_ACTIVO_AWAITING_NIT_SYSTEM_PROMPT, tools=tools)
 
     try:
         response = await invoke_model_with_retries(
@@ -255,7 +136,7 @@ async def _workflow_awaiting_nit_cliente_activo(
                 nit = function_call.args.get("nit")
                 if nit:
                     interaction_data["nit"] = nit
-                    search_result = buscar_nit(nit)
+                    search_result = await nit_index.lookup(nit)
                     interaction_data["resultado_buscar_nit"] = search_result
                     nit_provided = True
                     tool_call_name = "buscar_nit"
@@ -297,6 +178,7 @@ async def _workflow_awaiting_nit_cliente_activo(
     return [assistant_message], next_state, tool_call_name, interaction_data
 
 
+@labels_model_calls
 async def handle_in_progress_cliente_activo(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -358,7 +240,7 @@ async def handle_in_progress_cliente_activo(
         if search_result.get("responsable_comercial") and search_result.get(
             "responsable_comercial"
         ) not in ["No encontrado", "Error de sistema", "SIN RESPONSABLE"]:
-            cleaned_data = await _clean_commercial_agent_data(search_result, client)
+            cleaned_data = await commercial_agent_directory.get(search_result, client)
 
             if cleaned_data.get("agente_valido"):
                 nombre_formateado = cleaned_data.get("nombre_formateado", "")
@@ -399,7 +281,7 @@ async def handle_in_progress_cliente_activo(
         if search_result.get("responsable_comercial") and search_result.get(
             "responsable_comercial"
         ) not in ["No encontrado", "Error de sistema", "SIN RESPONSABLE"]:
-            cleaned_data = await _clean_commercial_agent_data(search_result, client)
+            cleaned_data = await commercial_agent_directory.get(search_result, client)
 
             if cleaned_data.get("agente_valido"):
                 nombre_formateado = cleaned_data.get("nombre_formateado", "")
@@ -15,6 +15,7 @@ from src.database.db import get_db
 from src.shared.enums import InteractionType
 from src.shared.schemas import InteractionRequest, InteractionResponse, InteractionMessage
 from src.services.google_sheets import GoogleSheetsService
+from src.services.sheet_exports import sheet_exporter
 
 
 router = APIRouter()
@@ -102,6 +103,7 @@ async def handle(
             )
             db.add(interaction)
 
+        await sheet_exporter.save_pending(db, interaction)
         await db.commit()
 
         return InteractionResponse(
@@ -3,7 +3,7 @@ from typing import Optional, Tuple
 from datetime import datetime
 
 import google.genai as genai
-from google.genai import types, errors
+from google.genai import errors
 
 from .prompts import (
     CLIENTE_POTENCIAL_GATHER_INFO_SYSTEM_PROMPT,
@@ -27,17 +27,18 @@ from .tools import (
     necesita_agente_de_carga,
     guardar_correo_cliente,
     buscar_nit as buscar_nit_tool,
-    limpiar_datos_agente_comercial,
     obtener_tipo_de_servicio,
     obtener_informacion_empresa_contacto,
     obtener_informacion_servicio,
 )
 from src.config import settings
-from src.shared.constants import GEMINI_MODEL
 from src.shared.enums import CategoriaClasificacion, InteractionType, MotivoDeDescarte
 from src.shared.schemas import InteractionMessage
 from src.shared.tools import obtener_ayuda_humana
+from src.services.commercial_agents import commercial_agent_directory
 from src.services.google_sheets import GoogleSheetsService
+from src.services.sheet_exports import sheet_exporter
+from src.services.nit_index import nit_index
 from src.shared.utils.validations import (
     es_ciudad_valida,
     es_mercancia_valida,
@@ -50,9 +51,9 @@ from src.shared.prompts import (
     PROMPT_SERVICIO_NO_PRESTADO_PAQUETEO,
 )
 from src.shared.utils.functions import (
-    invoke_model_with_retries,
     execute_tool_calls_and_get_response,
     get_final_text_response,
+    labels_model_calls,
 )
 from ..cliente_activo.handler import handle_cliente_activo
 from ..cliente_activo.state import ClienteActivoState
@@ -67,6 +68,10 @@ async def _write_cliente_potencial_to_sheet(
         logger.info("Data for potential client has already been written to Google Sheet. Skipping.")
         return
 
+    if sheet_exporter.is_queued(interaction_data):
+        logger.info("Data for potential client is already queued for Google Sheet. Skipping.")
+        return
+
     if (
             not settings.GOOGLE_SHEET_ID_EXPORT
             or not sheets_service
@@ -77,14 +82,6 @@ async def _write_cliente_potencial_to_sheet(
         return
 
     try:
-        worksheet = sheets_service.get_worksheet(
-            spreadsheet_id=settings.GOOGLE_SHEET_ID_EXPORT,
-            worksheet_name="CLIENTES_POTENCIALES",
-        )
-        if not worksheet:
-            logger.error("Could not find CLIENTES_POTENCIALES worksheet.")
-            return
-
         remaining_info = interaction_data.get("remaining_information", {})
         search_result = interaction_data.get("resultado_buscar_nit", {})
         customer_email = interaction_data.get("customer_email")
@@ -145,81 +142,19 @@ async def _write_cliente_potencial_to_sheet(
             comercial_asignado,
         ]
 
-        sheets_service.append_row(worksheet, row_to_append)
-        interaction_data["sheet_row_added"] = True
-        logger.info(f"Successfully wrote data for NIT {nit} to Google Sheet and marked as added.")
-
-    except Exception as e:
-        logger.error(f"Failed to write to Google Sheet: {e}", exc_info=True)
-
-
-async def _clean_commercial_agent_data(
-    search_result: dict,
-    client: genai.Client
-) -> dict:
-    """
-    Cleans commercial agent data using the model to determine if it's valid.
-    
-    Returns:
-        dict with cleaned data or indication that no valid agent was found
-    """
-    responsable_comercial = search_result.get("responsable_comercial", "")
-    email = search_result.get("email", "")
-    telefono = search_result.get("phoneNumber", "")
-    
-    if not responsable_comercial:
-        return {
-            "agente_valido": False,
-            "razon": "No se encontró responsable comercial"
-        }
-    
-    # Create a simple prompt for the data cleaning
-    cleaning_prompt = f"""
-    Analiza los siguientes datos de un agente comercial obtenidos de Google Sheets y determina si representan un agente válido:
-    
-    Responsable comercial: "{responsable_comercial}"
-    Email: "{email}"
-    Teléfono: "{telefono}"
-    
-    Usa la herramienta limpiar_datos_agente_comercial para procesar estos datos.
-    """
-    
-    tools = [limpiar_datos_agente_comercial]
-    
-    config = types.GenerateContentConfig(
-        tools=tools,
-        system_instruction="Eres un experto en limpieza de datos. Analiza los datos del agente comercial y determina si son válidos.",
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
-    )
-    
-    try:
-        response = await invoke_model_with_retries(
-            client.aio.models.generate_content,
-            model=GEMINI_MODEL, 
-            contents=[{"role": "user", "parts": [{"text": cleaning_prompt}]}], 
-            config=config
+        sheet_exporter.enqueue(
+            interaction_data,
+            settings.GOOGLE_SHEET_ID_EXPORT,
+            "CLIENTES_POTENCIALES",
+            row_to_append,
         )
-        
-        if response.function_calls:
-            function_call = response.function_calls[0]
-            if function_call.name == "limpiar_datos_agente_comercial":
-                return dict(function_call.args)
-        
-        # Fallback if no function call
-        return {
-            "agente_valido": False,
-            "razon": "No se pudo procesar los datos del agente"
-        }
-        
+        logger.info(f"Queued data for NIT {nit} for Google Sheet.")
+
     except Exception as e:
-        logger.error(f"Error cleaning commercial agent data: {e}")
-        return {
-            "agente_valido": False,
-            "razon": "Error al procesar los datos del agente"
-        }
+        logger.error(f"Failed to queue Google Sheet row: {e}", exc_info=True)
 
 
+@labels_model_calls
 async def _workflow_remaining_information_provided(
         interaction_data: dict,
         user_data: Optional[dict],
@@ -242,7 +177,7 @@ async def _workflow_remaining_information_provided(
         tool_call_name = "obtener_ayuda_humana"
     elif isinstance(estado, str):
         # Clean the commercial agent data before using it
-        cleaned_data = await _clean_commercial_agent_data(search_result, client)
+        cleaned_data = await commercial_agent_directory.get(search_result, client)
         
         if cleaned_data.get("agente_valido", False):
             nombre_formateado = cleaned_data.get("nombre_formateado", "")
@@ -287,6 +222,14 @@ async def _workflow_remaining_information_provided(
     )
 
 
+async def buscar_nit(nit: str):
+    return await nit_index.lookup(nit)
+
+
+buscar_nit.__doc__ = buscar_nit_tool.__doc__
+
+
+@labels_model_calls
 async def _workflow_awaiting_nit(
         session_id: str,
         history_messages: list[InteractionMessage],
@@ -296,66 +239,6 @@ async def _workflow_awaiting_nit(
         sheets_service: Optional[GoogleSheetsService],
 ) -> Tuple[list[InteractionMessage], ClientePotencialState, Optional[str], dict]:
     """Handles the workflow when the assistant is waiting for the user's NIT."""
-
-    def buscar_nit(nit: str):
-        """Captura el NIT de la empresa proporcionado por el usuario y busca en Google Sheets."""
-        search_result = {}
-        if settings.GOOGLE_SHEET_ID_CLIENTES_POTENCIALES and sheets_service:
-            worksheet = sheets_service.get_worksheet(
-                spreadsheet_id=settings.GOOGLE_SHEET_ID_CLIENTES_POTENCIALES,
-                worksheet_name="NITS",
-            )
-            if worksheet:
-                records = sheets_service.read_data(worksheet)
-                found_record = None
-                for record in records:
-                    if str(record.get("NIT - 10 DIGITOS")) == nit or str(
-                            record.get("NIT - 9 DIGITOS")
-                    ) == nit:
-                        found_record = record
-                        break
-
-                if found_record:
-                    logger.info(f"Columns found in sheet for NIT {nit}: {list(found_record.keys())}")
-                    logger.info(f"Found NIT {nit} in Google Sheet: {found_record}")
-                    search_result = {
-                        "cliente": found_record.get(" CLIENTE"),
-                        "estado": found_record.get(" ESTADO DEL CLIENTE"),
-                        "responsable_comercial": found_record.get(" RESPONSABLE COMERCIAL"),
-                        "phoneNumber": found_record.get(" CELULAR"),
-                        "email": found_record.get(" CORREO"),
-                    }
-                    # Strip whitespace from string values
-                    for key, value in search_result.items():
-                        if isinstance(value, str):
-                            search_result[key] = value.strip()
-                else:
-                    logger.info(f"NIT {nit} not found in Google Sheet.")
-                    search_result = {
-                        "cliente": "No encontrado",
-                        "estado": "No encontrado",
-                        "responsable_comercial": "No encontrado",
-                    }
-            else:
-                logger.error("Could not access NITS worksheet.")
-                search_result = {
-                    "cliente": "Error de sistema",
-                    "estado": "Error de sistema",
-                    "responsable_comercial": "Error de sistema",
-                }
-        else:
-            logger.warning(
-                "GOOGLE_SHEET_ID_CLIENTES_POTENCIALES is not set or sheets_service is not available. Skipping NIT check."
-            )
-            search_result = {
-                "cliente": "No verificado",
-                "estado": "No verificado",
-                "responsable_comercial": "No verificado",
-            }
-        return search_result
-
-    buscar_nit.__doc__ = buscar_nit_tool.__doc__
-
     tools = [
         buscar_nit,
         es_persona_natural,
@@ -589,6 +472,7 @@ async def _workflow_awaiting_nit(
     )
 
 
+@labels_model_calls
 async def _workflow_awaiting_persona_natural_freight_info(
         history_messages: list[InteractionMessage],
         interaction_data: dict,
@@ -664,6 +548,7 @@ async def _workflow_awaiting_persona_natural_freight_info(
     )
 
 
+@labels_model_calls
 async def _workflow_awaiting_remaining_information(
         history_messages: list[InteractionMessage],
         interaction_data: dict,
@@ -876,6 +761,7 @@ async def _workflow_awaiting_remaining_information(
     )
 
 
+@labels_model_calls
 async def _workflow_customer_asked_for_email_data_sent(
         history_messages: list[InteractionMessage],
         interaction_data: dict,
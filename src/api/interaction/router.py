@@ -2,7 +2,7 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 import google.genai as genai
-from google.genai import errors, types
+from google.genai import errors
 
 from src.database import models
 from src.database.db import get_db
@@ -12,7 +12,12 @@ from src.shared.prompts import CONTACTO_BASE_SYSTEM_PROMPT
 from src.shared.tools import obtener_ayuda_humana
 from src.shared.schemas import InteractionRequest, InteractionResponse, InteractionMessage
 from src.shared.utils.history import get_genai_history
-from src.shared.utils.functions import get_response_text, invoke_model_with_retries
+from src.shared.utils.tool_registry import get_generate_config
+from src.shared.utils.functions import (
+    get_response_text,
+    invoke_model_with_retries,
+    model_call_label,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -51,18 +56,17 @@ async def handle_interaction(
         genai_history = await get_genai_history(history_messages)
 
         tools = [obtener_ayuda_humana]
-        config = types.GenerateContentConfig(
+        config = get_generate_config(
+            CONTACTO_BASE_SYSTEM_PROMPT,
             tools=tools,
-            system_instruction=CONTACTO_BASE_SYSTEM_PROMPT,
-            automatic_function_calling=types.AutomaticFunctionCallingConfig(
-                disable=True
-            ),
+            temperature=None,
         )
 
-        response = await invoke_model_with_retries(
-            client.aio.models.generate_content,
-            model=model, contents=genai_history, config=config
-        )
+        with model_call_label("handle_interaction"):
+            response = await invoke_model_with_retries(
+                client.aio.models.generate_content,
+                model=model, contents=genai_history, config=config
+            )
 
         if response.function_calls:
             function_call = response.function_calls[0]
@@ -16,6 +16,7 @@ from src.shared.schemas import (
     InteractionResponse,
 )
 from src.services.google_sheets import GoogleSheetsService
+from src.services.sheet_exports import sheet_exporter
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -84,6 +85,7 @@ async def handle(
             )
             db.add(interaction)
 
+        await sheet_exporter.save_pending(db, interaction)
         await db.commit()
 
         return InteractionResponse(
@@ -3,7 +3,7 @@ from typing import Optional, Tuple
 from datetime import datetime
 
 import google.genai as genai
-from google.genai import types, errors
+from google.genai import errors
 
 from .prompts import (
     PROVEEDOR_POTENCIAL_GATHER_INFO_SYSTEM_PROMPT,
@@ -19,10 +19,13 @@ from src.shared.schemas import InteractionMessage
 from src.shared.tools import obtener_ayuda_humana
 from src.shared.utils.history import get_genai_history
 from src.services.google_sheets import GoogleSheetsService
+from src.services.sheet_exports import sheet_exporter
+from src.shared.utils.tool_registry import get_generate_config
 from src.shared.utils.functions import (
     get_response_text,
     invoke_model_with_retries,
     get_final_text_response,
+    labels_model_calls,
 )
 
 logger = logging.getLogger(__name__)
@@ -35,6 +38,10 @@ async def _write_proveedor_potencial_to_sheet(
         logger.info("Data for potential provider has already been written to Google Sheet. Skipping.")
         return
 
+    if sheet_exporter.is_queued(interaction_data):
+        logger.info("Data for potential provider is already queued for Google Sheet. Skipping.")
+        return
+
     if not settings.GOOGLE_SHEET_ID_EXPORT or not sheets_service:
         logger.warning(
             "Spreadsheet ID for export not configured or sheets service not available. Skipping write."
@@ -42,14 +49,6 @@ async def _write_proveedor_potencial_to_sheet(
         return
 
     try:
-        worksheet = sheets_service.get_worksheet(
-            spreadsheet_id=settings.GOOGLE_SHEET_ID_EXPORT,
-            worksheet_name="PROVEEDORES",
-        )
-        if not worksheet:
-            logger.error("Could not find PROVEEDORES worksheet.")
-            return
-
         fecha_perfilacion = datetime.now().strftime("%d/%m/%Y")
         tipo_de_servicio = interaction_data.get("tipo_de_servicio", "")
         nit = interaction_data.get("nit", "")
@@ -62,14 +61,19 @@ async def _write_proveedor_potencial_to_sheet(
             tipo_de_servicio,
         ]
 
-        sheets_service.append_row(worksheet, row_to_append)
-        interaction_data["sheet_row_added"] = True
-        logger.info("Successfully wrote data for potential provider to Google Sheet and marked as added.")
+        sheet_exporter.enqueue(
+            interaction_data,
+            settings.GOOGLE_SHEET_ID_EXPORT,
+            "PROVEEDORES",
+            row_to_append,
+        )
+        logger.info("Queued data for potential provider for Google Sheet.")
 
     except Exception as e:
-        logger.error(f"Failed to write to Google Sheet: {e}", exc_info=True)
+        logger.error(f"Failed to queue Google Sheet row: {e}", exc_info=True)
 
 
+@labels_model_calls
 async def _workflow_awaiting_company_info(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -84,11 +88,9 @@ async def _workflow_awaiting_company_info(
         obtener_ayuda_humana,
     ]
 
-    config = types.GenerateContentConfig(
+    config = get_generate_config(
+        PROVEEDOR_POTENCIAL_GATHER_INFO_SYSTEM_PROMPT,
         tools=tools,
-        system_instruction=PROVEEDOR_POTENCIAL_GATHER_INFO_SYSTEM_PROMPT,
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
     )
 
     try:
@@ -147,6 +149,7 @@ async def _workflow_awaiting_company_info(
     )
 
 
+@labels_model_calls
 async def handle_in_progress_proveedor_potencial(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -164,12 +167,7 @@ async def handle_in_progress_proveedor_potencial(
         obtener_ayuda_humana,
     ]
 
-    config = types.GenerateContentConfig(
-        tools=tools,
-        system_instruction=PROVEEDOR_POTENCIAL_SYSTEM_PROMPT,
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
-    )
+    config = get_generate_config(PROVEEDOR_POTENCIAL_SYSTEM_PROMPT, tools=tools)
 
     try:
         response = await invoke_model_with_retries(
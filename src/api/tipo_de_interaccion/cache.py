@@ -0,0 +1,215 @@
+import hashlib
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+
+from src.config import settings
+from src.database import models
+from src.database.db import AsyncSessionFactory
+from src.services.metrics import registry
+from src.shared.constants import GEMINI_MODEL
+from src.shared.enums import InteractionType
+from src.shared.schemas import Clasificacion, InteractionMessage
+from src.shared.utils.validations import _normalize_text
+
+from .prompts import TIPO_DE_INTERACCION_SYSTEM_PROMPT
+
+
+logger = logging.getLogger(__name__)
+
+ClassificationResult = Tuple[
+    list[InteractionMessage], Optional[Clasificacion], Optional[str]
+]
+
+# Results that depend on something other than the conversation, such as an
+# API failure, must not be served to other users.
+UNCACHEABLE_TOOL_CALLS = {"obtener_ayuda_humana"}
+
+# Changing the model or the prompt invalidates every cached entry,
+# including those in the persistent tier.
+_CACHE_VERSION = hashlib.sha256(
+    f"{GEMINI_MODEL}\n{TIPO_DE_INTERACCION_SYSTEM_PROMPT}".encode("utf-8")
+).hexdigest()[:16]
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normalizes a user message with the `_normalize_text` rules, collapsing
+    whitespace and dropping surrounding punctuation, so that "Hola!" and
+    " hola " share a fingerprint.
+    """
+    normalized = re.sub(r"\s+", " ", _normalize_text(message))
+    return normalized.strip(" .,;:!?¡¿")
+
+
+def history_fingerprint(history_messages: list[InteractionMessage]) -> Optional[str]:
+    """
+    Returns the cache key of a conversation, or None if it is not cacheable.
+    Only first-turn conversations, a single user message, are cached.
+    """
+    if len(history_messages) != 1:
+        return None
+    message = history_messages[0]
+    if message.role != InteractionType.USER:
+        return None
+    normalized = normalize_message(message.message)
+    if not normalized:
+        return None
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"{_CACHE_VERSION}:{digest}"
+
+
+class ClassificationCache:
+    """
+    An LRU cache with TTL for the result of `workflow_tipo_de_interaccion`,
+    with an optional persistent tier in the `classification_cache` table
+    shared by every process.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.CLASSIFICATION_CACHE_SIZE,
+        ttl_seconds: int = settings.CLASSIFICATION_CACHE_TTL_SECONDS,
+        persistent: bool = settings.CLASSIFICATION_CACHE_PERSISTENT,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self._entries = TTLCache(maxsize=max_size, ttl=ttl_seconds)
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def get(
+        self, history_messages: list[InteractionMessage]
+    ) -> Optional[ClassificationResult]:
+        """Returns a copy of the cached result for this history, if any."""
+        fingerprint = history_fingerprint(history_messages)
+        if fingerprint is None:
+            return None
+
+        entry = self._entries.get(fingerprint)
+        if entry is None and self.persistent:
+            entry = await self._load(fingerprint)
+            if entry is not None:
+                self.persistent_hits += 1
+                self._entries[fingerprint] = entry
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.debug(f"Classification cache hit for fingerprint {fingerprint}.")
+        return _result_from_entry(entry)
+
+    async def set(
+        self, history_messages: list[InteractionMessage], result: ClassificationResult
+    ):
+        """Stores a classification result if both history and result are cacheable."""
+        fingerprint = history_fingerprint(history_messages)
+        if fingerprint is None:
+            return
+
+        messages, clasificacion, tool_call_name = result
+        # A routing decision usually comes without messages and is cached too.
+        if (not messages and not clasificacion) or tool_call_name in UNCACHEABLE_TOOL_CALLS:
+            return
+
+        entry = {
+            "messages": [
+                message.model_dump(mode="json", exclude={"timestamp"})
+                for message in messages
+            ],
+            "clasificacion": clasificacion.model_dump(mode="json") if clasificacion else None,
+            "tool_call_name": tool_call_name,
+        }
+        self._entries[fingerprint] = entry
+        if self.persistent:
+            await self._store(fingerprint, entry)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def _load(self, fingerprint: str) -> Optional[dict]:
+        try:
+            async with AsyncSessionFactory() as db:
+                result = await db.execute(
+                    text(
+                        """
+                        SELECT result FROM classification_cache
+                        WHERE fingerprint = :fingerprint
+                          AND created_at > now() - make_interval(secs => :ttl)
+                        """
+                    ),
+                    {"fingerprint": fingerprint, "ttl": float(self.ttl_seconds)},
+                )
+                return result.scalar()
+        except Exception as e:
+            logger.error(f"Failed to read the classification cache: {e}")
+            return None
+
+    async def _store(self, fingerprint: str, entry: dict):
+        statement = insert(models.ClassificationCacheEntry).values(
+            fingerprint=fingerprint, result=entry
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[models.ClassificationCacheEntry.fingerprint],
+            set_={"result": statement.excluded.result, "created_at": text("now()")},
+        )
+        try:
+            async with AsyncSessionFactory() as db:
+                await db.execute(statement)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to write the classification cache: {e}")
+
+
+def _result_from_entry(entry: dict) -> ClassificationResult:
+    # Messages get a fresh timestamp so they are ordered as part of this turn.
+    now = datetime.now(timezone.utc)
+    messages = [
+        InteractionMessage.model_validate({**message, "timestamp": now})
+        for message in entry["messages"]
+    ]
+    clasificacion = (
+        Clasificacion.model_validate(entry["clasificacion"])
+        if entry["clasificacion"]
+        else None
+    )
+    return messages, clasificacion, entry["tool_call_name"]
+
+
+classification_cache = ClassificationCache()
+
+
+def _collect_cache_metrics():
+    stats = classification_cache.stats()
+    yield "classification_cache_entries", "gauge", "Entries in the in-memory classification cache.", [({}, stats["size"])]
+    yield (
+        "classification_cache_lookups_total",
+        "counter",
+        "Classification cache lookups by result.",
+        [
+            ({"result": "hit"}, stats["hits"] - stats["persistent_hits"]),
+            ({"result": "persistent_hit"}, stats["persistent_hits"]),
+            ({"result": "miss"}, stats["misses"]),
+        ],
+    )
+
+
+registry.register_collector(_collect_cache_metrics)
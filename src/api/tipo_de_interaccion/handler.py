@@ -4,6 +4,7 @@ from typing import Optional, Tuple
 import google.genai as genai
 
 from src.shared.schemas import Clasificacion, InteractionMessage
+from .cache import classification_cache
 from .workflows import workflow_tipo_de_interaccion
 
 
@@ -14,4 +15,10 @@ async def handle_tipo_de_interaccion(
     history_messages: list[InteractionMessage],
     client: genai.Client,
 ) -> Tuple[list[InteractionMessage], Optional[Clasificacion], Optional[str]]:
-    return await workflow_tipo_de_interaccion(history_messages, client)
+    cached_result = await classification_cache.get(history_messages)
+    if cached_result is not None:
+        return cached_result
+
+    result = await workflow_tipo_de_interaccion(history_messages, client)
+    await classification_cache.set(history_messages, result)
+    return result
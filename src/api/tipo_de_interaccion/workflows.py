@@ -1,8 +1,9 @@
+import asyncio
 import logging
 from typing import Optional, Tuple
 
 import google.genai as genai
-from google.genai import types, errors
+from google.genai import errors
 
 from .prompts import (
     TIPO_DE_INTERACCION_SYSTEM_PROMPT,
@@ -10,6 +11,9 @@ from .prompts import (
 )
 from .tools import clasificar_interaccion
 
+from src.config import settings
+from src.services.gemini_guard import gemini_limiter
+from src.services.metrics import registry
 from src.shared.enums import InteractionType
 from src.shared.constants import GEMINI_MODEL
 from src.shared.tools import obtener_ayuda_humana
@@ -23,12 +27,152 @@ from src.shared.utils.validations import (
     es_solicitud_de_paqueteo,
     es_envio_internacional,
 )
-from src.shared.utils.functions import get_response_text, invoke_model_with_retries
+from src.shared.utils.tool_registry import get_generate_config
+from src.shared.utils.functions import (
+    generate_content_with_streaming,
+    get_response_text,
+    invoke_model_with_retries,
+    model_call_label,
+    labels_model_calls,
+)
 
 
 logger = logging.getLogger(__name__)
 
+# How often the speculative autopilot call was started, needed for the reply,
+# finished but not needed, and cancelled while still running.
+speculation_stats = {"started": 0, "used": 0, "discarded": 0, "cancelled": 0}
+
+
+def _collect_speculation_metrics():
+    yield (
+        "tipo_de_interaccion_speculations_total",
+        "counter",
+        "Speculative autopilot calls by outcome.",
+        [({"outcome": outcome}, count) for outcome, count in speculation_stats.items()],
+    )
+
+
+registry.register_collector(_collect_speculation_metrics)
+
+
+def _should_speculate(history_messages: list[InteractionMessage]) -> bool:
+    """
+    Returns True when the autopilot call should start alongside the
+    classification call: on the first user turn or for a very short message,
+    which is when vague openers like "hola" are sent.
+    """
+    if not settings.TIPO_DE_INTERACCION_SPECULATIVE_AUTOPILOT:
+        return False
+    if not history_messages or history_messages[-1].role != InteractionType.USER:
+        return False
+    if not gemini_limiter.has_capacity:
+        # A call that is usually discarded must not take a slot from others.
+        return False
+    user_turns = sum(
+        1 for message in history_messages if message.role == InteractionType.USER
+    )
+    if user_turns == 1:
+        return True
+    message = history_messages[-1].message.strip()
+    return len(message) <= settings.TIPO_DE_INTERACCION_SPECULATIVE_MAX_CHARS
+
+
+class _Speculation:
+    """A speculative autopilot call and whether its reply was used."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.used = False
+
+    async def result(self) -> Tuple[InteractionMessage, Optional[str]]:
+        self.used = True
+        speculation_stats["used"] += 1
+        logger.info(
+            f"Using the speculative autopilot reply "
+            f"({speculation_stats['used']}/{speculation_stats['started']} speculations used)."
+        )
+        return await self.task
+
+    def finish(self):
+        """Cancels the call if it is still running and counts its outcome."""
+        if not self.task.done():
+            speculation_stats["cancelled"] += 1
+            self.task.cancel()
+            return
+        if self.used:
+            return
+        speculation_stats["discarded"] += 1
+        if not self.task.cancelled():
+            # Retrieves the outcome of an unused speculation so errors are not
+            # reported as never retrieved.
+            self.task.exception()
+
+
+async def _run_autopilot(
+    client: genai.Client, model: str, genai_history: list, stream: bool
+) -> Tuple[InteractionMessage, Optional[str]]:
+    """
+    Asks the autopilot prompt for a reply that gathers more information.
+    Speculative calls are not streamed, since their reply may be discarded.
+    """
+    tool_call_name = None
+    autopilot_config = get_generate_config(
+        TIPO_DE_INTERACCION_AUTOPILOT_SYSTEM_PROMPT,
+        tools=[obtener_ayuda_humana],
+    )
+    try:
+        if stream:
+            autopilot_response = await generate_content_with_streaming(
+                client,
+                model=model,
+                contents=genai_history,
+                config=autopilot_config,
+            )
+        else:
+            autopilot_response = await invoke_model_with_retries(
+                client.aio.models.generate_content,
+                model=model,
+                contents=genai_history,
+                config=autopilot_config,
+            )
+
+        if (
+            autopilot_response.function_calls
+            and autopilot_response.function_calls[0].name
+            == "obtener_ayuda_humana"
+        ):
+            tool_call_name = "obtener_ayuda_humana"
+            assistant_message_text = obtener_ayuda_humana()
+        else:
+            assistant_message_text = get_response_text(autopilot_response)
+
+        if not assistant_message_text:
+            logger.warning("Autopilot also returned no text. Escalating to human.")
+            assistant_message_text = obtener_ayuda_humana()
+            tool_call_name = "obtener_ayuda_humana"
+
+        assistant_message = InteractionMessage(
+            role=InteractionType.MODEL,
+            message=assistant_message_text,
+            tool_calls=[tool_call_name] if tool_call_name else None,
+        )
+
+    except Exception as e:
+        # Besides server errors, a timeout or a client error must not fail the
+        # turn, above all when this runs as a speculation.
+        logger.error(f"Error during autopilot call: {e}", exc_info=True)
+        assistant_message = InteractionMessage(
+            role=InteractionType.MODEL,
+            message=obtener_ayuda_humana(),
+            tool_calls=["obtener_ayuda_humana"],
+        )
+        tool_call_name = "obtener_ayuda_humana"
+
+    return assistant_message, tool_call_name
+
 
+@labels_model_calls
 async def workflow_tipo_de_interaccion(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -46,13 +190,32 @@ async def workflow_tipo_de_interaccion(
         es_solicitud_de_paqueteo,
         es_envio_internacional,
     ]
-    config = types.GenerateContentConfig(
-        tools=tools,
-        system_instruction=TIPO_DE_INTERACCION_SYSTEM_PROMPT,
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
-    )
+    config = get_generate_config(TIPO_DE_INTERACCION_SYSTEM_PROMPT, tools=tools)
+
+    speculation = None
+    if _should_speculate(history_messages):
+        speculation_stats["started"] += 1
+        with model_call_label("workflow_tipo_de_interaccion_speculative"):
+            speculation = _Speculation(
+                asyncio.create_task(
+                    _run_autopilot(client, model, genai_history, stream=False)
+                )
+            )
 
+    try:
+        return await _classify(client, model, genai_history, config, speculation)
+    finally:
+        if speculation:
+            speculation.finish()
+
+
+async def _classify(
+    client: genai.Client,
+    model: str,
+    genai_history: list,
+    config,
+    speculation: Optional[_Speculation],
+) -> Tuple[list[InteractionMessage], Optional[Clasificacion], Optional[str]]:
     try:
         response = await invoke_model_with_retries(
             client.aio.models.generate_content,
@@ -176,53 +339,11 @@ async def workflow_tipo_de_interaccion(
             logger.info(
                 "No text response, no meaningful tools, and no classification. Using autopilot to get more information."
             )
-
-            autopilot_config = types.GenerateContentConfig(
-                tools=[obtener_ayuda_humana],
-                system_instruction=TIPO_DE_INTERACCION_AUTOPILOT_SYSTEM_PROMPT,
-                temperature=0.0,
-                automatic_function_calling=types.AutomaticFunctionCallingConfig(
-                    disable=True
-                ),
-            )
-            try:
-                autopilot_response = await invoke_model_with_retries(
-                    client.aio.models.generate_content,
-                    model=model,
-                    contents=genai_history,
-                    config=autopilot_config,
-                )
-
-                if (
-                    autopilot_response.function_calls
-                    and autopilot_response.function_calls[0].name
-                    == "obtener_ayuda_humana"
-                ):
-                    tool_call_name = "obtener_ayuda_humana"
-                    assistant_message_text = obtener_ayuda_humana()
-                else:
-                    assistant_message_text = get_response_text(autopilot_response)
-
-                if not assistant_message_text:
-                    logger.warning("Autopilot also returned no text. Escalating to human.")
-                    assistant_message_text = obtener_ayuda_humana()
-                    tool_call_name = "obtener_ayuda_humana"
-
-                assistant_message = InteractionMessage(
-                    role=InteractionType.MODEL,
-                    message=assistant_message_text,
-                    tool_calls=[tool_call_name] if tool_call_name else None,
-                )
-
-            except errors.ServerError as e:
-                logger.error(
-                    f"Gemini API Server Error during autopilot call: {e}", exc_info=True
-                )
-                assistant_message = InteractionMessage(
-                    role=InteractionType.MODEL,
-                    message=obtener_ayuda_humana(),
-                    tool_calls=["obtener_ayuda_humana"],
+            if speculation:
+                assistant_message, tool_call_name = await speculation.result()
+            else:
+                assistant_message, tool_call_name = await _run_autopilot(
+                    client, model, genai_history, stream=True
                 )
-                tool_call_name = "obtener_ayuda_humana"
 
     return [assistant_message] if assistant_message else [], clasificacion, tool_call_name
@@ -19,6 +19,7 @@ from src.shared.schemas import (
 from src.shared.constants import TRANSPORTISTA_MESSAGES_UNTIL_HUMAN
 from src.shared.tools import obtener_ayuda_humana
 from src.services.google_sheets import GoogleSheetsService
+from src.services.sheet_exports import sheet_exporter
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -121,6 +122,7 @@ async def handle(
             )
             db.add(interaction)
 
+        await sheet_exporter.save_pending(db, interaction)
         await db.commit()
 
         return InteractionResponse(
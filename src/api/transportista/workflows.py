@@ -3,7 +3,7 @@ from typing import Optional, Tuple
 from datetime import datetime
 
 import google.genai as genai
-from google.genai import types, errors
+from google.genai import errors
 
 from .prompts import (
     TRANSPORTISTA_SYSTEM_PROMPT,
@@ -35,10 +35,13 @@ from src.shared.enums import InteractionType, CategoriaTransportista
 from src.shared.schemas import InteractionMessage
 from src.shared.tools import obtener_ayuda_humana, nueva_interaccion_requerida
 from src.services.google_sheets import GoogleSheetsService
+from src.services.sheet_exports import sheet_exporter
+from src.shared.utils.tool_registry import get_generate_config
 from src.shared.utils.functions import (
     execute_tool_calls_and_get_response,
     get_final_text_response,
     invoke_model_with_retries,
+    labels_model_calls,
 )
 from src.shared.utils.history import get_genai_history
 
@@ -59,6 +62,10 @@ async def _write_transportista_to_sheet(
         logger.info("Data for carrier has already been written to Google Sheet. Skipping.")
         return
 
+    if sheet_exporter.is_queued(interaction_data):
+        logger.info("Data for carrier is already queued for Google Sheet. Skipping.")
+        return
+
     if not settings.GOOGLE_SHEET_ID_EXPORT or not sheets_service:
         logger.warning(
             "Spreadsheet ID for export not configured or sheets service not available. Skipping write."
@@ -66,14 +73,6 @@ async def _write_transportista_to_sheet(
         return
 
     try:
-        worksheet = sheets_service.get_worksheet(
-            spreadsheet_id=settings.GOOGLE_SHEET_ID_EXPORT,
-            worksheet_name="TRANSPORTISTAS",
-        )
-        if not worksheet:
-            logger.error("Could not find TRANSPORTISTAS worksheet.")
-            return
-
         fecha_perfilacion = datetime.now().strftime("%d/%m/%Y")
         tipo_de_solicitud = interaction_data.get("tipo_de_solicitud", "")
         placa_vehiculo = interaction_data.get("placa_vehiculo", "")
@@ -86,14 +85,19 @@ async def _write_transportista_to_sheet(
             tipo_de_solicitud,
         ]
 
-        sheets_service.append_row(worksheet, row_to_append)
-        interaction_data["sheet_row_added"] = True
-        logger.info("Successfully wrote data for carrier to Google Sheet and marked as added.")
+        sheet_exporter.enqueue(
+            interaction_data,
+            settings.GOOGLE_SHEET_ID_EXPORT,
+            "TRANSPORTISTAS",
+            row_to_append,
+        )
+        logger.info("Queued data for carrier for Google Sheet.")
 
     except Exception as e:
-        logger.error(f"Failed to write to Google Sheet: {e}", exc_info=True)
+        logger.error(f"Failed to queue Google Sheet row: {e}", exc_info=True)
 
 
+@labels_model_calls
 async def _workflow_awaiting_transportista_info(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -108,12 +112,7 @@ async def _workflow_awaiting_transportista_info(
         obtener_ayuda_humana,
     ]
 
-    config = types.GenerateContentConfig(
-        tools=tools,
-        system_instruction=TRANSPORTISTA_GATHER_INFO_SYSTEM_PROMPT,
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
-    )
+    config = get_generate_config(TRANSPORTISTA_GATHER_INFO_SYSTEM_PROMPT, tools=tools)
 
     try:
         response = await invoke_model_with_retries(
@@ -192,6 +191,7 @@ async def _workflow_awaiting_transportista_info(
     )
 
 
+@labels_model_calls
 async def _workflow_video_sent(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -290,6 +290,7 @@ async def _workflow_video_sent(
     )
 
 
+@labels_model_calls
 async def handle_in_progress_transportista(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -3,7 +3,7 @@ from typing import Optional, Tuple
 from datetime import datetime
 
 import google.genai as genai
-from google.genai import types, errors
+from google.genai import errors
 
 from .prompts import (
     USUARIO_ADMINISTRATIVO_GATHER_INFO_SYSTEM_PROMPT,
@@ -23,10 +23,13 @@ from src.shared.enums import InteractionType, CategoriaUsuarioAdministrativo
 from src.shared.schemas import InteractionMessage
 from src.shared.tools import obtener_ayuda_humana
 from src.services.google_sheets import GoogleSheetsService
+from src.services.sheet_exports import sheet_exporter
+from src.shared.utils.tool_registry import get_generate_config
 from src.shared.utils.functions import (
     execute_tool_calls_and_get_response,
     get_final_text_response,
     invoke_model_with_retries,
+    labels_model_calls,
 )
 from ...shared.utils.history import get_genai_history
 
@@ -40,6 +43,10 @@ async def _write_usuario_administrativo_to_sheet(
         logger.info("Data for administrative user has already been written to Google Sheet. Skipping.")
         return
 
+    if sheet_exporter.is_queued(interaction_data):
+        logger.info("Data for administrative user is already queued for Google Sheet. Skipping.")
+        return
+
     if not settings.GOOGLE_SHEET_ID_EXPORT or not sheets_service:
         logger.warning(
             "Spreadsheet ID for export not configured or sheets service not available. Skipping write."
@@ -47,14 +54,6 @@ async def _write_usuario_administrativo_to_sheet(
         return
 
     try:
-        worksheet = sheets_service.get_worksheet(
-            spreadsheet_id=settings.GOOGLE_SHEET_ID_EXPORT,
-            worksheet_name="ADMON",
-        )
-        if not worksheet:
-            logger.error("Could not find ADMON worksheet.")
-            return
-
         fecha_perfilacion = datetime.now().strftime("%d/%m/%Y")
         tipo_de_necesidad = interaction_data.get("tipo_de_necesidad", "")
         nit_cedula = interaction_data.get("nit_cedula", "")
@@ -67,14 +66,19 @@ async def _write_usuario_administrativo_to_sheet(
             tipo_de_necesidad,
         ]
 
-        sheets_service.append_row(worksheet, row_to_append)
-        interaction_data["sheet_row_added"] = True
-        logger.info("Successfully wrote data for administrative user to Google Sheet and marked as added.")
+        sheet_exporter.enqueue(
+            interaction_data,
+            settings.GOOGLE_SHEET_ID_EXPORT,
+            "ADMON",
+            row_to_append,
+        )
+        logger.info("Queued data for administrative user for Google Sheet.")
 
     except Exception as e:
-        logger.error(f"Failed to write to Google Sheet: {e}", exc_info=True)
+        logger.error(f"Failed to queue Google Sheet row: {e}", exc_info=True)
 
 
+@labels_model_calls
 async def _workflow_awaiting_admin_info(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -89,11 +93,9 @@ async def _workflow_awaiting_admin_info(
         obtener_ayuda_humana,
     ]
 
-    config = types.GenerateContentConfig(
+    config = get_generate_config(
+        USUARIO_ADMINISTRATIVO_GATHER_INFO_SYSTEM_PROMPT,
         tools=tools,
-        system_instruction=USUARIO_ADMINISTRATIVO_GATHER_INFO_SYSTEM_PROMPT,
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
     )
 
     try:
@@ -188,6 +190,7 @@ async def _workflow_awaiting_admin_info(
     )
 
 
+@labels_model_calls
 async def handle_in_progress_usuario_administrativo(
     history_messages: list[InteractionMessage],
     client: genai.Client,
@@ -0,0 +1,71 @@
+import json
+import logging
+from typing import Any, List
+
+from .schemas import WebhookEvent
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib parser is used otherwise.
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+ACTIONABLE_EVENT_TYPE = "messages.upsert"
+
+
+def load_webhook_body(body: bytes) -> List[Any]:
+    """
+    Parses a raw webhook body into a list of event objects, using orjson when
+    it is installed. Raises json.JSONDecodeError if the body is not valid JSON.
+    """
+    try:
+        payload = orjson.loads(body) if orjson else json.loads(body)
+    except UnicodeDecodeError as e:
+        raise json.JSONDecodeError(f"Invalid UTF-8: {e}", "", 0)
+    return payload if isinstance(payload, list) else [payload]
+
+
+def is_actionable_event(raw_event: Any) -> bool:
+    """
+    Checks, without validating the whole event, whether it is an incoming
+    message from a user: a 'messages.upsert' event that is not fromMe and
+    has a remoteJid. Status updates, presence and our own messages fail it.
+    """
+    if not isinstance(raw_event, dict) or raw_event.get("event") != ACTIONABLE_EVENT_TYPE:
+        return False
+    data = raw_event.get("data")
+    if not isinstance(data, dict):
+        return False
+    key = data.get("key")
+    if not isinstance(key, dict):
+        return False
+    remote_jid = key.get("remoteJid")
+    return (
+        key.get("fromMe") is False
+        and isinstance(remote_jid, str)
+        and bool(remote_jid.split("@")[0])
+    )
+
+
+def parse_webhook_events(body: bytes) -> List[WebhookEvent]:
+    """
+    Parses a webhook body and returns the validated events worth processing.
+    Only the events that pass `is_actionable_event` are validated.
+
+    Raises:
+        json.JSONDecodeError: If the body is not valid JSON.
+        pydantic.ValidationError: If an actionable event does not match the schema.
+    """
+    raw_events = load_webhook_body(body)
+    actionable = [raw_event for raw_event in raw_events if is_actionable_event(raw_event)]
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            f"Webhook received {len(raw_events)} event(s), {len(actionable)} actionable."
+        )
+        for raw_event in actionable:
+            logger.debug(f"Webhook event: {json.dumps(raw_event, ensure_ascii=False)}")
+
+    return [WebhookEvent.model_validate(raw_event) for raw_event in actionable]
@@ -3,20 +3,23 @@ import json
 import uuid
 from typing import Optional
 
-from fastapi import APIRouter, Request, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException
 from pydantic import ValidationError
 import google.genai as genai
-import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import flag_modified
 
 from src.config import settings
 from src.api.chat_router.router import _chat_router_logic
-from src.database.db import AsyncSessionFactory
+from src.database.db import AsyncSessionFactory, get_db
 from src.database import models
 from src.shared.enums import InteractionType
 from src.shared.schemas import InteractionMessage, InteractionRequest
 from src.shared.messages import MESSAGE_NON_TEXT_MESSAGES_NOT_ACCEPTED
 from src.services.google_sheets import GoogleSheetsService
+from src.services.webhook_queue import JobCompletion, enqueue_webhook_events
+from src.services.whatsapp_dispatcher import WhatsAppDispatcher
+from src.shared.utils.streaming import reply_sink
 from src.shared.messages import (
     SPECIAL_LIST_TITLE,
     SPECIAL_LIST_DESCRIPTION,
@@ -29,6 +32,7 @@ from src.shared.messages import (
     WHATSAPP_WEB_INSTRUCTIONS_MESSAGE,
 )
 
+from .prefilter import parse_webhook_events
 from .schemas import WebhookEvent, WebhookMessage
 
 
@@ -67,6 +71,20 @@ def calculate_delay(text):
         return int(proportional_value)
 
 
+def get_session_id(event: WebhookEvent) -> Optional[str]:
+    """Extracts the session id (the sender's phone number) from a webhook event."""
+    if event.data.key and event.data.key.remoteJid:
+        return event.data.key.remoteJid.split("@")[0]
+    return None
+
+
+def get_message_id(event: WebhookEvent) -> Optional[str]:
+    """Returns the WhatsApp message id of a message event, used for deduplication."""
+    if event.event == "messages.upsert" and event.data.key and event.data.key.id:
+        return event.data.key.id
+    return None
+
+
 def detect_non_text_message(message: Optional[WebhookMessage]) -> bool:
     """
     Detects if the message is a non-text message (e.g., audio, image, video).
@@ -83,57 +101,25 @@ def detect_non_text_message(message: Optional[WebhookMessage]) -> bool:
     return not is_text_based
 
 
-async def send_whatsapp_message(phone_number: str, message: str):
+def send_whatsapp_message(
+    dispatcher: WhatsAppDispatcher, phone_number: str, message: str
+):
     """
-    Sends a message to a phone number using the WhatsApp API.
+    Queues a message to a phone number for delivery through the WhatsApp API.
     """
-    if not all(
-        [
-            settings.WHATSAPP_SERVER_URL,
-            settings.WHATSAPP_SERVER_API_KEY,
-            settings.WHATSAPP_SERVER_INSTANCE_NAME,
-        ]
-    ):
+    if not dispatcher or not dispatcher.is_configured:
         logger.warning(
             "WhatsApp server settings are not configured. Skipping message sending."
         )
         return
 
-    url = f"{settings.WHATSAPP_SERVER_URL}/message/sendText/{settings.WHATSAPP_SERVER_INSTANCE_NAME}"
-    headers = {"apikey": settings.WHATSAPP_SERVER_API_KEY}
     delay = calculate_delay(message)
     payload = {"number": phone_number, "text": message, "delay": delay}
-
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(url, headers=headers, json=payload)
-            res.raise_for_status()
-            try:
-                response_data = res.json()
-                log_message = response_data.get("message", {}).get(
-                    "conversation", res.text
-                )
-            except json.JSONDecodeError:
-                log_message = res.text
-            logger.debug(
-                f"Successfully sent WhatsApp message to {phone_number}. Response: {log_message}"
-            )
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                f"Failed to send WhatsApp message to {phone_number}. Status: {e.response.status_code}, Response: {e.response.text}"
-            )
-        except httpx.ReadTimeout:
-            # This is an expected timeout from the WhatsApp API which doesn't affect functionality.
-            # We can safely ignore it.
-            pass
-        except Exception as e:
-            logger.error(
-                f"An unexpected error occurred while sending WhatsApp message to {phone_number}: {e}",
-                exc_info=True,
-            )
+    dispatcher.enqueue(phone_number, "sendText", payload)
 
 
-async def send_whatsapp_media_file(
+def send_whatsapp_media_file(
+    dispatcher: WhatsAppDispatcher,
     phone_number: str,
     media_type: str,
     mime_type: str,
@@ -142,22 +128,14 @@ async def send_whatsapp_media_file(
     caption: Optional[str] = None,
 ):
     """
-    Sends a media file to a phone number using the WhatsApp API.
+    Queues a media file to a phone number for delivery through the WhatsApp API.
     """
-    if not all(
-        [
-            settings.WHATSAPP_SERVER_URL,
-            settings.WHATSAPP_SERVER_API_KEY,
-            settings.WHATSAPP_SERVER_INSTANCE_NAME,
-        ]
-    ):
+    if not dispatcher or not dispatcher.is_configured:
         logger.warning(
             "WhatsApp server settings are not configured. Skipping message sending."
         )
         return
 
-    url = f"{settings.WHATSAPP_SERVER_URL}/message/sendMedia/{settings.WHATSAPP_SERVER_INSTANCE_NAME}"
-    headers = {"apikey": settings.WHATSAPP_SERVER_API_KEY}
     payload = {
         "number": phone_number,
         "mediatype": media_type,
@@ -168,52 +146,13 @@ async def send_whatsapp_media_file(
     if caption:
         payload["caption"] = caption
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(url, headers=headers, json=payload)
-            res.raise_for_status()
-            try:
-                response_data = res.json()
-                # Use caption in logs if present, otherwise fallback to text
-                log_message = response_data.get("message", {}).get(
-                    "caption", res.text
-                )
-            except json.JSONDecodeError:
-                log_message = res.text
-            logger.debug(
-                f"Successfully sent WhatsApp media file to {phone_number}. Response: {log_message}"
-            )
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                f"Failed to send WhatsApp media file to {phone_number}. Status: {e.response.status_code}, Response: {e.response.text}"
-            )
-        except httpx.ReadTimeout:
-            # This is an expected timeout from the WhatsApp API which doesn't affect functionality.
-            # We can safely ignore it.
-            pass
-        except Exception as e:
-            logger.error(
-                f"An unexpected error occurred while sending WhatsApp media file to {phone_number}: {e}",
-                exc_info=True,
-            )
+    dispatcher.enqueue(phone_number, "sendMedia", payload)
 
 
-async def send_whatsapp_text_list_message(phone_number: str):
+def send_whatsapp_text_list_message(dispatcher: WhatsAppDispatcher, phone_number: str):
     """
-    Sends a text-based list message for WhatsApp Web users.
+    Queues a text-based list message for WhatsApp Web users.
     """
-    if not all(
-        [
-            settings.WHATSAPP_SERVER_URL,
-            settings.WHATSAPP_SERVER_API_KEY,
-            settings.WHATSAPP_SERVER_INSTANCE_NAME,
-        ]
-    ):
-        logger.warning(
-            "WhatsApp server settings are not configured. Skipping message sending."
-        )
-        return
-
     message = (
         f"{SPECIAL_LIST_TITLE}\n"
         f"{SPECIAL_LIST_DESCRIPTION}\n\n"
@@ -225,117 +164,106 @@ async def send_whatsapp_text_list_message(phone_number: str):
         f"6️⃣. {SPECIAL_LIST_SIXTH_OPTION}\n"
         f"\n{WHATSAPP_WEB_INSTRUCTIONS_MESSAGE}"
     )
-    await send_whatsapp_message(phone_number, message)
-    logger.debug(f"Successfully sent WhatsApp text list message to {phone_number}.")
+    send_whatsapp_message(dispatcher, phone_number, message)
+    logger.debug(f"Queued WhatsApp text list message to {phone_number}.")
 
 
+def extract_message_text(message: Optional[WebhookMessage]) -> Optional[str]:
+    """Extracts the text typed or selected by the user from a webhook message."""
+    if not message:
+        return None
+    if message.conversation:
+        return message.conversation
+    if message.listResponseMessage and message.listResponseMessage.title:
+        return message.listResponseMessage.title
+    return None
 
-async def process_webhook_event(
-    event: WebhookEvent, client: genai.Client, sheets_service: GoogleSheetsService
-):
-    """
-    Processes a single webhook event in the background.
-    """
-    session_id = None
-    if event.data.key and event.data.key.remoteJid:
-        session_id = event.data.key.remoteJid.split("@")[0]
 
-    from_me = event.data.key.fromMe
-    event_type = event.event
+async def _reset_session(session_id: str, dispatcher: WhatsAppDispatcher):
+    """Soft deletes the interaction of a session after a RESET command."""
+    logger.debug(f"Received RESET command for session_id: {session_id}")
+    async with AsyncSessionFactory() as db:
+        interaction = await db.get(models.Interaction, session_id)
+        if interaction:
+            # Generate new session_id for the deleted conversation
+            random_uuid = str(uuid.uuid4())[:8]
+            new_session_id = f"DELETED-{session_id}-{random_uuid}"
+
+            # Update the session_id and mark as deleted
+            interaction.session_id = new_session_id
+            interaction.is_deleted = True
+            await db.commit()
+            logger.debug(
+                f"Soft deleted interaction for session_id: {session_id}, new session_id: {new_session_id}"
+            )
+        else:
+            logger.debug(
+                f"No interaction found for session_id: {session_id}, nothing to reset."
+            )
+    send_whatsapp_message(dispatcher, session_id, "El chat ha sido reiniciado")
 
-    # Basic filtering for events to process
-    if not (event_type == "messages.upsert" and not from_me and session_id):
-        has_message = bool(event.data.message)
-        logger.debug(
-            f"Skipping webhook event processing. Details: event_type='{event_type}', from_me={from_me}, has_session_id={bool(session_id)}, has_message={has_message}"
-        )
-        return
 
+async def _process_user_messages(
+    session_id: str,
+    message_texts: list[str],
+    push_name: Optional[str],
+    client: genai.Client,
+    sheets_service: GoogleSheetsService,
+    dispatcher: WhatsAppDispatcher,
+):
+    """
+    Runs one chat turn for a session. Messages sent in a burst are merged
+    into a single user message before the chat router is called.
+    """
     phone_number = session_id
 
-    # Handle non-text messages
-    if detect_non_text_message(event.data.message):
-        logger.debug(
-            f"Detected non-text message for session_id: {session_id}. Sending reply and stopping."
-        )
-        if phone_number:
-            await send_whatsapp_message(phone_number, MESSAGE_NON_TEXT_MESSAGES_NOT_ACCEPTED)
-        return
-
-    # Extract text from message
-    message_text = None
-    if event.data.message:
-        if event.data.message.conversation:
-            message_text = event.data.message.conversation
-        elif (
-            event.data.message.listResponseMessage
-            and event.data.message.listResponseMessage.title
-        ):
-            message_text = event.data.message.listResponseMessage.title
-
-    if not message_text:
-        logger.debug(
-            f"Skipping webhook event with no text content for session_id: {session_id}"
-        )
-        return
-
     async with AsyncSessionFactory() as db:
         interaction = await db.get(models.Interaction, session_id)
 
         # Handle numeric input if a text list was previously sent to a web client
         if interaction and interaction.interaction_data and interaction.interaction_data.get("text_list_sent_to_web"):
-            if message_text.strip() in TEXT_LIST_OPTIONS:
-                logger.debug(f"Mapping numeric input '{message_text.strip()}' for session {session_id}")
-                message_text = TEXT_LIST_OPTIONS[message_text.strip()]
-                interaction.interaction_data["text_list_sent_to_web"] = False
-                flag_modified(interaction, "interaction_data")
-                await db.commit()
+            mapped_texts = []
+            for message_text in message_texts:
+                if message_text.strip() in TEXT_LIST_OPTIONS:
+                    logger.debug(f"Mapping numeric input '{message_text.strip()}' for session {session_id}")
+                    message_text = TEXT_LIST_OPTIONS[message_text.strip()]
+                    interaction.interaction_data["text_list_sent_to_web"] = False
+                    flag_modified(interaction, "interaction_data")
+                mapped_texts.append(message_text)
+            message_texts = mapped_texts
+            await db.commit()
 
         # Process text messages
-        logger.debug(f"Processing webhook for session_id: {session_id}")
-
-        if message_text.strip().upper() == "RESET":
-            logger.debug(f"Received RESET command for session_id: {session_id}")
-            if interaction:
-                # Generate new session_id for the deleted conversation
-                random_uuid = str(uuid.uuid4())[:8]
-                new_session_id = f"DELETED-{session_id}-{random_uuid}"
-
-                # Update the session_id and mark as deleted
-                interaction.session_id = new_session_id
-                interaction.is_deleted = True
-                await db.commit()
-                logger.debug(
-                    f"Soft deleted interaction for session_id: {session_id}, new session_id: {new_session_id}"
-                )
-            else:
-                logger.debug(
-                    f"No interaction found for session_id: {session_id}, nothing to reset."
-                )
-            if phone_number:
-                await send_whatsapp_message(phone_number, "El chat ha sido reiniciado")
-            return
+        logger.debug(
+            f"Processing webhook for session_id: {session_id} ({len(message_texts)} message(s))"
+        )
 
         user_data = {}
         if phone_number:
             user_data["phoneNumber"] = phone_number
-        if event.data.pushName:
-            user_data["tagName"] = event.data.pushName
+        if push_name:
+            user_data["tagName"] = push_name
 
         interaction_message = InteractionMessage(
-            role=InteractionType.USER, message=message_text
+            role=InteractionType.USER, message="\n".join(message_texts)
         )
         interaction_request = InteractionRequest(
             sessionId=session_id, message=interaction_message, userData=user_data
         )
+        response = None
+        sink = None
         try:
-            # We use the existing 'db' session for the logic call
-            response = await _chat_router_logic(
-                interaction_request, client, sheets_service, db
-            )
+            # Replies streamed by Gemini are sent as they are generated.
+            with reply_sink(
+                lambda chunk: send_whatsapp_message(dispatcher, phone_number, chunk)
+            ) as sink:
+                # We use the existing 'db' session for the logic call
+                response = await _chat_router_logic(
+                    interaction_request, client, sheets_service, db
+                )
             if phone_number:
                 if response.toolCall == "send_special_list_message":
-                    await send_whatsapp_text_list_message(phone_number)
+                    send_whatsapp_text_list_message(dispatcher, phone_number)
                     # The interaction is updated inside _chat_router_logic, so we fetch it again
                     interaction_after_logic = await db.get(models.Interaction, session_id)
                     if interaction_after_logic:
@@ -361,7 +289,8 @@ async def process_webhook_event(
                             caption = video_info.get("caption")
                             if video_file:
                                 media_url = f"{settings.BUCKET_URL}/{video_file}"
-                                await send_whatsapp_media_file(
+                                send_whatsapp_media_file(
+                                    dispatcher,
                                     phone_number=phone_number,
                                     media_type="video",
                                     mime_type="video/mp4",
@@ -371,49 +300,166 @@ async def process_webhook_event(
                                 )
                 elif response.messages:
                     for msg in response.messages:
-                        await send_whatsapp_message(phone_number, msg.message)
+                        unsent_text = sink.unsent_part(msg.message)
+                        if unsent_text:
+                            send_whatsapp_message(
+                                dispatcher, phone_number, unsent_text
+                            )
         except Exception as e:
             logger.error(
                 f"Error processing webhook event for session {session_id}: {e}",
                 exc_info=True,
             )
+            # The turn was not saved, so the job queue retries it. Failures
+            # after the reply was produced, or after part of it was streamed
+            # to the user, are not retried, to avoid answering twice.
+            if response is None and not (sink and sink.has_sent):
+                raise
+
+
+async def process_webhook_events(
+    events: list[WebhookEvent],
+    client: genai.Client,
+    sheets_service: GoogleSheetsService,
+    dispatcher: WhatsAppDispatcher,
+    complete: Optional[JobCompletion] = None,
+):
+    """
+    Processes, in order, a burst of webhook events sent by the same user.
+    Consecutive text messages are coalesced into a single chat turn, while
+    RESET commands and non-text messages are handled where they occur.
+    After each of them, `complete` is called with the number of events
+    handled so far, so a retry of the burst does not repeat them.
+    """
+
+    async def mark_handled(count: int):
+        if complete:
+            await complete(count)
+
+    pending_texts: list[str] = []
+    pending_session_id: Optional[str] = None
+    push_name: Optional[str] = None
+
+    async def flush():
+        nonlocal pending_texts, push_name
+        if pending_texts:
+            if len(pending_texts) > 1:
+                logger.debug(
+                    f"Coalescing {len(pending_texts)} messages into one turn for session_id: {pending_session_id}"
+                )
+            await _process_user_messages(
+                pending_session_id,
+                pending_texts,
+                push_name,
+                client,
+                sheets_service,
+                dispatcher,
+            )
+        pending_texts = []
+        push_name = None
+
+    for index, event in enumerate(events):
+        session_id = get_session_id(event)
+        from_me = event.data.key.fromMe
+        event_type = event.event
+
+        # Basic filtering for events to process
+        if not (event_type == "messages.upsert" and not from_me and session_id):
+            has_message = bool(event.data.message)
+            logger.debug(
+                f"Skipping webhook event processing. Details: event_type='{event_type}', from_me={from_me}, has_session_id={bool(session_id)}, has_message={has_message}"
+            )
+            continue
+
+        if session_id != pending_session_id:
+            await flush()
+            await mark_handled(index)
+            pending_session_id = session_id
+
+        # Handle non-text messages
+        if detect_non_text_message(event.data.message):
+            logger.debug(
+                f"Detected non-text message for session_id: {session_id}. Sending reply."
+            )
+            await flush()
+            await mark_handled(index)
+            send_whatsapp_message(
+                dispatcher, session_id, MESSAGE_NON_TEXT_MESSAGES_NOT_ACCEPTED
+            )
+            await mark_handled(index + 1)
+            continue
+
+        message_text = extract_message_text(event.data.message)
+        if not message_text:
+            logger.debug(
+                f"Skipping webhook event with no text content for session_id: {session_id}"
+            )
+            continue
+
+        if message_text.strip().upper() == "RESET":
+            await flush()
+            await mark_handled(index)
+            await _reset_session(session_id, dispatcher)
+            await mark_handled(index + 1)
+            continue
+
+        pending_texts.append(message_text)
+        push_name = event.data.pushName or push_name
+
+    await flush()
+    await mark_handled(len(events))
+
+
+async def process_webhook_event(
+    event: WebhookEvent,
+    client: genai.Client,
+    sheets_service: GoogleSheetsService,
+    dispatcher: WhatsAppDispatcher,
+):
+    """
+    Processes a single webhook event in the background.
+    """
+    await process_webhook_events([event], client, sheets_service, dispatcher)
+
+
+async def process_webhook_jobs(
+    payloads: list[dict],
+    complete: JobCompletion,
+    client: genai.Client,
+    sheets_service: GoogleSheetsService,
+    dispatcher: WhatsAppDispatcher,
+):
+    """
+    Processes the webhook events of a session claimed together from the job queue.
+    """
+    events = [WebhookEvent.model_validate(payload) for payload in payloads]
+    await process_webhook_events(events, client, sheets_service, dispatcher, complete)
 
 
 @router.post(f"/webhook/{settings.SECRET_PATH}", status_code=200)
 async def handle_webhook(
     request: Request,
-    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Handles incoming webhooks from the Evolution API.
+    Events are stored in the job queue and processed by the worker pool.
     """
     logger.debug(f"Received webhook on path: /webhook/{settings.SECRET_PATH}")
-    client: genai.Client = request.app.state.genai_client
-    sheets_service: GoogleSheetsService = request.app.state.sheets_service
 
-    payload_json = None
+    body = await request.body()
     try:
-        payload_json = await request.json()
-        logger.debug(f"Webhook payload: {json.dumps(payload_json, indent=2)}")
-
-        # Handle both single object and list of objects
-        events_to_process = (
-            payload_json if isinstance(payload_json, list) else [payload_json]
-        )
-
-        # Manually validate the payload.
-        payload = [WebhookEvent.model_validate(p) for p in events_to_process]
-
+        # Only incoming user messages are validated; status updates, presence
+        # and our own messages are discarded from the raw JSON.
+        payload = parse_webhook_events(body)
     except json.JSONDecodeError:
-        raw_body = await request.body()
         logger.error(
-            f"Failed to decode webhook JSON. Raw body: {raw_body.decode('utf-8', errors='ignore')}"
+            f"Failed to decode webhook JSON. Raw body: {body.decode('utf-8', errors='ignore')}"
         )
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
     except ValidationError as e:
         logger.error(f"Webhook payload validation failed: {e}")
-        if payload_json:
-            logger.error(f"Offending payload: {json.dumps(payload_json, indent=2)}")
+        logger.error(f"Offending payload: {body.decode('utf-8', errors='ignore')}")
         raise HTTPException(status_code=422, detail=e.errors())
     except Exception as e:
         logger.error(
@@ -421,7 +467,40 @@ async def handle_webhook(
         )
         raise HTTPException(status_code=500, detail="Internal server error")
 
-    for event in payload:
-        background_tasks.add_task(process_webhook_event, event, client, sheets_service)
+    if not payload:
+        return {"status": "ok"}
+
+    # Drop events Evolution redelivered after a timeout. Ids accepted by this
+    # process are rejected from memory; the rest are claimed in the same
+    # transaction as the enqueue.
+    deduplicator = request.app.state.webhook_deduplicator
+    message_ids = [get_message_id(event) for event in payload]
+    candidate_ids = [
+        message_id
+        for message_id in message_ids
+        if message_id and not deduplicator.is_recent(message_id)
+    ]
+    new_ids = await deduplicator.claim(db, candidate_ids)
+
+    events = []
+    accepted_ids = set()
+    for event, message_id in zip(payload, message_ids):
+        if message_id is not None:
+            if message_id not in new_ids or message_id in accepted_ids:
+                logger.debug(f"Dropping duplicate webhook for message id: {message_id}")
+                continue
+            accepted_ids.add(message_id)
+        events.append(event)
+
+    if not events:
+        return {"status": "ok"}
+
+    await enqueue_webhook_events(
+        db,
+        events=[event.model_dump(mode="json") for event in events],
+        session_ids=[get_session_id(event) for event in events],
+    )
+    deduplicator.remember(accepted_ids)
+    request.app.state.webhook_worker_pool.notify()
 
     return {"status": "ok"}
@@ -46,12 +46,43 @@ class Settings(BaseSettings):
     # Google Sheets
     GOOGLE_SHEET_ID_CLIENTES_POTENCIALES: Optional[str] = None
     GOOGLE_SHEET_ID_EXPORT: Optional[str] = None
+    GOOGLE_SHEETS_THREAD_POOL_SIZE: int = 4
+    GOOGLE_SHEETS_HANDLE_TTL_SECONDS: int = 3600
+    GOOGLE_SHEETS_WARMUP_TIMEOUT_SECONDS: float = 10.0
+    NIT_INDEX_REFRESH_SECONDS: float = 300.0
+    NIT_INDEX_PERSISTENT: bool = True
 
     # Google GenAI
     GOOGLE_GENAI_USE_VERTEXAI: bool = False
     GOOGLE_CLOUD_PROJECT: Optional[str] = None
     GOOGLE_CLOUD_LOCATION: Optional[str] = None
     GOOGLE_API_KEY: Optional[str] = None
+    GEMINI_MAX_RETRIES_PER_MODEL: int = 2
+    GEMINI_ATTEMPT_TIMEOUT_SECONDS: float = 45.0
+    GEMINI_RETRY_INITIAL_DELAY: float = 1.0
+    GEMINI_RETRY_BACKOFF_FACTOR: float = 2.0
+    GEMINI_RETRY_MAX_DELAY: float = 8.0
+    GEMINI_RETRY_JITTER: float = 0.5
+    GEMINI_HEDGING_ENABLED: bool = False
+    GEMINI_HEDGE_PERCENTILE: float = 95.0
+    GEMINI_HEDGE_DEFAULT_DELAY: float = 10.0
+    GEMINI_HEDGE_MIN_DELAY: float = 2.0
+    GEMINI_HEDGE_MAX_DELAY: float = 20.0
+    GEMINI_LATENCY_WINDOW: int = 200
+    GEMINI_LATENCY_MIN_SAMPLES: int = 20
+    GEMINI_CONCURRENCY_INITIAL: int = 16
+    GEMINI_CONCURRENCY_MIN: int = 2
+    GEMINI_CONCURRENCY_MAX: int = 64
+    GEMINI_LATENCY_TARGET_SECONDS: float = 20.0
+    GEMINI_CONCURRENCY_DECREASE_FACTOR: float = 0.7
+    GEMINI_CONCURRENCY_DECREASE_COOLDOWN: float = 2.0
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    GEMINI_CIRCUIT_RESET_SECONDS: float = 30.0
+    GEMINI_STREAMING_ENABLED: bool = False
+    GEMINI_STREAMING_FIRST_CHUNK_MIN_CHARS: int = 80
+    TIPO_DE_INTERACCION_SPECULATIVE_AUTOPILOT: bool = False
+    TIPO_DE_INTERACCION_SPECULATIVE_MAX_CHARS: int = 20
+    TOOL_TIMEOUT_SECONDS: float = 20.0
 
     # Google Storage
     BUCKET_URL: Optional[str] = None
@@ -61,6 +92,48 @@ class Settings(BaseSettings):
     WHATSAPP_SERVER_URL: Optional[str] = None
     WHATSAPP_SERVER_API_KEY: Optional[str] = None
     WHATSAPP_SERVER_INSTANCE_NAME: Optional[str] = None
+    EVOLUTION_HTTP_MAX_CONNECTIONS: int = 50
+    EVOLUTION_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    EVOLUTION_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    EVOLUTION_HTTP_CONNECT_TIMEOUT: float = 5.0
+    EVOLUTION_HTTP_TIMEOUT: float = 10.0
+    EVOLUTION_HTTP2: bool = False
+    WHATSAPP_RATE_LIMIT_PER_SECOND: float = 10.0
+    WHATSAPP_RATE_LIMIT_BURST: int = 20
+    WHATSAPP_SEND_MAX_RETRIES: int = 4
+    WHATSAPP_SEND_BACKOFF_INITIAL: float = 0.5
+    WHATSAPP_SEND_BACKOFF_MAX: float = 30.0
+    WHATSAPP_RECIPIENT_IDLE_TIMEOUT: float = 60.0
+
+    # Sheet export outbox
+    SHEET_EXPORT_BATCH_SIZE: int = 50
+    SHEET_EXPORT_FLUSH_INTERVAL: float = 10.0
+    SHEET_EXPORT_MAX_ATTEMPTS: int = 8
+    SHEET_EXPORT_RETRY_DELAY: float = 30.0
+    SHEET_EXPORT_VISIBILITY_TIMEOUT: int = 300
+    SHEET_EXPORT_RETENTION_DAYS: int = 30
+
+    # Commercial agent directory
+    COMMERCIAL_AGENT_DIRECTORY_SIZE: int = 1024
+    COMMERCIAL_AGENT_DIRECTORY_TTL_SECONDS: int = 604800
+    COMMERCIAL_AGENT_DIRECTORY_PERSISTENT: bool = True
+
+    # Classification cache
+    CLASSIFICATION_CACHE_SIZE: int = 2048
+    CLASSIFICATION_CACHE_TTL_SECONDS: int = 21600
+    CLASSIFICATION_CACHE_PERSISTENT: bool = False
+
+    # Webhook job queue
+    WEBHOOK_WORKER_CONCURRENCY: int = 8
+    WEBHOOK_QUEUE_POLL_INTERVAL: float = 1.0
+    WEBHOOK_JOB_MAX_ATTEMPTS: int = 3
+    WEBHOOK_JOB_RETRY_DELAY: float = 5.0
+    WEBHOOK_JOB_VISIBILITY_TIMEOUT: int = 300
+    WEBHOOK_SESSION_DEBOUNCE_SECONDS: float = 1.5
+    WEBHOOK_SESSION_MAX_WAIT_SECONDS: float = 6.0
+    WEBHOOK_DEDUPE_CACHE_SIZE: int = 10000
+    WEBHOOK_DEDUPE_TTL_SECONDS: int = 86400
+    WEBHOOK_DEDUPE_SWEEP_INTERVAL: float = 3600.0
 
     @field_validator("DATABASE_URL", mode="before")
     @classmethod
@@ -1,4 +1,15 @@
-from sqlalchemy import Column, String, JSON, Boolean
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    JSON,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 
 from .db import Base
@@ -17,3 +28,140 @@ class Interaction(Base):
     interaction_data = Column(JSON, nullable=True)
     user_data = Column(JSON, nullable=True)
     is_deleted = Column(Boolean, default=False, nullable=False)
+
+
+class WebhookJob(Base):
+    """
+    Represents a webhook event waiting to be processed by the worker pool.
+    """
+
+    __tablename__ = "webhook_jobs"
+    __table_args__ = (
+        Index("ix_webhook_jobs_status_available_at", "status", "available_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    session_id = Column(String, nullable=True, index=True)
+    payload = Column(JSONB, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class WhatsAppDeadLetter(Base):
+    """
+    Represents an outbound WhatsApp message that could not be delivered.
+    """
+
+    __tablename__ = "whatsapp_dead_letters"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    phone_number = Column(String, nullable=False, index=True)
+    action = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    status_code = Column(Integer, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class ProcessedWebhookMessage(Base):
+    """
+    Represents a WhatsApp message id that has already been accepted by the
+    webhook, used to drop redelivered events.
+    """
+
+    __tablename__ = "processed_webhook_messages"
+
+    message_id = Column(String, primary_key=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+    )
+
+
+class ClassificationCacheEntry(Base):
+    """
+    Represents a cached result of the interaction type classification,
+    keyed on a fingerprint of the normalized conversation history.
+    """
+
+    __tablename__ = "classification_cache"
+
+    fingerprint = Column(String, primary_key=True)
+    result = Column(JSONB, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class CommercialAgent(Base):
+    """
+    Represents the cleaned details of a commercial agent from the NITS
+    sheet, keyed on a fingerprint of the raw name, email and phone.
+    """
+
+    __tablename__ = "commercial_agents"
+
+    fingerprint = Column(String, primary_key=True)
+    responsable_comercial = Column(String, nullable=False)
+    email = Column(String, nullable=False)
+    telefono = Column(String, nullable=False)
+    result = Column(JSONB, nullable=False)
+    source = Column(String, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class SheetExport(Base):
+    """
+    Represents a row waiting to be appended to an export worksheet. Rows
+    are flushed in batches and kept as 'sent' once the append succeeds.
+    """
+
+    __tablename__ = "sheet_exports"
+    __table_args__ = (
+        Index("ix_sheet_exports_status_available_at", "status", "available_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    spreadsheet_id = Column(String, nullable=False)
+    worksheet_name = Column(String, nullable=False)
+    row_values = Column(JSONB, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class NitSnapshot(Base):
+    """
+    Represents the last NITS sheet data synced by the NIT index, used to
+    start without Google Sheets and to answer while it is unavailable.
+    """
+
+    __tablename__ = "nit_snapshots"
+
+    spreadsheet_id = Column(String, primary_key=True)
+    revision = Column(String, nullable=True)
+    data = Column(JSONB, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    synced_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
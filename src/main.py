@@ -1,7 +1,10 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from functools import partial
 
 from fastapi import FastAPI, Request
+from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
 import google.genai as genai
 
@@ -15,9 +18,18 @@ from src.api.usuario_administrativo import router as usuario_administrativo
 from src.api.candidato_a_empleo import router as candidato_a_empleo
 from src.api.transportista import router as transportista
 from src.api.webhook import router as webhook_router
+from src.api.webhook.router import process_webhook_jobs
 from src.config import settings
 from src.database.db import engine, test_db_connection
+from src.services.evolution_api import EvolutionAPIClient
+from src.services.gemini_guard import gemini_circuit_breakers, gemini_limiter
+from src.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry
+from src.services.whatsapp_dispatcher import WhatsAppDispatcher
 from src.services.google_sheets import GoogleSheetsService
+from src.services.nit_index import NITS_WORKSHEET_NAME, nit_index
+from src.services.sheet_exports import EXPORT_WORKSHEET_NAMES, sheet_exporter
+from src.services.webhook_dedupe import WebhookDeduplicator
+from src.services.webhook_queue import WebhookWorkerPool
 from src.shared.schemas import HealthResponse
 
 log_level = settings.LOG_LEVEL.upper()
@@ -52,6 +64,9 @@ async def lifespan(app: FastAPI):
         project=settings.GOOGLE_CLOUD_PROJECT,
         location=settings.GOOGLE_CLOUD_LOCATION,
     )
+    # Shared by every Gemini call made through invoke_model_with_retries.
+    app.state.gemini_limiter = gemini_limiter
+    app.state.gemini_circuit_breakers = gemini_circuit_breakers
     logger.info("Google GenAI Client initialized.")
 
     try:
@@ -61,9 +76,53 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize Google Sheets Service: {e}")
         app.state.sheets_service = None
 
+    if app.state.sheets_service:
+        # Bounded, so a Sheets outage does not hold startup; the NIT index
+        # can still answer from its snapshot.
+        try:
+            await asyncio.wait_for(
+                app.state.sheets_service.warm_worksheets(
+                    [(settings.GOOGLE_SHEET_ID_CLIENTES_POTENCIALES, NITS_WORKSHEET_NAME)]
+                    + [(settings.GOOGLE_SHEET_ID_EXPORT, name) for name in EXPORT_WORKSHEET_NAMES]
+                ),
+                timeout=settings.GOOGLE_SHEETS_WARMUP_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Google Sheets worksheet warm-up timed out. Continuing startup.")
+
+    app.state.nit_index = nit_index
+    await app.state.nit_index.start(app.state.sheets_service)
+    app.state.sheet_exporter = sheet_exporter
+    await app.state.sheet_exporter.start(app.state.sheets_service)
+
+    app.state.evolution_client = EvolutionAPIClient()
+    app.state.whatsapp_dispatcher = WhatsAppDispatcher(app.state.evolution_client)
+    logger.info("Evolution API client initialized.")
+
+    app.state.webhook_deduplicator = WebhookDeduplicator()
+    await app.state.webhook_deduplicator.start()
+
+    app.state.webhook_worker_pool = WebhookWorkerPool(
+        handler=partial(
+            process_webhook_jobs,
+            client=app.state.genai_client,
+            sheets_service=app.state.sheets_service,
+            dispatcher=app.state.whatsapp_dispatcher,
+        )
+    )
+    await app.state.webhook_worker_pool.start()
+
     yield
     # Shutdown
     logger.info("Shutting down application...")
+    await app.state.webhook_worker_pool.stop()
+    await app.state.whatsapp_dispatcher.stop()
+    await app.state.webhook_deduplicator.stop()
+    await app.state.nit_index.stop()
+    await app.state.sheet_exporter.stop()
+    if app.state.sheets_service:
+        app.state.sheets_service.close()
+    await app.state.evolution_client.close()
     await engine.dispose()
 
 
@@ -95,3 +154,11 @@ async def health_check(request: Request):
         db_connection="ok" if db_ok else "failed",
         sheets_connection="ok" if sheets_ok else "failed",
     )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Exposes Gemini usage, latency and tool metrics in the Prometheus text format.
+    """
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,354 @@
+import asyncio
+import hashlib
+import logging
+import re
+from typing import Optional
+
+import google.genai as genai
+from cachetools import TTLCache
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+
+from src.config import settings
+from src.database import models
+from src.database.db import AsyncSessionFactory
+from src.services.metrics import registry
+from src.shared.constants import GEMINI_MODEL
+from src.shared.tools import limpiar_datos_agente_comercial
+from src.shared.utils.functions import invoke_model_with_retries
+from src.shared.utils.tool_registry import get_generate_config
+from src.shared.utils.validations import _normalize_text
+
+logger = logging.getLogger(__name__)
+
+SOURCE_RULES = "rules"
+SOURCE_MODEL = "model"
+
+# Values the NITS sheet uses when there is no agent or contact detail.
+INVALID_AGENT_MARKERS = {
+    "",
+    "-",
+    "na",
+    "n a",
+    "no aplica",
+    "no asignado",
+    "sin asignar",
+    "sin responsable",
+    "ninguno",
+    "no disponible",
+    "no encontrado",
+    "error de sistema",
+    "pendiente",
+}
+
+# Names with particles ("DE LA TORRE") cannot be split into surnames and
+# given names without guessing, so they are left to the model.
+NAME_PARTICLES = {"de", "del", "la", "las", "los", "y", "san"}
+
+_EMAIL_PATTERN = re.compile(r"^[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}$")
+
+CLEANING_SYSTEM_PROMPT = "Eres un experto en limpieza de datos. Analiza los datos del agente comercial y determina si son válidos."
+
+
+def _marker(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", _normalize_text(value)).strip()
+
+
+def _is_invalid_marker(value: str) -> bool:
+    marker = _marker(value)
+    return marker in INVALID_AGENT_MARKERS or "sin responsable" in marker
+
+
+def _clean_email(email: str) -> Optional[str]:
+    """Returns the email, "" if there is none, or None if it needs the model."""
+    if _is_invalid_marker(email):
+        return ""
+    email = email.strip().lower()
+    return email if _EMAIL_PATTERN.match(email) else None
+
+
+def _clean_phone(phone: str) -> Optional[str]:
+    """Returns the phone, "" if there is none, or None if it needs the model."""
+    if _is_invalid_marker(phone):
+        return ""
+    if re.fullmatch(r"[\d\s()+.-]+", phone.strip()) is None:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    return digits if 7 <= len(digits) <= 12 else None
+
+
+def _format_name(name: str) -> Optional[str]:
+    """
+    Formats an agent name as "Nombres Apellidos", or returns None if the
+    order cannot be told apart without the model. The sheet writes names as
+    "APELLIDOS NOMBRES", so an upper-case name of two surnames and two given
+    names is reordered; names already in mixed case are kept.
+    """
+    tokens = name.split()
+    if name != name.upper():
+        return " ".join(tokens)
+    if len(tokens) != 4 or not all(token.isalpha() for token in tokens):
+        return None
+    if any(_normalize_text(token) in NAME_PARTICLES for token in tokens):
+        return None
+    return " ".join(tokens[2:] + tokens[:2]).title()
+
+
+def clean_agent_with_rules(
+    responsable_comercial: str, email: str, telefono: str
+) -> Optional[dict]:
+    """
+    Cleans an agent's data with deterministic rules, in the format of
+    `limpiar_datos_agente_comercial`. Returns None when a value is ambiguous.
+    """
+    if _is_invalid_marker(responsable_comercial):
+        return {
+            "agente_valido": False,
+            "razon": f"Responsable comercial no válido: {responsable_comercial!r}",
+        }
+
+    nombre_formateado = _format_name(responsable_comercial)
+    email_valido = _clean_email(email)
+    telefono_valido = _clean_phone(telefono)
+    if nombre_formateado is None or email_valido is None or telefono_valido is None:
+        return None
+
+    return limpiar_datos_agente_comercial(
+        agente_valido=True,
+        nombre_formateado=nombre_formateado,
+        email_valido=email_valido,
+        telefono_valido=telefono_valido,
+    )
+
+
+def agent_fingerprint(responsable_comercial: str, email: str, telefono: str) -> str:
+    raw = "\n".join(
+        " ".join(value.split()).upper()
+        for value in (responsable_comercial, email, telefono)
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CommercialAgentDirectory:
+    """
+    Cleaned commercial agent details, shared by every conversation. Each
+    distinct (name, email, phone) from the NITS sheet is cleaned once, by
+    rules or, if they cannot decide, by the model, and the result is kept
+    in memory and in the `commercial_agents` table. Entries are keyed on the
+    raw values, so an agent edited in the sheet gets a new entry and needs
+    no invalidation; stale entries expire with the TTL.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.COMMERCIAL_AGENT_DIRECTORY_SIZE,
+        ttl_seconds: int = settings.COMMERCIAL_AGENT_DIRECTORY_TTL_SECONDS,
+        persistent: bool = settings.COMMERCIAL_AGENT_DIRECTORY_PERSISTENT,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self._entries = TTLCache(maxsize=max_size, ttl=ttl_seconds)
+        self._pending: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.rule_cleanings = 0
+        self.model_cleanings = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "rule_cleanings": self.rule_cleanings,
+            "model_cleanings": self.model_cleanings,
+        }
+
+    async def get(self, search_result: dict, client: genai.Client) -> dict:
+        """
+        Returns the cleaned agent of a `buscar_nit` result, with the keys of
+        `limpiar_datos_agente_comercial`.
+        """
+        # The sheet may hold numbers, e.g. a phone read by get_all_records.
+        responsable_comercial = str(search_result.get("responsable_comercial") or "")
+        email = str(search_result.get("email") or "")
+        telefono = str(search_result.get("phoneNumber") or "")
+
+        if not responsable_comercial:
+            return {"agente_valido": False, "razon": "No se encontró responsable comercial"}
+
+        fingerprint = agent_fingerprint(responsable_comercial, email, telefono)
+        entry = self._entries.get(fingerprint)
+        if entry is None and self.persistent:
+            entry = await self._load(fingerprint)
+            if entry is not None:
+                self._entries[fingerprint] = entry
+        if entry is not None:
+            self.hits += 1
+            return dict(entry)
+
+        # Concurrent conversations with the same agent share one cleaning.
+        while (pending := self._pending.get(fingerprint)) is not None:
+            try:
+                return dict(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The conversation cleaning this agent was cancelled, not
+                # this one: clean it here, or wait for whoever took over.
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[fingerprint] = future
+        try:
+            entry = await self._clean(
+                fingerprint, responsable_comercial, email, telefono, client
+            )
+            future.set_result(entry)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._pending[fingerprint]
+        return dict(entry)
+
+    async def _clean(
+        self,
+        fingerprint: str,
+        responsable_comercial: str,
+        email: str,
+        telefono: str,
+        client: genai.Client,
+    ) -> dict:
+        entry = clean_agent_with_rules(responsable_comercial, email, telefono)
+        source = SOURCE_RULES
+        if entry is None:
+            entry = await _clean_agent_with_model(
+                responsable_comercial, email, telefono, client
+            )
+            if entry is None:
+                # Failures are not stored, so the next conversation retries.
+                return {"agente_valido": False, "razon": "Error al procesar los datos del agente"}
+            source = SOURCE_MODEL
+            self.model_cleanings += 1
+        else:
+            self.rule_cleanings += 1
+
+        logger.info(
+            f"Cleaned commercial agent {responsable_comercial!r} with {source}: "
+            f"valid={entry.get('agente_valido')}."
+        )
+        self._entries[fingerprint] = entry
+        if self.persistent:
+            await self._store(fingerprint, responsable_comercial, email, telefono, entry, source)
+        return entry
+
+    async def _load(self, fingerprint: str) -> Optional[dict]:
+        try:
+            async with AsyncSessionFactory() as db:
+                result = await db.execute(
+                    text(
+                        """
+                        SELECT result FROM commercial_agents
+                        WHERE fingerprint = :fingerprint
+                          AND created_at > now() - make_interval(secs => :ttl)
+                        """
+                    ),
+                    {"fingerprint": fingerprint, "ttl": float(self.ttl_seconds)},
+                )
+                return result.scalar()
+        except Exception as e:
+            logger.error(f"Failed to read the commercial agent directory: {e}")
+            return None
+
+    async def _store(
+        self,
+        fingerprint: str,
+        responsable_comercial: str,
+        email: str,
+        telefono: str,
+        entry: dict,
+        source: str,
+    ):
+        statement = insert(models.CommercialAgent).values(
+            fingerprint=fingerprint,
+            responsable_comercial=responsable_comercial,
+            email=email,
+            telefono=telefono,
+            result=entry,
+            source=source,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[models.CommercialAgent.fingerprint],
+            set_={
+                "result": statement.excluded.result,
+                "source": statement.excluded.source,
+                "created_at": text("now()"),
+            },
+        )
+        try:
+            async with AsyncSessionFactory() as db:
+                await db.execute(statement)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to write the commercial agent directory: {e}")
+
+
+async def _clean_agent_with_model(
+    responsable_comercial: str, email: str, telefono: str, client: genai.Client
+) -> Optional[dict]:
+    """Asks the model to clean an agent's data. Returns None if the call fails."""
+    cleaning_prompt = f"""
+    Analiza los siguientes datos de un agente comercial obtenidos de Google Sheets y determina si representan un agente válido:
+
+    Responsable comercial: "{responsable_comercial}"
+    Email: "{email}"
+    Teléfono: "{telefono}"
+
+    Usa la herramienta limpiar_datos_agente_comercial para procesar estos datos.
+    """
+
+    config = get_generate_config(
+        CLEANING_SYSTEM_PROMPT, tools=[limpiar_datos_agente_comercial]
+    )
+
+    try:
+        response = await invoke_model_with_retries(
+            client.aio.models.generate_content,
+            model=GEMINI_MODEL,
+            contents=[{"role": "user", "parts": [{"text": cleaning_prompt}]}],
+            config=config,
+        )
+
+        if response.function_calls:
+            function_call = response.function_calls[0]
+            if function_call.name == "limpiar_datos_agente_comercial":
+                return dict(function_call.args)
+
+        logger.warning("The model did not call limpiar_datos_agente_comercial.")
+        return None
+
+    except Exception as e:
+        logger.error(f"Error cleaning commercial agent data: {e}")
+        return None
+
+
+commercial_agent_directory = CommercialAgentDirectory()
+
+
+def _collect_directory_metrics():
+    stats = commercial_agent_directory.stats()
+    yield "commercial_agent_directory_entries", "gauge", "Cleaned commercial agents held in memory.", [({}, stats["size"])]
+    yield (
+        "commercial_agent_lookups_total",
+        "counter",
+        "Commercial agent lookups by how they were answered.",
+        [
+            ({"source": "cache"}, stats["hits"]),
+            ({"source": SOURCE_RULES}, stats["rule_cleanings"]),
+            ({"source": SOURCE_MODEL}, stats["model_cleanings"]),
+        ],
+    )
+
+
+registry.register_collector(_collect_directory_metrics)
@@ -0,0 +1,68 @@
+import importlib.util
+import logging
+import httpx
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EvolutionAPIClient:
+    """
+    A long-lived, pooled HTTP client for the Evolution API (WhatsApp server).
+    Connections are kept alive between messages, so sends after the first
+    one skip the TCP and TLS handshakes.
+    """
+
+    def __init__(self):
+        http2 = settings.EVOLUTION_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning(
+                "EVOLUTION_HTTP2 is enabled but the 'h2' package is not installed. Falling back to HTTP/1.1."
+            )
+            http2 = False
+
+        self.http_client = httpx.AsyncClient(
+            base_url=settings.WHATSAPP_SERVER_URL or "",
+            headers={"apikey": settings.WHATSAPP_SERVER_API_KEY or ""},
+            limits=httpx.Limits(
+                max_connections=settings.EVOLUTION_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.EVOLUTION_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.EVOLUTION_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.EVOLUTION_HTTP_TIMEOUT,
+                connect=settings.EVOLUTION_HTTP_CONNECT_TIMEOUT,
+            ),
+            http2=http2,
+        )
+
+    @property
+    def is_configured(self) -> bool:
+        return all(
+            [
+                settings.WHATSAPP_SERVER_URL,
+                settings.WHATSAPP_SERVER_API_KEY,
+                settings.WHATSAPP_SERVER_INSTANCE_NAME,
+            ]
+        )
+
+    async def post(self, action: str, payload: dict) -> httpx.Response:
+        """
+        Posts a payload to an Evolution API message endpoint.
+
+        Args:
+            action: The endpoint under /message, e.g. "sendText" or "sendMedia".
+            payload: The JSON body of the request.
+
+        Returns:
+            The HTTP response. Raises httpx.HTTPStatusError on non-2xx responses.
+        """
+        url = f"/message/{action}/{settings.WHATSAPP_SERVER_INSTANCE_NAME}"
+        res = await self.http_client.post(url, json=payload)
+        res.raise_for_status()
+        return res
+
+    async def close(self):
+        await self.http_client.aclose()
+
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from google.genai import errors
+
+from src.config import settings
+from src.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(errors.ServerError):
+    """Raised without calling the API when a model's circuit breaker is open."""
+
+    def __init__(self, model_name: str):
+        super().__init__(
+            503,
+            {
+                "error": {
+                    "code": 503,
+                    "message": f"Circuit breaker for model {model_name} is open.",
+                    "status": "UNAVAILABLE",
+                }
+            },
+        )
+        self.model_name = model_name
+
+
+def is_overload_error(exception: BaseException) -> bool:
+    """Returns True for errors that mean Gemini is overloaded: 5xx and 429."""
+    if isinstance(exception, errors.ServerError):
+        return True
+    return isinstance(exception, errors.ClientError) and exception.code == 429
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the number of concurrent Gemini calls. The limit grows by one
+    per window of fast successful calls and is cut multiplicatively on a
+    429, a 5xx or a call slower than the latency target (AIMD).
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = settings.GEMINI_CONCURRENCY_INITIAL,
+        min_limit: int = settings.GEMINI_CONCURRENCY_MIN,
+        max_limit: int = settings.GEMINI_CONCURRENCY_MAX,
+        latency_target: float = settings.GEMINI_LATENCY_TARGET_SECONDS,
+        decrease_factor: float = settings.GEMINI_CONCURRENCY_DECREASE_FACTOR,
+        decrease_cooldown: float = settings.GEMINI_CONCURRENCY_DECREASE_COOLDOWN,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Waits for a free slot and holds it for the duration of the block."""
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._wake_waiters()
+
+    def record(self, latency: float, overloaded: bool = False):
+        """Adjusts the limit from the outcome of a finished call."""
+        if overloaded or latency > self.latency_target:
+            now = time.monotonic()
+            # One decrease per cooldown, so a burst of failures from calls
+            # started under the old limit does not collapse it to the minimum.
+            if now - self._last_decrease >= self.decrease_cooldown:
+                previous = self.limit
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease = now
+                logger.warning(
+                    f"Gemini concurrency limit decreased from {previous:.1f} to {self.limit:.1f} "
+                    f"({'overload' if overloaded else f'latency {latency:.1f}s'})."
+                )
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._wake_waiters()
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+        }
+
+    async def _acquire(self):
+        loop = asyncio.get_running_loop()
+        while not self.has_capacity:
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass the wake-up on if this waiter was woken and cancelled.
+                self._wake_waiters()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def _wake_waiters(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+class CircuitBreaker:
+    """
+    A per-model circuit breaker. After `failure_threshold` consecutive
+    overload errors it opens and rejects calls for `reset_seconds`; then a
+    single probe call is let through and its outcome closes or reopens it.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        failure_threshold: int = settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = settings.GEMINI_CIRCUIT_RESET_SECONDS,
+    ):
+        self.model_name = model_name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+
+    def allow_request(self) -> bool:
+        now = time.monotonic()
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        if self.state == CIRCUIT_OPEN:
+            if now - self._opened_at < self.reset_seconds:
+                return False
+            self.state = CIRCUIT_HALF_OPEN
+            self._probe_started_at = now
+            logger.info(f"Circuit breaker for model {self.model_name} is half-open. Sending a probe.")
+            return True
+        # Half-open: only one probe at a time, unless the last one was lost.
+        if now - self._probe_started_at >= self.reset_seconds:
+            self._probe_started_at = now
+            return True
+        return False
+
+    def record_success(self):
+        if self.state != CIRCUIT_CLOSED:
+            logger.info(f"Circuit breaker for model {self.model_name} closed.")
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == CIRCUIT_HALF_OPEN or (
+            self.state == CIRCUIT_CLOSED
+            and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = CIRCUIT_OPEN
+            self._opened_at = time.monotonic()
+            logger.error(
+                f"Circuit breaker for model {self.model_name} opened after "
+                f"{self.consecutive_failures} consecutive failures."
+            )
+
+
+gemini_limiter = AdaptiveConcurrencyLimiter()
+
+gemini_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(model_name: str) -> CircuitBreaker:
+    breaker = gemini_circuit_breakers.get(model_name)
+    if breaker is None:
+        breaker = CircuitBreaker(model_name)
+        gemini_circuit_breakers[model_name] = breaker
+    return breaker
+
+
+_CIRCUIT_STATE_VALUES = {CIRCUIT_CLOSED: 0, CIRCUIT_HALF_OPEN: 1, CIRCUIT_OPEN: 2}
+
+
+def _collect_guard_metrics():
+    limiter_stats = gemini_limiter.stats()
+    yield "gemini_concurrency_limit", "gauge", "Current adaptive Gemini concurrency limit.", [({}, limiter_stats["limit"])]
+    yield "gemini_in_flight", "gauge", "Gemini calls in flight.", [({}, limiter_stats["in_flight"])]
+    yield "gemini_waiting", "gauge", "Gemini calls waiting for a concurrency slot.", [({}, limiter_stats["waiting"])]
+    yield (
+        "gemini_circuit_state",
+        "gauge",
+        "Circuit breaker state per model: 0 closed, 1 half-open, 2 open.",
+        [({"model": name}, _CIRCUIT_STATE_VALUES[breaker.state]) for name, breaker in gemini_circuit_breakers.items()],
+    )
+
+
+registry.register_collector(_collect_guard_metrics)
@@ -1,22 +1,74 @@
+import asyncio
 import logging
-from typing import List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
 
 import gspread
+from cachetools import TTLCache
+from gspread.urls import DRIVE_FILES_API_V3_URL, SPREADSHEET_VALUES_BATCH_URL
+from gspread.utils import rowcol_to_a1
 from google.oauth2.service_account import Credentials
 
 from src.config import settings
+from src.services.metrics import registry
 
 logger = logging.getLogger(__name__)
 
+SHEETS_CALL_LATENCY = registry.histogram(
+    "google_sheets_call_duration_seconds",
+    "Duration of Google Sheets calls.",
+    ("operation", "outcome"),
+)
+WORKSHEET_CACHE_LOOKUPS = registry.counter(
+    "google_sheets_worksheet_cache_total",
+    "Worksheet handle lookups by result.",
+    ("result",),
+)
+
 
 class GoogleSheetsService:
     """
-    A service to interact with the Google Sheets API.
+    A service to interact with the Google Sheets API. gspread is
+    synchronous, so every call runs in a dedicated, bounded thread pool and
+    the methods are awaited without blocking the event loop.
+
+    Spreadsheet and worksheet handles are cached, so reads and appends do
+    not fetch the spreadsheet metadata first. A handle is dropped when a
+    call made with it fails with a Google Sheets error.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: int = settings.GOOGLE_SHEETS_THREAD_POOL_SIZE,
+        handle_ttl_seconds: int = settings.GOOGLE_SHEETS_HANDLE_TTL_SECONDS,
+    ):
         self.creds = self._authenticate()
         self.client = gspread.authorize(self.creds)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="google-sheets"
+        )
+        # Only touched on the event loop, never from the pool's threads.
+        self._spreadsheets = TTLCache(maxsize=32, ttl=handle_ttl_seconds)
+        self._worksheets = TTLCache(maxsize=256, ttl=handle_ttl_seconds)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, operation: str, func: Callable, *args):
+        """Runs a blocking gspread call in the pool and records its latency."""
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        outcome = "error"
+        try:
+            result = await loop.run_in_executor(self._executor, partial(func, *args))
+            outcome = "success"
+            return result
+        finally:
+            SHEETS_CALL_LATENCY.observe(
+                time.monotonic() - start, operation=operation, outcome=outcome
+            )
 
     def _authenticate(self) -> Credentials:
         """
@@ -30,6 +82,8 @@ class GoogleSheetsService:
             scopes = [
                 "https://www.googleapis.com/auth/spreadsheets",
                 "https://www.googleapis.com/auth/drive.file",
+                # Read the revision of the NITS spreadsheet (get_revision).
+                "https://www.googleapis.com/auth/drive.metadata.readonly",
             ]
 
             # Handle escaped newlines in the private key from environment variables
@@ -57,7 +111,7 @@ class GoogleSheetsService:
             logger.error(f"Failed to authenticate with Google Sheets: {e}", exc_info=True)
             raise
 
-    def get_worksheet(
+    async def get_worksheet(
         self, spreadsheet_id: str, worksheet_name: str
     ) -> Optional[gspread.Worksheet]:
         """
@@ -70,25 +124,174 @@ class GoogleSheetsService:
         Returns:
             A gspread.Worksheet object or None if not found.
         """
+        key = (spreadsheet_id, worksheet_name)
+        worksheet = self._worksheets.get(key)
+        if worksheet is not None:
+            WORKSHEET_CACHE_LOOKUPS.inc(result="hit")
+            return worksheet
+        WORKSHEET_CACHE_LOOKUPS.inc(result="miss")
+
         try:
-            spreadsheet = self.client.open_by_key(spreadsheet_id)
-            worksheet = spreadsheet.worksheet(worksheet_name)
+            spreadsheet = self._spreadsheets.get(spreadsheet_id)
+            if spreadsheet is None:
+                spreadsheet = await self._run(
+                    "open_spreadsheet", self.client.open_by_key, spreadsheet_id
+                )
+                self._spreadsheets[spreadsheet_id] = spreadsheet
+            worksheet = await self._run(
+                "get_worksheet", spreadsheet.worksheet, worksheet_name
+            )
+            self._worksheets[key] = worksheet
             return worksheet
         except gspread.exceptions.SpreadsheetNotFound:
             logger.error(f"Spreadsheet with ID '{spreadsheet_id}' not found.")
+            self.invalidate(spreadsheet_id)
             return None
         except gspread.exceptions.WorksheetNotFound:
             logger.error(
                 f"Worksheet '{worksheet_name}' not found in spreadsheet '{spreadsheet_id}'."
             )
+            self.invalidate(spreadsheet_id)
             return None
         except Exception as e:
             logger.error(
                 f"An error occurred while accessing spreadsheet '{spreadsheet_id}': {e}"
             )
+            self.invalidate(spreadsheet_id)
+            return None
+
+    async def warm_worksheets(self, targets: Iterable[Tuple[Optional[str], str]]) -> int:
+        """
+        Loads the handles of the given (spreadsheet_id, worksheet_name) pairs,
+        skipping pairs without a spreadsheet id. Worksheets of one spreadsheet
+        are loaded one after another so the spreadsheet is opened once.
+
+        Returns:
+            The number of worksheets loaded.
+        """
+        by_spreadsheet: dict[str, list[str]] = {}
+        for spreadsheet_id, worksheet_name in targets:
+            if spreadsheet_id:
+                by_spreadsheet.setdefault(spreadsheet_id, []).append(worksheet_name)
+
+        async def warm_spreadsheet(spreadsheet_id: str, worksheet_names: list[str]) -> int:
+            loaded = 0
+            for worksheet_name in worksheet_names:
+                if await self.get_worksheet(spreadsheet_id, worksheet_name) is not None:
+                    loaded += 1
+            return loaded
+
+        results = await asyncio.gather(
+            *(warm_spreadsheet(sid, names) for sid, names in by_spreadsheet.items())
+        )
+        loaded = sum(results)
+        logger.info(f"Warmed {loaded} Google Sheets worksheet handle(s).")
+        return loaded
+
+    def invalidate(self, spreadsheet_id: str, worksheet_name: Optional[str] = None):
+        """
+        Drops the cached handle of a worksheet, or of a spreadsheet and all
+        its worksheets when no worksheet name is given.
+        """
+        if worksheet_name is not None:
+            self._worksheets.pop((spreadsheet_id, worksheet_name), None)
+            return
+        self._spreadsheets.pop(spreadsheet_id, None)
+        for key in [key for key in self._worksheets if key[0] == spreadsheet_id]:
+            self._worksheets.pop(key, None)
+
+    def _invalidate_on_error(self, worksheet: gspread.Worksheet, error: Exception):
+        if isinstance(error, gspread.exceptions.GSpreadException):
+            self.invalidate(worksheet.spreadsheet_id, worksheet.title)
+
+    async def get_revision(self, spreadsheet_id: str) -> Optional[str]:
+        """
+        Gets a value that changes whenever the spreadsheet changes, from the
+        Drive `version` and `modifiedTime` of the file.
+
+        Args:
+            spreadsheet_id: The ID of the Google Spreadsheet.
+
+        Returns:
+            The revision, or None if it could not be read, e.g. because the
+            spreadsheet is not shared with the service account.
+        """
+        try:
+            response = await self._run(
+                "get_revision",
+                partial(
+                    self.client.http_client.request,
+                    "get",
+                    f"{DRIVE_FILES_API_V3_URL}/{spreadsheet_id}",
+                    params={"supportsAllDrives": True, "fields": "version,modifiedTime"},
+                ),
+            )
+            metadata = response.json()
+            return f"{metadata.get('version')}:{metadata.get('modifiedTime')}"
+        except Exception as e:
+            logger.warning(f"Could not get the revision of spreadsheet '{spreadsheet_id}': {e}")
             return None
 
-    def read_data(self, worksheet: gspread.Worksheet) -> List[dict]:
+    async def read_columns(
+        self, worksheet: gspread.Worksheet, column_names: Sequence[str]
+    ) -> Tuple[dict[str, list], int]:
+        """
+        Reads only the given columns of a worksheet, identified by their
+        header in the first row, with one batchGet request.
+
+        Args:
+            worksheet: The gspread.Worksheet object to read from.
+            column_names: The headers of the columns to read.
+
+        Returns:
+            A dict of the values below each header, all of the same length,
+            with "" for empty cells and missing columns, and the number of
+            bytes received.
+        """
+        try:
+            return await self._run(
+                "read_columns", self._read_columns, worksheet, tuple(column_names)
+            )
+        except Exception as e:
+            logger.error(f"Failed to read columns from worksheet: {e}")
+            self._invalidate_on_error(worksheet, e)
+            raise
+
+    def _read_columns(
+        self, worksheet: gspread.Worksheet, column_names: Tuple[str, ...]
+    ) -> Tuple[dict[str, list], int]:
+        url = SPREADSHEET_VALUES_BATCH_URL % worksheet.spreadsheet_id
+        sheet_range = "'{}'!".format(worksheet.title.replace("'", "''"))
+
+        response = self.client.http_client.request(
+            "get", url, params={"ranges": [f"{sheet_range}1:1"]}
+        )
+        received = len(response.content)
+        header_rows = response.json()["valueRanges"][0].get("values") or [[]]
+        header = header_rows[0]
+
+        present = [name for name in column_names if name in header]
+        columns: dict[str, list] = {name: [] for name in column_names}
+        if present:
+            ranges = []
+            for name in present:
+                letter = rowcol_to_a1(1, header.index(name) + 1)[:-1]
+                ranges.append(f"{sheet_range}{letter}2:{letter}")
+            response = self.client.http_client.request(
+                "get", url, params={"ranges": ranges, "majorDimension": "COLUMNS"}
+            )
+            received += len(response.content)
+            for name, value_range in zip(present, response.json()["valueRanges"]):
+                values = value_range.get("values") or [[]]
+                columns[name] = values[0]
+
+        # The API drops trailing empty cells, so columns are padded to one length.
+        row_count = max((len(values) for values in columns.values()), default=0)
+        for values in columns.values():
+            values.extend([""] * (row_count - len(values)))
+        return columns, received
+
+    async def read_data(self, worksheet: gspread.Worksheet) -> List[dict]:
         """
         Reads all data from a worksheet as a list of dictionaries.
 
@@ -99,12 +302,13 @@ class GoogleSheetsService:
             A list of dictionaries representing the rows.
         """
         try:
-            return worksheet.get_all_records()
+            return await self._run("read_data", worksheet.get_all_records)
         except Exception as e:
             logger.error(f"Failed to read data from worksheet: {e}")
+            self._invalidate_on_error(worksheet, e)
             raise
 
-    def write_data(self, worksheet: gspread.Worksheet, data: List[List[str]]):
+    async def write_data(self, worksheet: gspread.Worksheet, data: List[List[str]]):
         """
         Writes data to a worksheet. Note: This will overwrite existing data.
 
@@ -113,13 +317,14 @@ class GoogleSheetsService:
             data: A list of lists representing the rows to write.
         """
         try:
-            worksheet.update(data)
+            await self._run("write_data", worksheet.update, data)
             logger.info(f"Successfully wrote {len(data)} rows to worksheet.")
         except Exception as e:
             logger.error(f"Failed to write data to worksheet: {e}")
+            self._invalidate_on_error(worksheet, e)
             raise
 
-    def append_row(self, worksheet: gspread.Worksheet, row: List[str]):
+    async def append_row(self, worksheet: gspread.Worksheet, row: List[str]):
         """
         Appends a single row to a worksheet.
 
@@ -128,8 +333,25 @@ class GoogleSheetsService:
             row: A list of values for the new row.
         """
         try:
-            worksheet.append_row(row)
+            await self._run("append_row", worksheet.append_row, row)
             logger.info("Successfully appended row to worksheet.")
         except Exception as e:
             logger.error(f"Failed to append row to worksheet: {e}")
+            self._invalidate_on_error(worksheet, e)
+            raise
+
+    async def append_rows(self, worksheet: gspread.Worksheet, rows: List[List[str]]):
+        """
+        Appends several rows to a worksheet in a single request.
+
+        Args:
+            worksheet: The gspread.Worksheet object to append to.
+            rows: A list of lists representing the rows to append.
+        """
+        try:
+            await self._run("append_rows", worksheet.append_rows, rows)
+            logger.info(f"Successfully appended {len(rows)} rows to worksheet.")
+        except Exception as e:
+            logger.error(f"Failed to append rows to worksheet: {e}")
+            self._invalidate_on_error(worksheet, e)
             raise
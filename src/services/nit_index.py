@@ -0,0 +1,367 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+
+from src.config import settings
+from src.database import models
+from src.database.db import AsyncSessionFactory
+from src.services.google_sheets import GoogleSheetsService
+from src.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+NITS_WORKSHEET_NAME = "NITS"
+NIT_COLUMNS = ("NIT - 10 DIGITOS", "NIT - 9 DIGITOS")
+
+# The columns of the NITS sheet `buscar_nit` returns, by result key.
+RESULT_COLUMNS = {
+    "cliente": " CLIENTE",
+    "estado": " ESTADO DEL CLIENTE",
+    "responsable_comercial": " RESPONSABLE COMERCIAL",
+    "phoneNumber": " CELULAR",
+    "email": " CORREO",
+}
+
+SYNC_OUTCOME_LOADED = "loaded"
+SYNC_OUTCOME_UNCHANGED = "unchanged"
+SYNC_OUTCOME_FAILURE = "failure"
+
+NIT_SYNCS = registry.counter(
+    "nit_index_syncs_total",
+    "NIT index syncs by outcome: loaded, unchanged or failure.",
+    ("outcome",),
+)
+NIT_SYNC_BYTES = registry.histogram(
+    "nit_index_sync_bytes",
+    "Bytes received from Google Sheets per NIT index load.",
+    buckets=(1e3, 1e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7),
+)
+NIT_SYNC_PARSE_SECONDS = registry.histogram(
+    "nit_index_sync_parse_seconds",
+    "Time spent building the NIT index from the downloaded columns.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+def normalize_nit(nit) -> str:
+    """Keeps only the digits of a NIT, so "900.123.456-7" matches 9001234567."""
+    return re.sub(r"\D", "", str(nit))
+
+
+def _status_result(status: str) -> dict:
+    return {"cliente": status, "estado": status, "responsable_comercial": status}
+
+
+class NitTable:
+    """
+    The columns of the NITS sheet used by `buscar_nit`, stored as one tuple
+    per column, and the row of each normalized 9- and 10-digit NIT.
+    """
+
+    def __init__(self, columns: dict[str, tuple], rows: dict[str, int]):
+        self.columns = columns
+        self.rows = rows
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list]) -> "NitTable":
+        """Builds the table from the columns returned by `read_columns`."""
+        stored = {
+            key: tuple(
+                value.strip() if isinstance(value, str) else value
+                for value in columns.get(column_name, ())
+            )
+            for key, column_name in RESULT_COLUMNS.items()
+        }
+        rows: dict[str, int] = {}
+        for column_name in NIT_COLUMNS:
+            for row, nit in enumerate(columns.get(column_name, ())):
+                key = normalize_nit(nit)
+                if key:
+                    rows.setdefault(key, row)
+        return cls(stored, rows)
+
+    @property
+    def row_count(self) -> int:
+        return max((len(values) for values in self.columns.values()), default=0)
+
+    def search_result(self, nit: str) -> Optional[dict]:
+        """Returns the `buscar_nit` result of a NIT, or None if it is not listed."""
+        row = self.rows.get(normalize_nit(nit))
+        if row is None:
+            return None
+        return {
+            key: values[row] if row < len(values) else None
+            for key, values in self.columns.items()
+        }
+
+
+class NitIndex:
+    """
+    An in-memory index of the NITS sheet. Every `refresh_interval` seconds
+    the spreadsheet's Drive revision is checked and, if it changed, only the
+    columns `buscar_nit` needs are downloaded. The new table replaces the
+    old one in a single assignment, so lookups never see a partial index.
+
+    After each sync the downloaded columns are saved to the `nit_snapshots`
+    table. A new process loads the snapshot before its first sync, and
+    while the sheet cannot be reached lookups are answered from the last
+    data available, with its age in `snapshot_age_seconds`.
+    """
+
+    def __init__(
+        self,
+        spreadsheet_id: Optional[str] = settings.GOOGLE_SHEET_ID_CLIENTES_POTENCIALES,
+        refresh_interval: float = settings.NIT_INDEX_REFRESH_SECONDS,
+        persistent: bool = settings.NIT_INDEX_PERSISTENT,
+    ):
+        self.spreadsheet_id = spreadsheet_id
+        self.refresh_interval = refresh_interval
+        self.persistent = persistent
+        self.sheets_service: Optional[GoogleSheetsService] = None
+        self._table: Optional[NitTable] = None
+        self._load_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.revision: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.last_refresh_duration = 0.0
+        # True while the index holds data the live sheet has not confirmed:
+        # a snapshot not synced yet, or the data kept after a failed sync.
+        self.stale = False
+
+    @property
+    def size(self) -> int:
+        table = self._table
+        return len(table.rows) if table else 0
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        """
+        Seconds since the index was last known to match the sheet, or None
+        if it was never loaded.
+        """
+        if self.checked_at is None:
+            return None
+        return time.time() - self.checked_at
+
+    async def lookup(self, nit: str) -> dict:
+        """
+        Returns the `buscar_nit` result of a NIT. If the index has not been
+        loaded yet, it is loaded from the sheet first. Results answered from
+        data the sheet has not confirmed carry `snapshot_age_seconds`.
+        """
+        table = self._table
+        if not self.spreadsheet_id or (table is None and not self.sheets_service):
+            logger.warning(
+                "GOOGLE_SHEET_ID_CLIENTES_POTENCIALES is not set or sheets_service is not available. Skipping NIT check."
+            )
+            return _status_result("No verificado")
+
+        if table is None:
+            # Waits for a sync already in progress, e.g. the first background
+            # one, instead of starting a second download.
+            async with self._load_lock:
+                if self._table is None:
+                    await self._sync()
+            table = self._table
+            if table is None:
+                return _status_result("Error de sistema")
+
+        search_result = table.search_result(nit)
+        if search_result is None:
+            logger.info(f"NIT {nit} not found in Google Sheet.")
+            search_result = _status_result("No encontrado")
+        else:
+            logger.info(f"Found NIT {nit} in Google Sheet: {search_result}")
+
+        if self.stale:
+            age = self.age_seconds
+            search_result["snapshot_age_seconds"] = int(age) if age is not None else None
+            logger.warning(f"Answered NIT {nit} from data {age:.0f}s old.")
+        return search_result
+
+    async def refresh(self) -> bool:
+        """
+        Syncs the index with the sheet, skipping the download when the
+        spreadsheet's revision has not changed. Returns False on failure.
+        Only one sync runs at a time.
+        """
+        async with self._load_lock:
+            return await self._sync()
+
+    async def _sync(self) -> bool:
+        start = time.monotonic()
+        try:
+            revision = await self.sheets_service.get_revision(self.spreadsheet_id)
+            if revision is not None and revision == self.revision and self._table is not None:
+                self.checked_at = time.time()
+                self.stale = False
+                NIT_SYNCS.inc(outcome=SYNC_OUTCOME_UNCHANGED)
+                logger.debug("NITS sheet unchanged. Keeping the NIT index.")
+                if self.persistent:
+                    await self._touch_snapshot()
+                return True
+
+            worksheet = await self.sheets_service.get_worksheet(
+                spreadsheet_id=self.spreadsheet_id,
+                worksheet_name=NITS_WORKSHEET_NAME,
+            )
+            if worksheet is None:
+                raise RuntimeError("Could not access NITS worksheet.")
+            columns, received = await self.sheets_service.read_columns(
+                worksheet, NIT_COLUMNS + tuple(RESULT_COLUMNS.values())
+            )
+        except Exception as e:
+            NIT_SYNCS.inc(outcome=SYNC_OUTCOME_FAILURE)
+            self.stale = self._table is not None
+            logger.error(f"Failed to refresh the NIT index: {e}")
+            return False
+
+        parse_start = time.monotonic()
+        table = NitTable.from_columns(columns)
+        parse_seconds = time.monotonic() - parse_start
+
+        self._table = table
+        self.revision = revision
+        self.loaded_at = self.checked_at = time.time()
+        self.stale = False
+        self.last_refresh_duration = time.monotonic() - start
+        NIT_SYNCS.inc(outcome=SYNC_OUTCOME_LOADED)
+        NIT_SYNC_BYTES.observe(received)
+        NIT_SYNC_PARSE_SECONDS.observe(parse_seconds)
+        logger.info(
+            f"NIT index loaded with {table.row_count} rows ({received} bytes) in "
+            f"{self.last_refresh_duration:.2f}s, parsed in {parse_seconds * 1000:.1f}ms."
+        )
+        if self.persistent:
+            await self._save_snapshot(columns, revision, table.row_count)
+        return True
+
+    async def start(self, sheets_service: Optional[GoogleSheetsService]):
+        """
+        Loads the snapshot, if any, and starts the background refresh, which
+        syncs with the sheet right away.
+        """
+        self.sheets_service = sheets_service
+        if not self.spreadsheet_id:
+            logger.warning("NIT index is not configured. NIT lookups will be skipped.")
+            return
+        if self.persistent:
+            await self._load_snapshot()
+        if not self.sheets_service:
+            logger.warning(
+                "Sheets service not available. NIT lookups will use the snapshot, if any."
+            )
+            return
+        self._refresh_task = asyncio.create_task(
+            self._refresh_periodically(), name="nit-index-refresh"
+        )
+
+    async def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_periodically(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    async def _load_snapshot(self):
+        start = time.monotonic()
+        try:
+            async with AsyncSessionFactory() as db:
+                snapshot = await db.get(models.NitSnapshot, self.spreadsheet_id)
+        except Exception as e:
+            logger.error(f"Failed to read the NIT snapshot: {e}")
+            return
+        if snapshot is None:
+            logger.info("No NIT snapshot found. Waiting for the first sync.")
+            return
+
+        self._table = NitTable.from_columns(snapshot.data)
+        self.revision = snapshot.revision
+        self.loaded_at = self.checked_at = snapshot.synced_at.timestamp()
+        self.stale = True
+        logger.info(
+            f"NIT index loaded from a snapshot of {snapshot.row_count} rows, "
+            f"{self.age_seconds:.0f}s old, in {(time.monotonic() - start) * 1000:.1f}ms."
+        )
+
+    async def _save_snapshot(self, columns: dict[str, list], revision: Optional[str], row_count: int):
+        statement = insert(models.NitSnapshot).values(
+            spreadsheet_id=self.spreadsheet_id,
+            revision=revision,
+            data=columns,
+            row_count=row_count,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[models.NitSnapshot.spreadsheet_id],
+            set_={
+                "revision": statement.excluded.revision,
+                "data": statement.excluded.data,
+                "row_count": statement.excluded.row_count,
+                "synced_at": text("now()"),
+            },
+        )
+        try:
+            async with AsyncSessionFactory() as db:
+                await db.execute(statement)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to write the NIT snapshot: {e}")
+
+    async def _touch_snapshot(self):
+        """Records that the snapshot still matches the sheet."""
+        try:
+            async with AsyncSessionFactory() as db:
+                await db.execute(
+                    text(
+                        """
+                        UPDATE nit_snapshots SET synced_at = now()
+                        WHERE spreadsheet_id = :spreadsheet_id AND revision = :revision
+                        """
+                    ),
+                    {"spreadsheet_id": self.spreadsheet_id, "revision": self.revision},
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to update the NIT snapshot: {e}")
+
+
+nit_index = NitIndex()
+
+
+def _collect_nit_index_metrics():
+    yield "nit_index_entries", "gauge", "NIT keys in the in-memory index.", [({}, nit_index.size)]
+    age = nit_index.age_seconds
+    yield (
+        "nit_index_age_seconds",
+        "gauge",
+        "Seconds since the NIT index was last known to match the sheet, -1 if it never was.",
+        [({}, age if age is not None else -1)],
+    )
+    yield (
+        "nit_index_refresh_duration_seconds",
+        "gauge",
+        "Duration of the last NIT index load.",
+        [({}, nit_index.last_refresh_duration)],
+    )
+    yield (
+        "nit_index_stale",
+        "gauge",
+        "1 while NIT lookups are answered from data the sheet has not confirmed.",
+        [({}, 1 if nit_index.stale else 0)],
+    )
+
+
+registry.register_collector(_collect_nit_index_metrics)
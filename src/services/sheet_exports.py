@@ -0,0 +1,353 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import flag_modified
+
+from src.config import settings
+from src.database import models
+from src.database.db import AsyncSessionFactory
+from src.services.google_sheets import GoogleSheetsService
+from src.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+EXPORT_STATUS_PENDING = "pending"
+EXPORT_STATUS_PROCESSING = "processing"
+EXPORT_STATUS_SENT = "sent"
+EXPORT_STATUS_FAILED = "failed"
+
+# The interaction_data key of a row staged by `enqueue`.
+PENDING_EXPORT_KEY = "sheet_export_pending"
+
+# The worksheets of GOOGLE_SHEET_ID_EXPORT the workflows export to.
+EXPORT_WORKSHEET_NAMES = (
+    "CLIENTES_POTENCIALES",
+    "CLIENTES_ACTUALES",
+    "TRANSPORTISTAS",
+    "PROVEEDORES",
+    "ADMON",
+    "ASPIRANTES_EMPLEO",
+)
+
+EXPORT_ROWS = registry.counter(
+    "sheet_export_rows_total",
+    "Export rows by outcome: queued, sent, retried or failed.",
+    ("outcome",),
+)
+EXPORT_BATCH_SIZE = registry.histogram(
+    "sheet_export_batch_size",
+    "Rows appended per Google Sheets request.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+
+
+class SheetExporter:
+    """
+    Appends the rows exported by the workflows to Google Sheets in batches.
+    Rows are stored in the `sheet_exports` table first, in the transaction
+    that saves the conversation, so they survive restarts and retried
+    turns, and a background task appends them with one `append_rows`
+    call per worksheet every `flush_interval` seconds, or as soon as
+    `batch_size` rows are waiting. Batches are claimed with
+    `SELECT ... FOR UPDATE SKIP LOCKED`, so several processes can flush the
+    same table.
+
+    A row is appended at least once: if a process dies after the append
+    but before marking the row as sent, it is appended again.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.SHEET_EXPORT_BATCH_SIZE,
+        flush_interval: float = settings.SHEET_EXPORT_FLUSH_INTERVAL,
+        max_attempts: int = settings.SHEET_EXPORT_MAX_ATTEMPTS,
+        retry_delay: float = settings.SHEET_EXPORT_RETRY_DELAY,
+        visibility_timeout: int = settings.SHEET_EXPORT_VISIBILITY_TIMEOUT,
+        retention_days: int = settings.SHEET_EXPORT_RETENTION_DAYS,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.visibility_timeout = visibility_timeout
+        self.retention_days = retention_days
+        self.sheets_service: Optional[GoogleSheetsService] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self._queued_since_flush = 0
+        self._last_maintenance = 0.0
+
+    async def start(self, sheets_service: Optional[GoogleSheetsService]):
+        """Starts the background flusher if Google Sheets is available."""
+        self.sheets_service = sheets_service
+        if sheets_service is None:
+            logger.warning("Sheets service not available. Sheet exports will not be flushed.")
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._flush_periodically(), name="sheet-exporter")
+        logger.info("Started sheet exporter.")
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Stops the flusher after a last flush. Rows still pending stay in the
+        table and are flushed by the next process.
+        """
+        if not self._task:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Sheet exporter did not finish its last flush in time.")
+        self._task = None
+        logger.info("Sheet exporter stopped.")
+
+    def enqueue(
+        self,
+        interaction_data: dict,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        row: List[str],
+    ):
+        """
+        Stages a conversation's row in `interaction_data`. It is stored by
+        `save_pending` in the transaction that saves the interaction, so a
+        turn that fails and is retried does not queue it twice.
+        """
+        interaction_data[PENDING_EXPORT_KEY] = {
+            "spreadsheet_id": spreadsheet_id,
+            "worksheet_name": worksheet_name,
+            "row_values": row,
+        }
+
+    async def save_pending(self, db: AsyncSession, interaction: models.Interaction):
+        """
+        Adds the row staged by `enqueue`, if any, to the interaction's
+        transaction and records its id in `interaction_data["sheet_export_id"]`.
+        The caller commits.
+        """
+        interaction_data = interaction.interaction_data
+        pending = interaction_data.pop(PENDING_EXPORT_KEY, None) if interaction_data else None
+        if not pending:
+            return
+        export = models.SheetExport(
+            **pending, status=EXPORT_STATUS_PENDING, attempts=0
+        )
+        db.add(export)
+        await db.flush()
+        interaction_data["sheet_export_id"] = export.id
+        flag_modified(interaction, "interaction_data")
+
+        EXPORT_ROWS.inc(outcome="queued")
+        self._queued_since_flush += 1
+        if self._queued_since_flush >= self.batch_size:
+            self._wakeup.set()
+
+    @staticmethod
+    def is_queued(interaction_data: dict) -> bool:
+        """
+        Returns True if the conversation's row has been queued. Whether it
+        was appended is recorded in the row's `sheet_exports` status.
+        """
+        return "sheet_export_id" in interaction_data or PENDING_EXPORT_KEY in interaction_data
+
+    async def flush(self) -> int:
+        """Appends every pending row. Returns the number of rows appended."""
+        self._queued_since_flush = 0
+        appended = 0
+        while True:
+            batch = await self._claim_batch()
+            if not batch:
+                return appended
+            appended += await self._send_batch(batch)
+
+    async def _flush_periodically(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush_safely()
+            await self._maintain()
+        await self._flush_safely()
+
+    async def _flush_safely(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush sheet exports: {e}", exc_info=True)
+
+    async def _claim_batch(self) -> List[dict]:
+        """
+        Claims up to `batch_size` pending rows of the worksheet with the
+        oldest pending row, in insertion order.
+        """
+        params = {
+            "pending": EXPORT_STATUS_PENDING,
+            "processing": EXPORT_STATUS_PROCESSING,
+            "limit": self.batch_size,
+        }
+        async with AsyncSessionFactory() as db:
+            target = (
+                await db.execute(
+                    text(
+                        """
+                        SELECT spreadsheet_id, worksheet_name FROM sheet_exports
+                        WHERE status = :pending AND available_at <= now()
+                        ORDER BY id
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                        """
+                    ),
+                    params,
+                )
+            ).mappings().first()
+            if not target:
+                await db.commit()
+                return []
+
+            result = await db.execute(
+                text(
+                    """
+                    UPDATE sheet_exports
+                    SET status = :processing, locked_at = now(), attempts = attempts + 1
+                    WHERE id IN (
+                        SELECT id FROM sheet_exports
+                        WHERE status = :pending AND available_at <= now()
+                          AND spreadsheet_id = :spreadsheet_id
+                          AND worksheet_name = :worksheet_name
+                        ORDER BY id
+                        LIMIT :limit
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, spreadsheet_id, worksheet_name, row_values, attempts
+                    """
+                ),
+                {**params, **target},
+            )
+            batch = sorted((dict(row) for row in result.mappings()), key=lambda r: r["id"])
+            await db.commit()
+            return batch
+
+    async def _send_batch(self, batch: List[dict]) -> int:
+        export_ids = [export["id"] for export in batch]
+        spreadsheet_id = batch[0]["spreadsheet_id"]
+        worksheet_name = batch[0]["worksheet_name"]
+        try:
+            worksheet = await self.sheets_service.get_worksheet(
+                spreadsheet_id=spreadsheet_id, worksheet_name=worksheet_name
+            )
+            if not worksheet:
+                raise RuntimeError(f"Could not find {worksheet_name} worksheet.")
+            await self.sheets_service.append_rows(
+                worksheet, [export["row_values"] for export in batch]
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to append {len(batch)} row(s) to {worksheet_name}: {e}"
+            )
+            await self._fail_batch(
+                export_ids, max(export["attempts"] for export in batch), str(e)
+            )
+            return 0
+
+        async with AsyncSessionFactory() as db:
+            await db.execute(
+                text(
+                    """
+                    UPDATE sheet_exports
+                    SET status = :sent, sent_at = now(), locked_at = NULL, last_error = NULL
+                    WHERE id = ANY(:ids)
+                    """
+                ),
+                {"sent": EXPORT_STATUS_SENT, "ids": export_ids},
+            )
+            await db.commit()
+
+        EXPORT_ROWS.inc(len(batch), outcome="sent")
+        EXPORT_BATCH_SIZE.observe(len(batch))
+        logger.info(f"Appended {len(batch)} row(s) to {worksheet_name}.")
+        return len(batch)
+
+    async def _fail_batch(self, export_ids: List[int], attempts: int, error: str):
+        if attempts >= self.max_attempts:
+            logger.error(
+                f"Sheet exports {export_ids} exhausted {attempts} attempts. Marking as failed."
+            )
+            status = EXPORT_STATUS_FAILED
+            delay = 0.0
+        else:
+            status = EXPORT_STATUS_PENDING
+            delay = self.retry_delay * (2 ** (attempts - 1))
+
+        EXPORT_ROWS.inc(
+            len(export_ids),
+            outcome="failed" if status == EXPORT_STATUS_FAILED else "retried",
+        )
+        async with AsyncSessionFactory() as db:
+            await db.execute(
+                text(
+                    """
+                    UPDATE sheet_exports
+                    SET status = :status, last_error = :error, locked_at = NULL,
+                        available_at = now() + make_interval(secs => :delay)
+                    WHERE id = ANY(:ids)
+                    """
+                ),
+                {"status": status, "error": error, "delay": delay, "ids": export_ids},
+            )
+            await db.commit()
+
+    async def _maintain(self):
+        """
+        Returns rows left in 'processing' by a crashed process to the queue
+        and prunes sent rows older than the retention period.
+        """
+        interval = max(self.visibility_timeout / 2, self.flush_interval)
+        if time.monotonic() - self._last_maintenance < interval:
+            return
+        self._last_maintenance = time.monotonic()
+        try:
+            async with AsyncSessionFactory() as db:
+                result = await db.execute(
+                    text(
+                        """
+                        UPDATE sheet_exports
+                        SET status = :pending, locked_at = NULL
+                        WHERE status = :processing
+                          AND locked_at < now() - make_interval(secs => :timeout)
+                        """
+                    ),
+                    {
+                        "pending": EXPORT_STATUS_PENDING,
+                        "processing": EXPORT_STATUS_PROCESSING,
+                        "timeout": float(self.visibility_timeout),
+                    },
+                )
+                if result.rowcount:
+                    logger.warning(
+                        f"Returned {result.rowcount} stale sheet export(s) to the queue."
+                    )
+                await db.execute(
+                    text(
+                        """
+                        DELETE FROM sheet_exports
+                        WHERE status = :sent
+                          AND sent_at < now() - make_interval(days => :days)
+                        """
+                    ),
+                    {"sent": EXPORT_STATUS_SENT, "days": self.retention_days},
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to maintain sheet exports: {e}")
+
+
+sheet_exporter = SheetExporter()
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from typing import Iterable, List, Optional, Set
+
+from cachetools import LRUCache
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.database.db import AsyncSessionFactory
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookDeduplicator:
+    """
+    Drops webhook events that Evolution redelivers after a timeout.
+
+    Message ids seen recently by this process are kept in an in-memory LRU,
+    so most redeliveries are rejected without touching the database. The
+    `processed_webhook_messages` table is the source of truth across
+    processes and restarts; rows older than the TTL are swept periodically.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = settings.WEBHOOK_DEDUPE_CACHE_SIZE,
+        ttl_seconds: int = settings.WEBHOOK_DEDUPE_TTL_SECONDS,
+        sweep_interval: float = settings.WEBHOOK_DEDUPE_SWEEP_INTERVAL,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self._recent = LRUCache(maxsize=cache_size)
+        self._sweeper_task: Optional[asyncio.Task] = None
+
+    def is_recent(self, message_id: str) -> bool:
+        """Returns True if this process has already accepted the message id."""
+        return message_id in self._recent
+
+    async def claim(self, db: AsyncSession, message_ids: List[str]) -> Set[str]:
+        """
+        Records message ids in the dedupe table and returns those that were
+        not there yet. The insert is not committed, so it can share a
+        transaction with the enqueue of the events; call `remember` once
+        that transaction has been committed.
+
+        Args:
+            db: The database session used for the insert.
+            message_ids: The WhatsApp message ids to claim.
+
+        Returns:
+            The message ids seen for the first time.
+        """
+        if not message_ids:
+            return set()
+        result = await db.execute(
+            text(
+                """
+                INSERT INTO processed_webhook_messages (message_id)
+                SELECT unnest(CAST(:ids AS varchar[]))
+                ON CONFLICT (message_id) DO NOTHING
+                RETURNING message_id
+                """
+            ),
+            {"ids": list(dict.fromkeys(message_ids))},
+        )
+        return set(result.scalars().all())
+
+    def remember(self, message_ids: Iterable[str]):
+        """Adds committed message ids to the in-memory cache."""
+        for message_id in message_ids:
+            self._recent[message_id] = True
+
+    async def start(self):
+        """Starts the task that deletes expired message ids."""
+        self._sweeper_task = asyncio.create_task(
+            self._sweep_expired(), name="webhook-dedupe-sweeper"
+        )
+
+    async def stop(self):
+        if self._sweeper_task:
+            self._sweeper_task.cancel()
+            await asyncio.gather(self._sweeper_task, return_exceptions=True)
+            self._sweeper_task = None
+
+    async def _sweep_expired(self):
+        while True:
+            try:
+                async with AsyncSessionFactory() as db:
+                    result = await db.execute(
+                        text(
+                            """
+                            DELETE FROM processed_webhook_messages
+                            WHERE created_at < now() - make_interval(secs => :ttl)
+                            """
+                        ),
+                        {"ttl": float(self.ttl_seconds)},
+                    )
+                    await db.commit()
+                    if result.rowcount:
+                        logger.debug(
+                            f"Swept {result.rowcount} expired webhook message id(s)."
+                        )
+            except Exception as e:
+                logger.error(f"Failed to sweep expired webhook message ids: {e}")
+
+            await asyncio.sleep(self.sweep_interval)
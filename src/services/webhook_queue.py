@@ -0,0 +1,385 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.database import models
+from src.database.db import AsyncSessionFactory
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUS_PENDING = "pending"
+JOB_STATUS_PROCESSING = "processing"
+JOB_STATUS_FAILED = "failed"
+
+# Marks the first `count` payloads of a burst as done.
+JobCompletion = Callable[[int], Awaitable[None]]
+JobHandler = Callable[[List[dict], JobCompletion], Awaitable[None]]
+
+
+async def enqueue_webhook_events(
+    db: AsyncSession, events: List[dict], session_ids: List[Optional[str]]
+) -> int:
+    """
+    Stores webhook events in the job queue so they survive restarts.
+
+    Args:
+        db: The database session used for the insert.
+        events: The raw webhook events, one job per event.
+        session_ids: The session id of each event, if any.
+
+    Returns:
+        The number of jobs enqueued.
+    """
+    for event, session_id in zip(events, session_ids):
+        db.add(
+            models.WebhookJob(
+                session_id=session_id,
+                payload=event,
+                status=JOB_STATUS_PENDING,
+                attempts=0,
+            )
+        )
+    await db.commit()
+    return len(events)
+
+
+class WebhookWorkerPool:
+    """
+    A pool of async workers that claim webhook jobs from Postgres using
+    `SELECT ... FOR UPDATE SKIP LOCKED` and run them with bounded concurrency.
+    Several processes can run a pool against the same table.
+
+    Jobs are claimed per session: the handler receives every pending payload
+    of one session, in arrival order, and different sessions run in parallel.
+    The handler also receives a `complete(count)` callback to delete the
+    first `count` jobs as soon as they are handled, so if a later turn of the
+    burst fails only the jobs from that turn on are retried.
+    """
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        concurrency: int = settings.WEBHOOK_WORKER_CONCURRENCY,
+        poll_interval: float = settings.WEBHOOK_QUEUE_POLL_INTERVAL,
+        max_attempts: int = settings.WEBHOOK_JOB_MAX_ATTEMPTS,
+        retry_delay: float = settings.WEBHOOK_JOB_RETRY_DELAY,
+        visibility_timeout: int = settings.WEBHOOK_JOB_VISIBILITY_TIMEOUT,
+        debounce_seconds: float = settings.WEBHOOK_SESSION_DEBOUNCE_SECONDS,
+        max_wait_seconds: float = settings.WEBHOOK_SESSION_MAX_WAIT_SECONDS,
+    ):
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.visibility_timeout = visibility_timeout
+        self.debounce_seconds = debounce_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks: List[asyncio.Task] = []
+        self._reaper_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Starts the workers and the stale job reaper."""
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"webhook-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        self._reaper_task = asyncio.create_task(
+            self._reap_stale_jobs(), name="webhook-reaper"
+        )
+        logger.info(f"Started webhook worker pool with {self.concurrency} workers.")
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Stops the workers, giving in-flight jobs `timeout` seconds to finish.
+        Jobs that do not finish are released back to the queue.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        logger.info("Webhook worker pool stopped.")
+
+    def notify(self):
+        """Wakes up idle workers after a job has been enqueued by this process."""
+        self._wakeup.set()
+
+    async def _wait_for_work(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _worker(self, worker_id: int):
+        while not self._stopping:
+            try:
+                jobs = await self._claim_jobs()
+            except Exception as e:
+                logger.error(
+                    f"Webhook worker {worker_id} failed to claim a job: {e}",
+                    exc_info=True,
+                )
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            if not jobs:
+                await self._wait_for_work()
+                continue
+
+            await self._run_jobs(jobs)
+
+    async def _claim_jobs(self) -> List[dict]:
+        """
+        Claims the pending jobs of one session as a single burst.
+        A session is only claimed when none of its jobs is being processed and
+        its newest job is older than the debounce window, so messages from one
+        sender run in order and close messages are handled together.
+        """
+        params = {
+            "processing": JOB_STATUS_PROCESSING,
+            "pending": JOB_STATUS_PENDING,
+            "debounce": float(self.debounce_seconds),
+            "max_wait": float(self.max_wait_seconds),
+        }
+        async with AsyncSessionFactory() as db:
+            candidate = (
+                await db.execute(
+                    text(
+                        """
+                        SELECT j.id, j.session_id FROM webhook_jobs j
+                        WHERE j.status = :pending AND j.available_at <= now()
+                          AND NOT EXISTS (
+                              SELECT 1 FROM webhook_jobs p
+                              WHERE p.session_id = j.session_id
+                                AND (p.status = :processing
+                                     OR (p.status = :pending AND p.id < j.id))
+                          )
+                          AND (
+                              j.created_at <= now() - make_interval(secs => :max_wait)
+                              OR NOT EXISTS (
+                                  SELECT 1 FROM webhook_jobs r
+                                  WHERE r.session_id = j.session_id
+                                    AND r.status = :pending
+                                    AND r.created_at > now() - make_interval(secs => :debounce)
+                              )
+                          )
+                        ORDER BY j.id
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                        """
+                    ),
+                    params,
+                )
+            ).mappings().first()
+
+            if not candidate:
+                await db.commit()
+                return []
+
+            session_id = candidate["session_id"]
+            if session_id is None:
+                result = await db.execute(
+                    text(
+                        """
+                        UPDATE webhook_jobs
+                        SET status = :processing, locked_at = now(), attempts = attempts + 1
+                        WHERE id = :id
+                        RETURNING id, payload, attempts
+                        """
+                    ),
+                    {"processing": JOB_STATUS_PROCESSING, "id": candidate["id"]},
+                )
+            else:
+                # Serialize claims of the same session across workers and processes.
+                locked = (
+                    await db.execute(
+                        text("SELECT pg_try_advisory_xact_lock(hashtext(:session_id))"),
+                        {"session_id": session_id},
+                    )
+                ).scalar()
+                busy = (
+                    await db.execute(
+                        text(
+                            """
+                            SELECT 1 FROM webhook_jobs
+                            WHERE session_id = :session_id AND status = :processing
+                            LIMIT 1
+                            """
+                        ),
+                        {"session_id": session_id, "processing": JOB_STATUS_PROCESSING},
+                    )
+                ).first()
+                if not locked or busy:
+                    await db.rollback()
+                    return []
+
+                result = await db.execute(
+                    text(
+                        """
+                        UPDATE webhook_jobs
+                        SET status = :processing, locked_at = now(), attempts = attempts + 1
+                        WHERE session_id = :session_id
+                          AND status = :pending
+                          AND available_at <= now()
+                        RETURNING id, payload, attempts
+                        """
+                    ),
+                    {
+                        "processing": JOB_STATUS_PROCESSING,
+                        "pending": JOB_STATUS_PENDING,
+                        "session_id": session_id,
+                    },
+                )
+
+            jobs = sorted((dict(row) for row in result.mappings()), key=lambda j: j["id"])
+            await db.commit()
+            return jobs
+
+    async def _run_jobs(self, jobs: List[dict]):
+        completed = 0
+
+        async def complete(count: int):
+            nonlocal completed
+            if count > completed:
+                await self._delete_jobs([job["id"] for job in jobs[completed:count]])
+                completed = count
+
+        try:
+            await self.handler([job["payload"] for job in jobs], complete)
+        except asyncio.CancelledError:
+            job_ids = [job["id"] for job in jobs[completed:]]
+            logger.warning(f"Webhook jobs {job_ids} were cancelled. Releasing them.")
+            await asyncio.shield(self._release_jobs(job_ids))
+            raise
+        except Exception as e:
+            remaining = jobs[completed:]
+            job_ids = [job["id"] for job in remaining]
+            logger.error(f"Webhook jobs {job_ids} failed: {e}", exc_info=True)
+            if remaining:
+                await self._fail_jobs(
+                    job_ids, max(job["attempts"] for job in remaining), str(e)
+                )
+            return
+
+        await self._delete_jobs([job["id"] for job in jobs[completed:]])
+
+    async def _delete_jobs(self, job_ids: List[int]):
+        if not job_ids:
+            return
+        async with AsyncSessionFactory() as db:
+            await db.execute(
+                text("DELETE FROM webhook_jobs WHERE id = ANY(:ids)"), {"ids": job_ids}
+            )
+            await db.commit()
+
+    async def _fail_jobs(self, job_ids: List[int], attempts: int, error: str):
+        if attempts >= self.max_attempts:
+            logger.error(
+                f"Webhook jobs {job_ids} exhausted {attempts} attempts. Marking as failed."
+            )
+            status = JOB_STATUS_FAILED
+            delay = 0.0
+        else:
+            status = JOB_STATUS_PENDING
+            delay = self.retry_delay * (2 ** (attempts - 1))
+
+        async with AsyncSessionFactory() as db:
+            await db.execute(
+                text(
+                    """
+                    UPDATE webhook_jobs
+                    SET status = :status, last_error = :error, locked_at = NULL,
+                        available_at = now() + make_interval(secs => :delay)
+                    WHERE id = ANY(:ids)
+                    """
+                ),
+                {"status": status, "error": error, "delay": delay, "ids": job_ids},
+            )
+            await db.commit()
+
+    async def _release_jobs(self, job_ids: List[int]):
+        try:
+            async with AsyncSessionFactory() as db:
+                await db.execute(
+                    text(
+                        """
+                        UPDATE webhook_jobs
+                        SET status = :pending, locked_at = NULL, attempts = attempts - 1
+                        WHERE id = ANY(:ids)
+                        """
+                    ),
+                    {"pending": JOB_STATUS_PENDING, "ids": job_ids},
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to release webhook jobs {job_ids}: {e}")
+
+    async def _reap_stale_jobs(self):
+        """
+        Returns jobs left in 'processing' by a crashed process to the queue.
+        Jobs that already used all their attempts are marked as failed, so a
+        job that kills or hangs its worker is not claimed forever.
+        """
+        interval = max(self.visibility_timeout / 2, self.poll_interval)
+        while True:
+            try:
+                async with AsyncSessionFactory() as db:
+                    result = await db.execute(
+                        text(
+                            """
+                            UPDATE webhook_jobs
+                            SET status = CASE
+                                    WHEN attempts >= :max_attempts THEN :failed
+                                    ELSE :pending
+                                END,
+                                last_error = CASE
+                                    WHEN attempts >= :max_attempts
+                                    THEN 'Worker did not finish the job in time.'
+                                    ELSE last_error
+                                END,
+                                locked_at = NULL
+                            WHERE status = :processing
+                              AND locked_at < now() - make_interval(secs => :timeout)
+                            RETURNING status
+                            """
+                        ),
+                        {
+                            "pending": JOB_STATUS_PENDING,
+                            "processing": JOB_STATUS_PROCESSING,
+                            "failed": JOB_STATUS_FAILED,
+                            "max_attempts": self.max_attempts,
+                            "timeout": float(self.visibility_timeout),
+                        },
+                    )
+                    statuses = result.scalars().all()
+                    await db.commit()
+                    failed = statuses.count(JOB_STATUS_FAILED)
+                    if failed:
+                        logger.error(
+                            f"Marked {failed} stale webhook job(s) that exhausted their attempts as failed."
+                        )
+                    if len(statuses) > failed:
+                        logger.warning(
+                            f"Returned {len(statuses) - failed} stale webhook job(s) to the queue."
+                        )
+                        self.notify()
+            except Exception as e:
+                logger.error(f"Failed to reap stale webhook jobs: {e}")
+
+            await asyncio.sleep(interval)
@@ -0,0 +1,264 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+from src.config import settings
+from src.database import models
+from src.database.db import AsyncSessionFactory
+from src.services.evolution_api import EvolutionAPIClient
+
+logger = logging.getLogger(__name__)
+
+# Connection-level failures mean the request never reached Evolution, so
+# retrying cannot produce a duplicate message.
+RETRYABLE_TRANSPORT_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+    httpx.RemoteProtocolError,
+)
+
+
+@dataclass
+class OutboundMessage:
+    phone_number: str
+    action: str
+    payload: dict
+    attempts: int = 0
+
+
+class TokenBucket:
+    """
+    A token bucket rate limiter. Tokens refill continuously at `rate` per
+    second up to `capacity`; `acquire` waits until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class WhatsAppDispatcher:
+    """
+    Delivers outbound WhatsApp messages in the background.
+
+    Each phone number gets its own in-process queue and worker, so the
+    messages of one conversation keep their order while different
+    conversations are sent in parallel. All sends share a token bucket per
+    Evolution instance. 429 and 5xx responses are retried with bounded
+    exponential backoff, and messages that cannot be delivered are stored
+    in the `whatsapp_dead_letters` table.
+    """
+
+    def __init__(
+        self,
+        evolution_client: EvolutionAPIClient,
+        rate_per_second: float = settings.WHATSAPP_RATE_LIMIT_PER_SECOND,
+        burst: int = settings.WHATSAPP_RATE_LIMIT_BURST,
+        max_retries: int = settings.WHATSAPP_SEND_MAX_RETRIES,
+        backoff_initial: float = settings.WHATSAPP_SEND_BACKOFF_INITIAL,
+        backoff_max: float = settings.WHATSAPP_SEND_BACKOFF_MAX,
+        idle_timeout: float = settings.WHATSAPP_RECIPIENT_IDLE_TIMEOUT,
+    ):
+        self.evolution_client = evolution_client
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.idle_timeout = idle_timeout
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    @property
+    def is_configured(self) -> bool:
+        return self.evolution_client.is_configured
+
+    def enqueue(self, phone_number: str, action: str, payload: dict):
+        """
+        Queues a message for delivery and returns immediately.
+
+        Args:
+            phone_number: The recipient, also used as the ordering key.
+            action: The Evolution API message endpoint, e.g. "sendText".
+            payload: The JSON body of the request.
+        """
+        queue = self._queues.get(phone_number)
+        if queue is None:
+            queue = asyncio.Queue()
+            self._queues[phone_number] = queue
+        queue.put_nowait(OutboundMessage(phone_number, action, payload))
+
+        worker = self._workers.get(phone_number)
+        if worker is None or worker.done():
+            self._workers[phone_number] = asyncio.create_task(
+                self._recipient_worker(phone_number),
+                name=f"whatsapp-dispatcher-{phone_number}",
+            )
+
+    async def stop(self, timeout: float = 10.0):
+        """Waits up to `timeout` seconds for queued messages to be sent."""
+        workers = list(self._workers.values())
+        if not workers:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues.values())),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            pass
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers = {}
+        undelivered = sum(queue.qsize() for queue in self._queues.values())
+        if undelivered:
+            logger.warning(
+                f"WhatsApp dispatcher stopped with {undelivered} undelivered message(s)."
+            )
+        logger.info("WhatsApp dispatcher stopped.")
+
+    def _get_bucket(self) -> TokenBucket:
+        instance_name = settings.WHATSAPP_SERVER_INSTANCE_NAME or ""
+        bucket = self._buckets.get(instance_name)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_second, self.burst)
+            self._buckets[instance_name] = bucket
+        return bucket
+
+    async def _recipient_worker(self, phone_number: str):
+        queue = self._queues[phone_number]
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=self.idle_timeout)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    # No awaits between the check and the cleanup, so no
+                    # message can be enqueued in between.
+                    self._queues.pop(phone_number, None)
+                    self._workers.pop(phone_number, None)
+                    return
+                continue
+
+            try:
+                await self._deliver(message)
+            except Exception as e:
+                logger.error(
+                    f"Unexpected error delivering WhatsApp message to {phone_number}: {e}",
+                    exc_info=True,
+                )
+            finally:
+                queue.task_done()
+
+    def _backoff_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max)
+                except ValueError:
+                    pass
+        return min(self.backoff_initial * (2 ** (attempt - 1)), self.backoff_max)
+
+    async def _deliver(self, message: OutboundMessage):
+        bucket = self._get_bucket()
+        while True:
+            await bucket.acquire()
+            message.attempts += 1
+            response = None
+            try:
+                res = await self.evolution_client.post(message.action, message.payload)
+                logger.debug(
+                    f"Successfully sent WhatsApp {message.action} to {message.phone_number} "
+                    f"after {message.attempts} attempt(s). Response: {_summarize_response(res)}"
+                )
+                return
+            except httpx.HTTPStatusError as e:
+                response = e.response
+                status_code = e.response.status_code
+                error = f"Status: {status_code}, Response: {e.response.text}"
+                retryable = status_code == 429 or status_code >= 500
+            except httpx.ReadTimeout:
+                # Evolution holds the request open while it simulates typing
+                # (the `delay` field), so a read timeout usually means the
+                # message was accepted. Retrying could send it twice.
+                logger.info(
+                    f"Read timeout sending WhatsApp {message.action} to {message.phone_number}. "
+                    "Assuming it was delivered."
+                )
+                return
+            except RETRYABLE_TRANSPORT_ERRORS as e:
+                status_code = None
+                error = f"{type(e).__name__}: {e}"
+                retryable = True
+
+            if not retryable or message.attempts > self.max_retries:
+                logger.error(
+                    f"Failed to send WhatsApp {message.action} to {message.phone_number} "
+                    f"after {message.attempts} attempt(s). {error}"
+                )
+                await self._dead_letter(message, status_code, error)
+                return
+
+            delay = self._backoff_delay(message.attempts, response)
+            logger.warning(
+                f"Retrying WhatsApp {message.action} to {message.phone_number} in {delay}s "
+                f"(attempt {message.attempts}/{self.max_retries + 1}). {error}"
+            )
+            await asyncio.sleep(delay)
+
+    async def _dead_letter(
+        self, message: OutboundMessage, status_code: Optional[int], error: str
+    ):
+        try:
+            async with AsyncSessionFactory() as db:
+                db.add(
+                    models.WhatsAppDeadLetter(
+                        phone_number=message.phone_number,
+                        action=message.action,
+                        payload=message.payload,
+                        attempts=message.attempts,
+                        status_code=status_code,
+                        last_error=error,
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(
+                f"Failed to store dead letter for WhatsApp message to {message.phone_number}: {e}",
+                exc_info=True,
+            )
+
+
+def _summarize_response(res: httpx.Response) -> str:
+    try:
+        message = res.json().get("message", {})
+        return message.get("conversation") or message.get("caption") or res.text
+    except (json.JSONDecodeError, AttributeError):
+        return res.text
@@ -0,0 +1,41 @@
+"""
+The municipalities of Colombia from the DANE Divipola list, by department,
+normalized like the city lookups (lowercase, without accents). Common
+alternative names, e.g. "mompox" for "santa cruz de mompox", are included.
+"""
+
+COLOMBIAN_MUNICIPALITIES_BY_DEPARTMENT = {
+    "amazonas": ["leticia", "puerto narino", "el encanto", "la chorrera", "la pedrera", "la victoria", "miriti-parana", "puerto alegria", "puerto arica", "puerto santander", "tarapaca"],
+    "antioquia": ["medellin", "abejorral", "abriaqui", "alejandria", "amaga", "amalfi", "andes", "angelopolis", "angostura", "anori", "santa fe de antioquia", "santafe de antioquia", "anza", "apartado", "arboletes", "argelia", "armenia", "barbosa", "belmira", "bello", "betania", "betulia", "ciudad bolivar", "briceno", "buritica", "caceres", "caicedo", "caldas", "campamento", "canasgordas", "caracoli", "caramanta", "carepa", "el carmen de viboral", "carolina", "carolina del principe", "caucasia", "chigorodo", "cisneros", "cocorna", "concepcion", "concordia", "copacabana", "dabeiba", "donmatias", "don matias", "ebejico", "el bagre", "entrerrios", "envigado", "fredonia", "frontino", "giraldo", "girardota", "gomez plata", "granada", "guadalupe", "guarne", "guatape", "heliconia", "hispania", "itagui", "ituango", "jardin", "jerico", "la ceja", "la estrella", "la pintada", "la union", "liborina", "maceo", "marinilla", "montebello", "murindo", "mutata", "narino", "necocli", "nechi", "olaya", "el penol", "penol", "peque", "pueblorrico", "puerto berrio", "puerto nare", "puerto triunfo", "remedios", "el retiro", "retiro", "rionegro", "sabanalarga", "sabaneta", "salgar", "san andres de cuerquia", "san carlos", "san francisco", "san jeronimo", "san jose de la montana", "san juan de uraba", "san luis", "san pedro de los milagros", "san pedro de uraba", "san rafael", "san roque", "san vicente", "san vicente ferrer", "santa barbara", "santa rosa de osos", "santo domingo", "el santuario", "segovia", "sonson", "sopetran", "tamesis", "taraza", "tarso", "titiribi", "toledo", "turbo", "uramita", "urrao", "valdivia", "valparaiso", "vegachi", "venecia", "vigia del fuerte", "yali", "yarumal", "yolombo", "yondo", "zaragoza"],
+    "arauca": ["arauca", "arauquita", "cravo norte", "fortul", "puerto rondon", "saravena", "tame"],
+    "atlantico": ["barranquilla", "baranoa", "campo de la cruz", "candelaria", "galapa", "juan de acosta", "luruaco", "malambo", "manati", "palmar de varela", "piojo", "polonuevo", "ponedera", "puerto colombia", "repelon", "sabanagrande", "sabanalarga", "santa lucia", "santo tomas", "soledad", "suan", "tubara", "usiacuri"],
+    "bogota": ["bogota", "bogota dc", "santa fe de bogota"],
+    "bolivar": ["cartagena", "cartagena de indias", "achi", "altos del rosario", "arenal", "arjona", "arroyohondo", "barranco de loba", "calamar", "cantagallo", "cicuco", "cordoba", "clemencia", "el carmen de bolivar", "el guamo", "el penon", "hatillo de loba", "magangue", "mahates", "margarita", "maria la baja", "montecristo", "mompos", "mompox", "santa cruz de mompox", "morales", "norosi", "pinillos", "regidor", "rio viejo", "san cristobal", "san estanislao", "san fernando", "san jacinto", "san jacinto del cauca", "san juan nepomuceno", "san martin de loba", "san pablo", "santa catalina", "santa rosa", "santa rosa del sur", "simiti", "soplaviento", "talaigua nuevo", "tiquisio", "turbaco", "turbana", "villanueva", "zambrano"],
+    "boyaca": ["tunja", "almeida", "aquitania", "arcabuco", "belen", "berbeo", "beteitiva", "boavita", "boyaca", "briceno", "buenavista", "busbanza", "caldas", "campohermoso", "cerinza", "chinavita", "chiquinquira", "chiscas", "chita", "chitaraque", "chivata", "cienega", "combita", "coper", "corrales", "covarachia", "cubara", "cucaita", "cuitiva", "chiquiza", "chivor", "duitama", "el cocuy", "el espino", "firavitoba", "floresta", "gachantiva", "gameza", "garagoa", "guacamayas", "guateque", "guayata", "guican", "guican de la sierra", "iza", "jenesano", "jerico", "labranzagrande", "la capilla", "la victoria", "la uvita", "villa de leyva", "villa de leiva", "macanal", "maripi", "miraflores", "mongua", "mongui", "moniquira", "motavita", "muzo", "nobsa", "nuevo colon", "oicata", "otanche", "pachavita", "paez", "paipa", "pajarito", "panqueba", "pauna", "paya", "paz de rio", "pesca", "pisba", "puerto boyaca", "quipama", "ramiriqui", "raquira", "rondon", "saboya", "sachica", "samaca", "san eduardo", "san jose de pare", "san luis de gaceno", "san mateo", "san miguel de sema", "san pablo de borbur", "santana", "santa maria", "santa rosa de viterbo", "santa sofia", "sativanorte", "sativasur", "siachoque", "soata", "socota", "socha", "sogamoso", "somondoco", "sora", "sotaquira", "soraca", "susacon", "sutamarchan", "sutatenza", "tasco", "tenza", "tibana", "tibasosa", "tinjaca", "tipacoque", "toca", "togui", "topaga", "tota", "tunungua", "turmeque", "tuta", "tutaza", "umbita", "ventaquemada", "viracacha", "zetaquira"],
+    "caldas": ["manizales", "aguadas", "anserma", "aranzazu", "belalcazar", "chinchina", "filadelfia", "la dorada", "la merced", "manzanares", "marmato", "marquetalia", "marulanda", "neira", "norcasia", "pacora", "palestina", "pensilvania", "riosucio", "risaralda", "salamina", "samana", "san jose", "supia", "victoria", "villamaria", "viterbo"],
+    "caqueta": ["florencia", "albania", "belen de los andaquies", "cartagena del chaira", "curillo", "el doncello", "el paujil", "la montanita", "milan", "morelia", "puerto rico", "san jose del fragua", "san vicente del caguan", "solano", "solita", "valparaiso"],
+    "casanare": ["yopal", "aguazul", "chameza", "hato corozal", "la salina", "mani", "monterrey", "nunchia", "orocue", "paz de ariporo", "pore", "recetor", "sabanalarga", "sacama", "san luis de palenque", "tamara", "tauramena", "trinidad", "villanueva"],
+    "cauca": ["popayan", "almaguer", "argelia", "balboa", "bolivar", "buenos aires", "cajibio", "caldono", "caloto", "corinto", "el tambo", "florencia", "guachene", "guapi", "inza", "jambalo", "la sierra", "la vega", "lopez", "lopez de micay", "mercaderes", "miranda", "morales", "padilla", "paez", "patia", "piamonte", "piendamo", "puerto tejada", "purace", "rosas", "san sebastian", "santander de quilichao", "santa rosa", "silvia", "sotara", "suarez", "sucre", "timbio", "timbiqui", "toribio", "totoro", "villa rica"],
+    "cesar": ["valledupar", "aguachica", "agustin codazzi", "codazzi", "astrea", "becerril", "bosconia", "chimichagua", "chiriguana", "curumani", "el copey", "el paso", "gamarra", "gonzalez", "la gloria", "la jagua de ibirico", "manaure", "manaure balcon del cesar", "pailitas", "pelaya", "pueblo bello", "rio de oro", "la paz", "san alberto", "san diego", "san martin", "tamalameque"],
+    "choco": ["quibdo", "acandi", "alto baudo", "atrato", "bagado", "bahia solano", "bajo baudo", "bojaya", "el canton del san pablo", "carmen del darien", "certegui", "condoto", "el carmen de atrato", "el litoral del san juan", "istmina", "jurado", "lloro", "medio atrato", "medio baudo", "medio san juan", "novita", "nuqui", "rio iro", "rio quito", "riosucio", "san jose del palmar", "sipi", "tado", "unguia", "union panamericana"],
+    "cordoba": ["monteria", "ayapel", "buenavista", "canalete", "cerete", "chima", "chinu", "cienaga de oro", "cotorra", "la apartada", "lorica", "santa cruz de lorica", "los cordobas", "momil", "montelibano", "monitos", "planeta rica", "pueblo nuevo", "puerto escondido", "puerto libertador", "purisima", "sahagun", "san andres de sotavento", "san antero", "san bernardo del viento", "san carlos", "san jose de ure", "san pelayo", "tierralta", "tuchin", "valencia"],
+    "cundinamarca": ["agua de dios", "alban", "anapoima", "anolaima", "apulo", "arbelaez", "beltran", "bituima", "bojaca", "cabrera", "cachipay", "cajica", "caparrapi", "caqueza", "carmen de carupa", "chaguani", "chia", "chipaque", "choachi", "choconta", "cogua", "cota", "cucunuba", "el colegio", "el penon", "el rosal", "facatativa", "fomeque", "fosca", "funza", "fuquene", "fusagasuga", "gachala", "gachancipa", "gacheta", "gama", "girardot", "granada", "guacheta", "guaduas", "guasca", "guataqui", "guatavita", "guayabal de siquima", "guayabetal", "gutierrez", "jerusalen", "junin", "la calera", "la mesa", "la palma", "la pena", "la vega", "lenguazaque", "macheta", "madrid", "manta", "medina", "mosquera", "narino", "nemocon", "nilo", "nimaima", "nocaima", "venecia", "pacho", "paime", "pandi", "paratebueno", "pasca", "puerto salgar", "puli", "quebradanegra", "quetame", "quipile", "ricaurte", "san antonio del tequendama", "san bernardo", "san cayetano", "san francisco", "san juan de rioseco", "sasaima", "sesquile", "sibate", "silvania", "simijaca", "soacha", "sopo", "subachoque", "suesca", "supata", "susa", "sutatausa", "tabio", "tausa", "tena", "tenjo", "tibacuy", "tibirita", "tocaima", "tocancipa", "topaipi", "ubala", "ubaque", "ubate", "villa de san diego de ubate", "une", "utica", "vergara", "viani", "villagomez", "villapinzon", "villeta", "viota", "yacopi", "zipacon", "zipaquira"],
+    "guainia": ["inirida", "barranco minas", "barranco mina", "mapiripana", "san felipe", "puerto colombia", "la guadalupe", "cacahual", "pana pana", "morichal", "morichal nuevo"],
+    "guaviare": ["san jose del guaviare", "calamar", "el retorno", "miraflores"],
+    "huila": ["neiva", "acevedo", "agrado", "aipe", "algeciras", "altamira", "baraya", "campoalegre", "colombia", "elias", "garzon", "gigante", "guadalupe", "hobo", "iquira", "isnos", "la argentina", "la plata", "nataga", "oporapa", "paicol", "palermo", "palestina", "pital", "pitalito", "rivera", "saladoblanco", "san agustin", "santa maria", "suaza", "tarqui", "tesalia", "tello", "teruel", "timana", "villavieja", "yaguara"],
+    "la guajira": ["riohacha", "albania", "barrancas", "dibulla", "distraccion", "el molino", "fonseca", "hatonuevo", "la jagua del pilar", "maicao", "manaure", "san juan del cesar", "uribia", "urumita", "villanueva"],
+    "magdalena": ["santa marta", "algarrobo", "aracataca", "ariguani", "cerro de san antonio", "chivolo", "cienaga", "concordia", "el banco", "el pinon", "el reten", "fundacion", "guamal", "nueva granada", "pedraza", "pijino del carmen", "pivijay", "plato", "puebloviejo", "remolino", "sabanas de san angel", "salamina", "san sebastian de buenavista", "san zenon", "santa ana", "santa barbara de pinto", "sitionuevo", "tenerife", "zapayan", "zona bananera"],
+    "meta": ["villavicencio", "acacias", "barranca de upia", "cabuyaro", "castilla la nueva", "cubarral", "cumaral", "el calvario", "el castillo", "el dorado", "fuente de oro", "granada", "guamal", "mapiripan", "mesetas", "la macarena", "uribe", "lejanias", "puerto concordia", "puerto gaitan", "puerto lopez", "puerto lleras", "puerto rico", "restrepo", "san carlos de guaroa", "san juan de arama", "san juanito", "san martin", "vistahermosa"],
+    "narino": ["pasto", "alban", "aldana", "ancuya", "arboleda", "barbacoas", "belen", "buesaco", "colon", "consaca", "contadero", "cordoba", "cuaspud", "cumbal", "cumbitara", "chachagui", "el charco", "el penol", "el rosario", "el tablon de gomez", "el tambo", "funes", "guachucal", "guaitarilla", "gualmatan", "iles", "imues", "ipiales", "la cruz", "la florida", "la llanada", "la tola", "la union", "leiva", "linares", "los andes", "magui", "mallama", "mosquera", "narino", "olaya herrera", "ospina", "francisco pizarro", "policarpa", "potosi", "providencia", "puerres", "pupiales", "ricaurte", "roberto payan", "samaniego", "sandona", "san bernardo", "san lorenzo", "san pablo", "san pedro de cartago", "santa barbara", "santacruz", "sapuyes", "taminango", "tangua", "tumaco", "san andres de tumaco", "tuquerres", "yacuanquer"],
+    "norte de santander": ["cucuta", "san jose de cucuta", "abrego", "arboledas", "bochalema", "bucarasica", "cacota", "cachira", "chinacota", "chitaga", "convencion", "cucutilla", "durania", "el carmen", "el tarra", "el zulia", "gramalote", "hacari", "herran", "labateca", "la esperanza", "la playa", "los patios", "lourdes", "mutiscua", "ocana", "pamplona", "pamplonita", "puerto santander", "ragonvalia", "salazar", "san calixto", "san cayetano", "santiago", "sardinata", "silos", "teorama", "tibu", "toledo", "villa caro", "villa del rosario"],
+    "putumayo": ["mocoa", "colon", "orito", "puerto asis", "puerto caicedo", "puerto guzman", "puerto leguizamo", "sibundoy", "san francisco", "san miguel", "santiago", "valle del guamuez", "villagarzon", "villa garzon"],
+    "quindio": ["armenia", "buenavista", "calarca", "circasia", "cordoba", "filandia", "genova", "la tebaida", "montenegro", "pijao", "quimbaya", "salento"],
+    "risaralda": ["pereira", "apia", "balboa", "belen de umbria", "dosquebradas", "guatica", "la celia", "la virginia", "marsella", "mistrato", "pueblo rico", "quinchia", "santa rosa de cabal", "santuario"],
+    "san andres": ["san andres", "providencia", "santa catalina"],
+    "santander": ["bucaramanga", "aguada", "albania", "aratoca", "barbosa", "barichara", "barrancabermeja", "betulia", "bolivar", "cabrera", "california", "capitanejo", "carcasi", "cepita", "cerrito", "charala", "charta", "chima", "chipata", "cimitarra", "concepcion", "confines", "contratacion", "coromoro", "curiti", "el carmen de chucuri", "el guacamayo", "el penon", "el playon", "encino", "enciso", "florian", "floridablanca", "galan", "gambita", "giron", "guaca", "guadalupe", "guapota", "guavata", "guepsa", "hato", "jesus maria", "jordan", "la belleza", "landazuri", "la paz", "lebrija", "los santos", "macaravita", "malaga", "matanza", "mogotes", "molagavita", "ocamonte", "oiba", "onzaga", "palmar", "palmas del socorro", "paramo", "piedecuesta", "pinchote", "puente nacional", "puerto parra", "puerto wilches", "rionegro", "sabana de torres", "san andres", "san benito", "san gil", "san joaquin", "san jose de miranda", "san miguel", "san vicente de chucuri", "santa barbara", "santa helena del opon", "simacota", "socorro", "suaita", "sucre", "surata", "tona", "valle de san jose", "velez", "vetas", "villanueva", "zapatoca"],
+    "sucre": ["sincelejo", "buenavista", "caimito", "coloso", "corozal", "covenas", "chalan", "el roble", "galeras", "guaranda", "la union", "los palmitos", "majagual", "morroa", "ovejas", "palmito", "sampues", "san benito abad", "san juan de betulia", "san marcos", "san onofre", "san pedro", "since", "sucre", "santiago de tolu", "tolu", "tolu viejo", "toluviejo"],
+    "tolima": ["ibague", "alpujarra", "alvarado", "ambalema", "anzoategui", "armero", "armero guayabal", "ataco", "cajamarca", "carmen de apicala", "casabianca", "chaparral", "coello", "coyaima", "cunday", "dolores", "espinal", "el espinal", "falan", "flandes", "fresno", "guamo", "herveo", "honda", "icononzo", "lerida", "libano", "mariquita", "san sebastian de mariquita", "melgar", "murillo", "natagaima", "ortega", "palocabildo", "piedras", "planadas", "prado", "purificacion", "rioblanco", "roncesvalles", "rovira", "saldana", "san antonio", "san luis", "santa isabel", "suarez", "valle de san juan", "venadillo", "villahermosa", "villarrica"],
+    "valle del cauca": ["cali", "santiago de cali", "alcala", "andalucia", "ansermanuevo", "argelia", "bolivar", "buenaventura", "buga", "guadalajara de buga", "bugalagrande", "caicedonia", "calima", "el darien", "candelaria", "cartago", "dagua", "el aguila", "el cairo", "el cerrito", "el dovio", "florida", "ginebra", "guacari", "jamundi", "la cumbre", "la union", "la victoria", "obando", "palmira", "pradera", "restrepo", "riofrio", "roldanillo", "san pedro", "sevilla", "toro", "trujillo", "tulua", "ulloa", "versalles", "vijes", "yotoco", "yumbo", "zarzal"],
+    "vaupes": ["mitu", "caruru", "pacoa", "taraira", "papunahua", "yavarate"],
+    "vichada": ["puerto carreno", "la primavera", "santa rosalia", "cumaribo"],
+}
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from src.shared.prompts import AYUDA_HUMANA_PROMPT
 
 
@@ -9,3 +11,36 @@ def obtener_ayuda_humana():
 def nueva_interaccion_requerida():
     """Utiliza esta función cuando, después de haber resuelto una consulta previa, el usuario indica que tiene una nueva pregunta o necesidad diferente a la anterior."""
     return True
+
+
+def limpiar_datos_agente_comercial(
+    agente_valido: bool,
+    nombre_formateado: Optional[str] = None,
+    email_valido: Optional[str] = None,
+    telefono_valido: Optional[str] = None,
+    razon: Optional[str] = None,
+) -> dict:
+    """
+    Limpia y valida los datos del agente comercial obtenidos de Google Sheets.
+
+    El modelo debe analizar los datos de entrada y llamar a esta función con los resultados.
+
+    Análisis de datos:
+    - Indicadores de agente no válido: Nombres como "SIN RESPONSABLE", "N/A", "NO ASIGNADO". Emails o teléfonos como "N.A", "N/A", "NO DISPONIBLE".
+    - Formato de nombre: Si el nombre está en formato "APELLIDOS NOMBRES", formatearlo a "Nombres Apellidos" (capitalización de título).
+    - Validación de contacto: Verificar que el email y teléfono sean válidos. Si no, devolver un string vacío.
+
+    Args:
+        agente_valido: True si los datos representan un agente válido, False si no.
+        nombre_formateado: Nombre del agente con formato de título (e.g., "Paola Andrea Guerra Cardona"). Solo si es válido.
+        email_valido: Email válido del agente. Solo si es válido.
+        telefono_valido: Teléfono válido del agente. Solo si es válido.
+        razon: Explicación de por qué no es válido. Solo si `agente_valido` es False.
+    """
+    return {
+        "agente_valido": agente_valido,
+        "nombre_formateado": nombre_formateado,
+        "email_valido": email_valido,
+        "telefono_valido": telefono_valido,
+        "razon": razon,
+    }
@@ -1,11 +1,25 @@
+import functools
 import logging
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Awaitable, Callable, Optional, Tuple, Any
 import asyncio
+import random
+import time
 
 import google.genai as genai
 from google.genai import types, errors
 
+from src.config import settings
+from src.services.gemini_guard import (
+    CircuitOpenError,
+    gemini_limiter,
+    get_circuit_breaker,
+    is_overload_error,
+)
 from src.services.google_sheets import GoogleSheetsService
+from src.services.metrics import registry
 from src.shared.constants import (
     GEMINI_MODEL,
     GEMINI_FALLBACK_MODEL,
@@ -16,11 +30,406 @@ from src.shared.prompts import AYUDA_HUMANA_PROMPT, PROMPT_RESUMIDOR
 from src.shared.schemas import InteractionMessage
 from src.shared.state import GlobalState
 from src.shared.tools import obtener_ayuda_humana, nueva_interaccion_requerida
+from src.shared.utils.tool_registry import get_generate_config, get_tool_map
 from src.shared.utils.history import get_genai_history
+from src.shared.utils.streaming import ReplySink, get_reply_sink, split_ready_text
+from src.shared.utils.tool_execution import run_tool
 
 logger = logging.getLogger(__name__)
 
 
+class LatencyTracker:
+    """
+    Keeps the latency of recent successful calls per model and derives the
+    delay after which a hedged request is started.
+    """
+
+    def __init__(
+        self,
+        window: int = settings.GEMINI_LATENCY_WINDOW,
+        min_samples: int = settings.GEMINI_LATENCY_MIN_SAMPLES,
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: dict[str, deque] = {}
+
+    def record(self, model_name: str, latency: float):
+        samples = self._samples.get(model_name)
+        if samples is None:
+            samples = deque(maxlen=self.window)
+            self._samples[model_name] = samples
+        samples.append(latency)
+
+    def percentile(self, model_name: str, percentile: float) -> Optional[float]:
+        """Returns the latency percentile, or None until enough samples exist."""
+        samples = self._samples.get(model_name)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def hedge_delay(self, model_name: str) -> float:
+        observed = self.percentile(model_name, settings.GEMINI_HEDGE_PERCENTILE)
+        if observed is None:
+            return settings.GEMINI_HEDGE_DEFAULT_DELAY
+        return min(
+            max(observed, settings.GEMINI_HEDGE_MIN_DELAY),
+            settings.GEMINI_HEDGE_MAX_DELAY,
+        )
+
+
+model_latency_tracker = LatencyTracker()
+
+
+GEMINI_ATTEMPTS = registry.counter(
+    "gemini_attempts_total",
+    "Gemini API attempts, including retries and hedged requests, by outcome.",
+    ("workflow", "model", "outcome"),
+)
+GEMINI_ATTEMPT_LATENCY = registry.histogram(
+    "gemini_attempt_duration_seconds",
+    "Latency of successful Gemini API attempts.",
+    ("workflow", "model"),
+)
+GEMINI_CALL_LATENCY = registry.histogram(
+    "gemini_call_duration_seconds",
+    "Latency of invoke_model_with_retries, including retries and fallbacks.",
+    ("workflow", "outcome"),
+)
+GEMINI_RETRIES = registry.counter(
+    "gemini_retries_total", "Gemini attempts retried after an overload error.", ("workflow", "model")
+)
+GEMINI_FALLBACKS = registry.counter(
+    "gemini_fallbacks_total", "Gemini calls that moved on to a fallback model.", ("workflow", "model")
+)
+GEMINI_HEDGES = registry.counter(
+    "gemini_hedged_requests_total", "Hedged Gemini requests started.", ("workflow", "model")
+)
+GEMINI_CIRCUIT_SKIPS = registry.counter(
+    "gemini_circuit_open_skips_total",
+    "Gemini calls that skipped a model because its circuit breaker was open.",
+    ("workflow", "model"),
+)
+GEMINI_TOKENS = registry.counter(
+    "gemini_tokens_total", "Tokens reported in Gemini usage metadata.", ("workflow", "model", "kind")
+)
+GEMINI_FINISH_REASONS = registry.counter(
+    "gemini_finish_reasons_total", "Finish reasons of Gemini responses.", ("workflow", "model", "reason")
+)
+
+_USAGE_TOKEN_FIELDS = {
+    "prompt": "prompt_token_count",
+    "candidates": "candidates_token_count",
+    "thoughts": "thoughts_token_count",
+    "cached": "cached_content_token_count",
+    "tool_use_prompt": "tool_use_prompt_token_count",
+    "total": "total_token_count",
+}
+
+_model_call_workflow: ContextVar[Optional[str]] = ContextVar(
+    "model_call_workflow", default=None
+)
+
+
+@contextmanager
+def model_call_label(workflow: str):
+    """
+    Labels the Gemini calls made within the block, including those of tasks
+    created in it, with `workflow`.
+    """
+    token = _model_call_workflow.set(workflow)
+    try:
+        yield
+    finally:
+        _model_call_workflow.reset(token)
+
+
+def labels_model_calls(func: Callable[..., Awaitable[Any]]):
+    """Labels the Gemini calls made by a workflow function with its name."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with model_call_label(func.__name__):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def _record_response_metrics(
+    workflow: str, model_name: str, response: types.GenerateContentResponse
+):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        for kind, field in _USAGE_TOKEN_FIELDS.items():
+            count = getattr(usage, field, None)
+            if count:
+                GEMINI_TOKENS.inc(count, workflow=workflow, model=model_name, kind=kind)
+    for candidate in response.candidates or []:
+        reason = candidate.finish_reason
+        reason = getattr(reason, "value", reason) or "UNSPECIFIED"
+        GEMINI_FINISH_REASONS.inc(workflow=workflow, model=model_name, reason=reason)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given retry (0-based)."""
+    delay = min(
+        settings.GEMINI_RETRY_INITIAL_DELAY
+        * settings.GEMINI_RETRY_BACKOFF_FACTOR ** attempt,
+        settings.GEMINI_RETRY_MAX_DELAY,
+    )
+    jitter = settings.GEMINI_RETRY_JITTER
+    return delay * random.uniform(1 - jitter, 1 + jitter)
+
+
+async def _timed_call(
+    generate_content_func: Callable[..., Awaitable[types.GenerateContentResponse]],
+    args: tuple,
+    kwargs: dict,
+) -> types.GenerateContentResponse:
+    """
+    Runs one attempt within a slot of the shared concurrency limiter and with
+    the per-attempt timeout, and reports its outcome to the limiter, the
+    model's circuit breaker and the latency tracker.
+    """
+    model_name = kwargs["model"]
+    workflow = _model_call_workflow.get() or "unknown"
+    timeout = settings.GEMINI_ATTEMPT_TIMEOUT_SECONDS or None
+    breaker = get_circuit_breaker(model_name)
+    async with gemini_limiter.slot():
+        start = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                generate_content_func(*args, **kwargs), timeout=timeout
+            )
+        except asyncio.CancelledError:
+            GEMINI_ATTEMPTS.inc(workflow=workflow, model=model_name, outcome="cancelled")
+            raise
+        except asyncio.TimeoutError:
+            GEMINI_ATTEMPTS.inc(workflow=workflow, model=model_name, outcome="timeout")
+            gemini_limiter.record(time.monotonic() - start, overloaded=True)
+            breaker.record_failure()
+            # Surface timeouts as server errors so callers handle them like any
+            # other Gemini outage.
+            raise errors.ServerError(
+                504,
+                {
+                    "error": {
+                        "code": 504,
+                        "message": f"Model {model_name} did not answer within {timeout}s.",
+                        "status": "DEADLINE_EXCEEDED",
+                    }
+                },
+            )
+        except errors.APIError as e:
+            overloaded = is_overload_error(e)
+            GEMINI_ATTEMPTS.inc(
+                workflow=workflow,
+                model=model_name,
+                outcome="overloaded" if overloaded else "error",
+            )
+            if overloaded:
+                gemini_limiter.record(time.monotonic() - start, overloaded=True)
+                breaker.record_failure()
+            raise
+
+    latency = time.monotonic() - start
+    gemini_limiter.record(latency)
+    breaker.record_success()
+    model_latency_tracker.record(model_name, latency)
+    GEMINI_ATTEMPTS.inc(workflow=workflow, model=model_name, outcome="success")
+    GEMINI_ATTEMPT_LATENCY.observe(latency, workflow=workflow, model=model_name)
+    _record_response_metrics(workflow, model_name, response)
+    return response
+
+
+async def _call_with_hedging(
+    generate_content_func: Callable[..., Awaitable[types.GenerateContentResponse]],
+    args: tuple,
+    kwargs: dict,
+) -> types.GenerateContentResponse:
+    """
+    Starts a second identical call if the first one has not answered within
+    the hedge delay, returns whichever succeeds first and cancels the other.
+    """
+    model_name = kwargs["model"]
+    if not settings.GEMINI_HEDGING_ENABLED:
+        return await _timed_call(generate_content_func, args, kwargs)
+
+    primary = asyncio.create_task(_timed_call(generate_content_func, args, kwargs))
+    tasks = [primary]
+    try:
+        hedge_delay = model_latency_tracker.hedge_delay(model_name)
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+        if not gemini_limiter.has_capacity:
+            # Hedging while every slot is taken would only add to the overload.
+            return await primary
+
+        logger.info(
+            f"Model {model_name} has not answered after {hedge_delay:.1f}s. Sending a hedged request."
+        )
+        GEMINI_HEDGES.inc(
+            workflow=_model_call_workflow.get() or "unknown", model=model_name
+        )
+        hedge = asyncio.create_task(
+            _timed_call(generate_content_func, args, dict(kwargs))
+        )
+        tasks.append(hedge)
+        pending = set(tasks)
+        first_exception = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        logger.info(f"Hedged request to {model_name} answered first.")
+                    return task.result()
+                first_exception = first_exception or task.exception()
+        raise first_exception
+    finally:
+        # Cancels the slower request, or both if the caller was cancelled.
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def _merge_stream_chunks(
+    chunks: list[types.GenerateContentResponse],
+) -> types.GenerateContentResponse:
+    """
+    Assembles streamed chunks into a single response, joining adjacent text
+    parts of the same kind, so thoughts are never merged into the reply.
+    """
+    parts: list[types.Part] = []
+    finish_reason = None
+    for chunk in chunks:
+        if not chunk.candidates:
+            continue
+        candidate = chunk.candidates[0]
+        finish_reason = candidate.finish_reason or finish_reason
+        if not candidate.content or not candidate.content.parts:
+            continue
+        for part in candidate.content.parts:
+            previous = parts[-1] if parts else None
+            if (
+                part.text is not None
+                and previous is not None
+                and previous.text is not None
+                and bool(previous.thought) == bool(part.thought)
+            ):
+                parts[-1] = previous.model_copy(update={"text": previous.text + part.text})
+            else:
+                parts.append(part)
+
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=parts),
+                finish_reason=finish_reason,
+            )
+        ],
+        usage_metadata=chunks[-1].usage_metadata if chunks else None,
+    )
+
+
+def _streaming_generate_content(
+    client: genai.Client, sink: ReplySink
+) -> Callable[..., Awaitable[types.GenerateContentResponse]]:
+    """
+    Returns a generate_content replacement that streams the response and
+    hands each finished sentence or paragraph to the reply sink while the
+    rest is generated. The trailing text is left for the caller to send.
+    The text of a chunk is only sent once the next chunk shows that no
+    function call follows it, so a reply replaced by a tool's outcome is
+    not delivered. Only one attempt, the first to produce text, may send,
+    so retries and hedged requests never deliver interleaved copies of a
+    reply.
+    """
+    owner = {"attempt": None, "stream_index": None}
+
+    async def generate_content(*, model, contents, config):
+        attempt = object()
+        chunks = []
+        buffer = ""
+        unconfirmed = ""
+        stopped = False
+        stream = await client.aio.models.generate_content_stream(
+            model=model, contents=contents, config=config
+        )
+        async for chunk in stream:
+            chunks.append(chunk)
+            if stopped or not chunk.candidates or not chunk.candidates[0].content:
+                continue
+            text = ""
+            for part in chunk.candidates[0].content.parts or []:
+                if part.function_call:
+                    # The reply may be replaced by the tool's outcome.
+                    stopped = True
+                    break
+                if part.text and not part.thought:
+                    text += part.text
+            if stopped:
+                continue
+            buffer += unconfirmed
+            unconfirmed = text
+
+            first_chunk = owner["attempt"] is not attempt
+            ready = split_ready_text(buffer, first_chunk=first_chunk)
+            if not ready:
+                continue
+            if first_chunk:
+                if owner["attempt"] is not None:
+                    # Another attempt is already delivering this reply.
+                    stopped = True
+                    continue
+                owner["attempt"] = attempt
+                owner["stream_index"] = sink.start_stream()
+            sink.send(owner["stream_index"], buffer[:ready])
+            buffer = buffer[ready:]
+
+        if not chunks:
+            raise errors.ServerError(
+                502,
+                {
+                    "error": {
+                        "code": 502,
+                        "message": f"Model {model} returned an empty stream.",
+                        "status": "UNAVAILABLE",
+                    }
+                },
+            )
+        return _merge_stream_chunks(chunks)
+
+    return generate_content
+
+
+async def generate_content_with_streaming(
+    client: genai.Client,
+    model: str,
+    contents: Any,
+    config: types.GenerateContentConfig,
+) -> types.GenerateContentResponse:
+    """
+    Calls the model like `invoke_model_with_retries` does. When the turn
+    runs inside a reply sink (see src/shared/utils/streaming.py) and
+    streaming is enabled, the response is streamed and its first sentences
+    are delivered to the user before generation finishes. The returned
+    response always holds the full assembled text.
+    """
+    sink = get_reply_sink()
+    if sink is None:
+        generate_content_func = client.aio.models.generate_content
+    else:
+        generate_content_func = _streaming_generate_content(client, sink)
+    return await invoke_model_with_retries(
+        generate_content_func, model=model, contents=contents, config=config
+    )
+
+
 async def invoke_model_with_retries(
     generate_content_func: Callable[..., Awaitable[types.GenerateContentResponse]],
     *args: Any,
@@ -29,10 +438,37 @@ async def invoke_model_with_retries(
     """
     Invokes a Gemini model's generate_content method with retries for server-side errors.
     If the primary model fails, it attempts to use a fallback model.
+    Each attempt has a timeout and, if GEMINI_HEDGING_ENABLED is set, a slow
+    attempt is hedged with a parallel request once it exceeds a percentile
+    of the model's recent latency.
+    Calls share an adaptive concurrency limit, and a model whose circuit
+    breaker is open is skipped; if every model is skipped, CircuitOpenError
+    (a ServerError) is raised so callers escalate to a human. Metrics are
+    labelled with the workflow set by `labels_model_calls` or
+    `model_call_label`.
     """
-    max_retries_per_model: int = 2  # 3 attempts per model
-    initial_delay: float = 1.0
-    backoff_factor: float = 2.0
+    workflow = _model_call_workflow.get() or "unknown"
+    start = time.monotonic()
+    outcome = "error"
+    try:
+        response = await _invoke_model_with_retries(
+            generate_content_func, workflow, *args, **kwargs
+        )
+        outcome = "success"
+        return response
+    finally:
+        GEMINI_CALL_LATENCY.observe(
+            time.monotonic() - start, workflow=workflow, outcome=outcome
+        )
+
+
+async def _invoke_model_with_retries(
+    generate_content_func: Callable[..., Awaitable[types.GenerateContentResponse]],
+    workflow: str,
+    *args: Any,
+    **kwargs: Any,
+) -> types.GenerateContentResponse:
+    max_retries_per_model: int = settings.GEMINI_MAX_RETRIES_PER_MODEL
 
     primary_model = kwargs.get("model", GEMINI_MODEL)
     models_to_try = [primary_model]
@@ -42,21 +478,35 @@ async def invoke_model_with_retries(
     last_exception = None
 
     for model_name in models_to_try:
-        kwargs["model"] = model_name
-        delay = initial_delay
+        attempt_kwargs = {**kwargs, "model": model_name}
         logger.info(f"Attempting to use model: {model_name}")
+        if model_name != primary_model:
+            GEMINI_FALLBACKS.inc(workflow=workflow, model=model_name)
 
+        breaker = get_circuit_breaker(model_name)
         for attempt in range(max_retries_per_model + 1):
-            try:
-                return await generate_content_func(*args, **kwargs)
-            except errors.ServerError as e:
-                last_exception = e
+            if not breaker.allow_request():
                 logger.warning(
-                    f"Server error on attempt {attempt + 1}/{max_retries_per_model + 1} with model {model_name}: {e}. Retrying in {delay}s..."
+                    f"Circuit breaker for model {model_name} is open. Skipping to the next model."
                 )
+                GEMINI_CIRCUIT_SKIPS.inc(workflow=workflow, model=model_name)
+                last_exception = last_exception or CircuitOpenError(model_name)
+                break
+            try:
+                return await _call_with_hedging(
+                    generate_content_func, args, attempt_kwargs
+                )
+            except errors.APIError as e:
+                if not is_overload_error(e):
+                    raise
+                last_exception = e
                 if attempt < max_retries_per_model:
+                    GEMINI_RETRIES.inc(workflow=workflow, model=model_name)
+                    delay = _backoff_delay(attempt)
+                    logger.warning(
+                        f"Server error on attempt {attempt + 1}/{max_retries_per_model + 1} with model {model_name}: {e}. Retrying in {delay:.2f}s..."
+                    )
                     await asyncio.sleep(delay)
-                    delay *= backoff_factor
                 else:
                     logger.error(f"All retries failed for model {model_name}.")
                     break  # Go to the next model
@@ -131,7 +581,7 @@ async def summarize_user_request(user_message: str, client: genai.Client) -> str
             client.aio.models.generate_content,
             model=GEMINI_MODEL,
             contents=prompt,
-            config=types.GenerateContentConfig(temperature=0.0),
+            config=get_generate_config(),
         )
         return get_response_text(response)
     except errors.ServerError as e:
@@ -142,6 +592,7 @@ async def summarize_user_request(user_message: str, client: genai.Client) -> str
         return user_message  # Fallback to original message on error
 
 
+@labels_model_calls
 async def handle_conversation_finished(
     session_id: str,
     history_messages: list[InteractionMessage],
@@ -169,16 +620,14 @@ async def handle_conversation_finished(
 
     genai_history = await get_genai_history(history_messages)
 
-    autopilot_config = types.GenerateContentConfig(
+    autopilot_config = get_generate_config(
+        autopilot_system_prompt,
         tools=[obtener_ayuda_humana, nueva_interaccion_requerida],
-        system_instruction=autopilot_system_prompt,
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
     )
 
     try:
-        response = await invoke_model_with_retries(
-            client.aio.models.generate_content,
+        response = await generate_content_with_streaming(
+            client,
             model=GEMINI_MODEL,
             contents=genai_history,
             config=autopilot_config,
@@ -242,12 +691,8 @@ async def execute_tool_calls_and_get_response(
     Returns the final text response, the results of all tools called, a list of tool call names, and tool arguments.
     """
     genai_history = await get_genai_history(history_messages)
-    config = types.GenerateContentConfig(
-        tools=tools,
-        system_instruction=system_prompt,
-        temperature=0.0,
-        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
-    )
+    config = get_generate_config(system_prompt, tools=tools)
+    tool_map = get_tool_map(tools)
 
     all_tool_results = {}
     all_tool_call_names = []
@@ -288,35 +733,43 @@ async def execute_tool_calls_and_get_response(
         # Add the model's turn (with function calls) to history before executing
         genai_history.append(response.candidates[0].content)
 
-        function_response_parts = []
-
+        calls_to_run = []
         for function_call in response.function_calls:
             tool_name = function_call.name
             tool_args = dict(function_call.args) if function_call.args else {}
             all_tool_args_map[tool_name] = tool_args
-            tool_function = next((t for t in tools if t.__name__ == tool_name), None)
+            tool_function = tool_map.get(tool_name)
 
             if tool_function:
                 logger.info(f"Executing tool: {tool_name} with args: {tool_args}")
-                result = tool_function(**tool_args)
-                all_tool_results[tool_name] = result
-                if tool_name not in all_tool_call_names:
-                    all_tool_call_names.append(tool_name)
-                logger.info(f"Tool {tool_name} returned: {result}")
-
-                # The response must be a dict for from_function_response
-                response_content = result
-                if not isinstance(response_content, dict):
-                    response_content = {"content": result}
-
-                function_response_parts.append(
-                    types.Part.from_function_response(
-                        name=tool_name, response=response_content
-                    )
-                )
+                calls_to_run.append((tool_name, tool_function, tool_args))
             else:
                 logger.warning(f"Tool {tool_name} not found in available tools")
 
+        # Calls from one model turn are independent, so they run concurrently.
+        # run_tool turns a failing call into an error result for that call.
+        results = await asyncio.gather(
+            *(run_tool(tool_function, tool_args) for _, tool_function, tool_args in calls_to_run)
+        )
+
+        function_response_parts = []
+        for (tool_name, _, _), result in zip(calls_to_run, results):
+            all_tool_results[tool_name] = result
+            if tool_name not in all_tool_call_names:
+                all_tool_call_names.append(tool_name)
+            logger.info(f"Tool {tool_name} returned: {result}")
+
+            # The response must be a dict for from_function_response
+            response_content = result
+            if not isinstance(response_content, dict):
+                response_content = {"content": result}
+
+            function_response_parts.append(
+                types.Part.from_function_response(
+                    name=tool_name, response=response_content
+                )
+            )
+
         # Add the tool results to history for the next turn
         if function_response_parts:
             genai_history.append(
@@ -390,14 +843,10 @@ async def get_final_text_response(
 ) -> str:
     """Gets a final text response from the model without tools."""
     genai_history = await get_genai_history(history_messages)
-    config = types.GenerateContentConfig(
-        system_instruction=system_prompt,
-        temperature=0.0,
-    )
+    config = get_generate_config(system_prompt)
     try:
-        response = await invoke_model_with_retries(
-            client.aio.models.generate_content,
-            model=GEMINI_MODEL, contents=genai_history, config=config
+        response = await generate_content_with_streaming(
+            client, model=GEMINI_MODEL, contents=genai_history, config=config
         )
         return get_response_text(response)
     except errors.ServerError as e:
@@ -1,6 +1,7 @@
 import json
 import base64
 
+from cachetools import LRUCache
 from google.genai import types
 from pydantic import ValidationError
 
@@ -8,6 +9,41 @@ from src.shared.enums import InteractionType
 from src.shared.schemas import InteractionMessage
 
 
+# Converted messages keyed by (role, message). Stored messages never change,
+# so a conversation only converts its new messages on each turn and nested
+# workflows handling the same request reuse the same Content objects.
+# The cached objects are shared and must not be mutated.
+_content_cache = LRUCache(maxsize=4096)
+
+
+def _message_to_content(role: InteractionType, message: str) -> types.Content:
+    # Plain text messages are stored as is; multi-part messages as a JSON list.
+    if not message.lstrip().startswith("["):
+        return types.Content(role=role, parts=[types.Part(text=message)])
+    try:
+        parts_data = json.loads(message)
+        for p_data in parts_data:
+            if (
+                "inline_data" in p_data
+                and "data" in p_data["inline_data"]
+                and isinstance(p_data["inline_data"]["data"], str)
+            ):
+                try:
+                    # Attempt to decode if it is a base64 string.
+                    p_data["inline_data"]["data"] = base64.b64decode(
+                        p_data["inline_data"]["data"]
+                    )
+                except (ValueError, TypeError):
+                    # Not a valid base64 string, leave as is.
+                    # model_validate will likely fail later, which is expected.
+                    pass
+
+        parts = [types.Part.model_validate(p) for p in parts_data]
+    except (json.JSONDecodeError, TypeError, ValidationError):
+        parts = [types.Part(text=message)]
+    return types.Content(role=role, parts=parts)
+
+
 async def get_genai_history(
     history_messages: list[InteractionMessage],
 ) -> list[types.Content]:
@@ -23,28 +59,12 @@ async def get_genai_history(
     """
     genai_history = []
     for msg in history_messages:
-        try:
-            parts_data = json.loads(msg.message)
-            for p_data in parts_data:
-                if (
-                    "inline_data" in p_data
-                    and "data" in p_data["inline_data"]
-                    and isinstance(p_data["inline_data"]["data"], str)
-                ):
-                    try:
-                        # Attempt to decode if it is a base64 string.
-                        p_data["inline_data"]["data"] = base64.b64decode(
-                            p_data["inline_data"]["data"]
-                        )
-                    except (ValueError, TypeError):
-                        # Not a valid base64 string, leave as is.
-                        # model_validate will likely fail later, which is expected.
-                        pass
-
-            parts = [types.Part.model_validate(p) for p in parts_data]
-        except (json.JSONDecodeError, TypeError, ValidationError):
-            parts = [types.Part(text=msg.message)]
-        genai_history.append(types.Content(role=msg.role, parts=parts))
+        key = (msg.role, msg.message)
+        content = _content_cache.get(key)
+        if content is None:
+            content = _message_to_content(msg.role, msg.message)
+            _content_cache[key] = content
+        genai_history.append(content)
     return genai_history
 
 
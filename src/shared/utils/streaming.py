@@ -0,0 +1,89 @@
+import logging
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"[.!?…:](?=\s)")
+
+
+class ReplySink:
+    """
+    Receives the parts of a reply that are ready while Gemini is still
+    generating, so they can be delivered before the turn finishes.
+    """
+
+    def __init__(self, send: Callable[[str], None]):
+        self._send = send
+        # The raw text delivered by each streamed response, in order.
+        self._streamed: list[str] = []
+        self._sent = False
+
+    @property
+    def has_sent(self) -> bool:
+        """True once any part of a reply has been delivered."""
+        return self._sent
+
+    def start_stream(self) -> int:
+        self._streamed.append("")
+        return len(self._streamed) - 1
+
+    def send(self, stream_index: int, raw_chunk: str):
+        self._streamed[stream_index] += raw_chunk
+        self._sent = True
+        self._send(raw_chunk.strip())
+
+    def unsent_part(self, message: str) -> str:
+        """
+        Returns the part of a final message that has not been delivered yet.
+        If the message does not start with a streamed text, e.g. because the
+        workflow replaced the model's reply, the whole message is returned.
+        """
+        for index, streamed in enumerate(self._streamed):
+            if streamed and message.lstrip().startswith(streamed.lstrip()):
+                del self._streamed[index]
+                return message.lstrip()[len(streamed.lstrip()):].strip()
+        if any(self._streamed):
+            logger.warning("Final message differs from the streamed reply. Sending it in full.")
+        return message
+
+
+_reply_sink: ContextVar[Optional[ReplySink]] = ContextVar("reply_sink", default=None)
+
+
+@contextmanager
+def reply_sink(send: Callable[[str], None]):
+    """Streams the text replies generated within the block to `send`."""
+    sink = ReplySink(send)
+    token = _reply_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _reply_sink.reset(token)
+
+
+def get_reply_sink() -> Optional[ReplySink]:
+    if not settings.GEMINI_STREAMING_ENABLED:
+        return None
+    return _reply_sink.get()
+
+
+def split_ready_text(buffer: str, first_chunk: bool) -> int:
+    """
+    Returns how many characters at the start of `buffer` can be sent as a
+    message. The first message is cut at a sentence end once it is long
+    enough, later ones only at paragraph breaks, so the reply is not
+    scattered over many short messages. Returns 0 if nothing is ready.
+    """
+    paragraph_end = buffer.rfind("\n\n")
+    if paragraph_end > 0 and buffer[:paragraph_end].strip():
+        return paragraph_end + 2
+    if first_chunk and len(buffer) >= settings.GEMINI_STREAMING_FIRST_CHUNK_MIN_CHARS:
+        sentence_ends = list(_SENTENCE_END.finditer(buffer))
+        if sentence_ends:
+            return sentence_ends[-1].end()
+    return 0
@@ -0,0 +1,69 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable
+
+from src.config import settings
+from src.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+TOOL_KIND_ASYNC = "async"
+TOOL_KIND_SYNC = "sync"
+
+TOOL_CALLS = registry.counter(
+    "tool_calls_total", "Tool calls made by the model, by outcome.", ("tool", "kind", "outcome")
+)
+TOOL_LATENCY = registry.histogram(
+    "tool_duration_seconds", "Time spent running tools.", ("tool", "kind")
+)
+
+
+def get_tool_kind(tool: Callable) -> str:
+    """Returns whether the tool is a coroutine function or a plain function."""
+    if inspect.iscoroutinefunction(tool):
+        return TOOL_KIND_ASYNC
+    return TOOL_KIND_SYNC
+
+
+def _record_timing(tool_name: str, kind: str, elapsed: float, outcome: str):
+    TOOL_CALLS.inc(tool=tool_name, kind=kind, outcome=outcome)
+    TOOL_LATENCY.observe(elapsed, tool=tool_name, kind=kind)
+
+
+async def run_tool(tool: Callable, tool_args: dict) -> Any:
+    """
+    Runs a tool according to its kind: async tools are awaited and sync
+    tools run in the default thread pool, so a blocking tool never stalls
+    the event loop. Both are bounded by TOOL_TIMEOUT_SECONDS; a timed out
+    sync tool keeps its thread until it returns, but its result is dropped.
+
+    A timeout or an exception raised by the tool is returned to the model as
+    an error result instead of raising, so one failing tool does not discard
+    the results of the others called in the same turn.
+    """
+    tool_name = tool.__name__
+    kind = get_tool_kind(tool)
+    start = time.monotonic()
+    try:
+        if kind == TOOL_KIND_ASYNC:
+            call = tool(**tool_args)
+        else:
+            call = asyncio.to_thread(tool, **tool_args)
+        result = await asyncio.wait_for(call, timeout=settings.TOOL_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        elapsed = time.monotonic() - start
+        _record_timing(tool_name, kind, elapsed, "timeout")
+        logger.error(f"Tool {tool_name} timed out after {elapsed:.2f}s.")
+        return {"error": f"La herramienta {tool_name} no respondió a tiempo."}
+    except Exception as e:
+        _record_timing(tool_name, kind, time.monotonic() - start, "error")
+        logger.error(f"Tool {tool_name} failed: {e}", exc_info=True)
+        return {"error": f"La herramienta {tool_name} falló al ejecutarse."}
+
+    elapsed = time.monotonic() - start
+    _record_timing(tool_name, kind, elapsed, "success")
+    logger.info(f"Tool {tool_name} ({kind}) took {elapsed * 1000:.1f} ms.")
+    return result
+
@@ -0,0 +1,79 @@
+import logging
+from typing import Callable, Optional, Sequence
+
+from cachetools import LRUCache
+from google.genai import types
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_API_OPTION = "VERTEX_AI" if settings.GOOGLE_GENAI_USE_VERTEXAI else "GEMINI_API"
+
+# Keyed by code object, so closures a workflow defines on each request
+# share the declaration of their first instance.
+_declarations: dict = {}
+
+# Keyed by (system prompt, tools, temperature). Cached configs are shared
+# between requests and must not be mutated.
+_configs = LRUCache(maxsize=256)
+
+
+def _tool_key(tool: Callable):
+    return getattr(tool, "__code__", tool)
+
+
+def get_function_declaration(tool: Callable) -> types.FunctionDeclaration:
+    """
+    Returns the function declaration of a tool, introspecting its signature
+    and docstring only the first time it is seen.
+    """
+    key = _tool_key(tool)
+    declaration = _declarations.get(key)
+    if declaration is None:
+        declaration = types.FunctionDeclaration.from_callable_with_api_option(
+            callable=tool, api_option=_API_OPTION
+        )
+        _declarations[key] = declaration
+        logger.debug(f"Built function declaration for tool {tool.__name__}.")
+    return declaration
+
+
+def get_generate_config(
+    system_prompt: Optional[str] = None,
+    tools: Sequence[Callable] = (),
+    temperature: Optional[float] = 0.0,
+) -> types.GenerateContentConfig:
+    """
+    Returns the GenerateContentConfig for a system prompt and set of tools.
+    Tools are sent as precomputed declarations with automatic function
+    calling disabled; the config is built once and reused.
+    """
+    key = (system_prompt, tuple(_tool_key(tool) for tool in tools), temperature)
+    config = _configs.get(key)
+    if config is None:
+        config = types.GenerateContentConfig(
+            system_instruction=system_prompt,
+            temperature=temperature,
+        )
+        if tools:
+            config.tools = [
+                types.Tool(
+                    function_declarations=[
+                        get_function_declaration(tool) for tool in tools
+                    ]
+                )
+            ]
+            config.automatic_function_calling = types.AutomaticFunctionCallingConfig(
+                disable=True
+            )
+        _configs[key] = config
+    return config
+
+
+def get_tool_map(tools: Sequence[Callable]) -> dict[str, Callable]:
+    """
+    Maps tool names to callables. Built from the tools of the current call,
+    so per-request closures take the place of the registered declaration.
+    """
+    return {tool.__name__: tool for tool in tools}
@@ -1,44 +1,39 @@
+import re
 import unicodedata
+from typing import Optional
 
+from src.shared.municipalities import COLOMBIAN_MUNICIPALITIES_BY_DEPARTMENT
 from src.shared.prompts import (
     PROMPT_CIUDAD_NO_VALIDA,
     PROMPT_MERCANCIA_NO_TRANSPORTADA,
     PROMPT_SERVICIO_NO_PRESTADO_ULTIMA_MILLA,
 )
 
+BLACKLISTED_CITIES_BY_DEPARTMENT = {
+    "amazonas": ["leticia", "el encanto", "la chorrera", "la pedrera", "la victoria", "miriti-parana", "puerto alegria", "puerto arica", "puerto narino", "puerto santander", "tarapaca"],
+    "arauca": ["arauca", "arauquita", "cravo norte", "fortul", "puerto rondon", "saravena", "tame"],
+    "san andres": ["san andres", "providencia", "santa catalina"],
+    "bolivar": ["altos del rosario", "barranco de loba", "el penon", "regidor", "rio viejo", "san martin de loba", "arenal", "cantagallo", "morales", "san pablo", "santa rosa del sur", "simiti", "montecristo", "pinillos", "san jacinto del cauca", "tiquisio"],
+    "caqueta": ["albania", "belen de los andaquies", "cartagena del chaira", "curillo", "el doncello", "el paujil", "la montanita", "milan", "morelia", "puerto rico", "san jose del fragua", "san vicente del caguan", "solano", "solita", "valparaiso"],
+    "cauca": ["cajibio", "el tambo", "la sierra", "morales", "sotara", "buenos aires", "suarez", "guapi", "lopez", "timbiqui", "inza", "jambalo", "paez", "purace", "silvia", "toribio", "totoro", "almaguer", "argelia", "balboa", "bolivar", "florencia", "la vega", "piamonte", "san sebastian", "santa rosa", "sucre"],
+    "choco": ["atrato", "darien", "pacifico norte", "pacifico sur", "san juan", "bagado", "bahia solano", "nuqui", "alto baudo", "condoto"],
+    "guainia": ["barranco mina", "cacahual", "inirida", "la guadalupe", "mapiripan", "morichal", "pana pana", "puerto colombia", "san felipe"],
+    "guaviare": ["calamar", "el retorno", "miraflores", "san jose del guaviare"],
+    "huila": ["algeciras", "santa maria"],
+    "norte de santander": ["el tarra", "tibu", "cachira", "convencion", "el carmen", "hacari", "la playa", "san calixto", "teorama", "herran", "ragonvalia"],
+    "putumayo": ["colon", "puerto asis", "puerto caicedo", "puerto guzman", "puerto leguizamo", "san francisco", "san miguel", "santiago", "sibundoy", "valle del guamuez", "villa garzon"],
+    "vaupes": ["caruru", "mitu", "pacoa", "papunahua", "taraira", "yavarate"],
+    "vichada": ["cumaribo", "la primavera", "puerto carreno", "santa rosalia"],
+}
+
 BLACKLISTED_CITIES = {
-    # Amazonas
-    "leticia", "el encanto", "la chorrera", "la pedrera", "la victoria", "miriti-parana", "puerto alegria", "puerto arica", "puerto narino", "puerto santander", "tarapaca",
-    # Arauca
-    "arauca", "arauquita", "cravo norte", "fortul", "puerto rondon", "saravena", "tame",
-    # Archipiélago de San Andrés, Providencia y Santa Catalina
-    "san andres", "providencia", "santa catalina",
-    # Bolívar
-    "altos del rosario", "barranco de loba", "el penon", "regidor", "rio viejo", "san martin de loba", "arenal", "cantagallo", "morales", "san pablo", "santa rosa del sur", "simiti", "montecristo", "pinillos", "san jacinto del cauca", "tiquisio",
-    # Caquetá
-    "albania", "belen de los andaquies", "cartagena del chaira", "curillo", "el doncello", "el paujil", "la montanita", "milan", "morelia", "puerto rico", "san jose del fragua", "san vicente del caguan", "solano", "solita", "valparaiso",
-    # Cauca
-    "cajibio", "el tambo", "la sierra", "morales", "sotara", "buenos aires", "suarez", "guapi", "lopez", "timbiqui", "inza", "jambalo", "paez", "purace", "silvia", "toribio", "totoro", "almaguer", "argelia", "balboa", "bolivar", "florencia", "la vega", "piamonte", "san sebastian", "santa rosa", "sucre",
-    # Chocó
-    "atrato", "darien", "pacifico norte", "pacifico sur", "san juan", "bagado", "bahia solano", "nuqui", "alto baudo", "condoto",
-    # Guainía
-    "barranco mina", "cacahual", "inirida", "la guadalupe", "mapiripan", "morichal", "pana pana", "puerto colombia", "san felipe",
-    # Guaviare
-    "calamar", "el retorno", "miraflores", "san jose del guaviare",
-    # Huila
-    "algeciras", "santa maria",
-    # Norte de Santander
-    "el tarra", "tibu", "cachira", "convencion", "el carmen", "hacari", "la playa", "san calixto", "teorama", "herran", "ragonvalia",
-    # Putumayo
-    "colon", "puerto asis", "puerto caicedo", "puerto guzman", "puerto leguizamo", "san francisco", "san miguel", "santiago", "sibundoy", "valle del guamuez", "villa garzon",
-    # Vaupés
-    "caruru", "mitu", "pacoa", "papunahua", "taraira", "yavarate",
-    # Vichada
-    "cumaribo", "la primavera", "puerto carreno", "santa rosalia",
+    city for cities in BLACKLISTED_CITIES_BY_DEPARTMENT.values() for city in cities
 }
 
 def _normalize_text(name: str) -> str:
     """Normalizes a string by removing accents, converting to lowercase, and stripping whitespace."""
+    if name.isascii():
+        return name.lower().strip()
     s = "".join(
         c
         for c in unicodedata.normalize("NFD", name)
@@ -46,11 +41,9 @@ def _normalize_text(name: str) -> str:
     )
     return s.lower().strip()
 
-FORBIDDEN_GOODS_KEYWORDS = {
-    _normalize_text(keyword)
-    for keyword in [
-        # From docstring
-        "ultima milla",
+FORBIDDEN_GOODS_CATEGORIES = {
+    "servicios_excluidos": ["ultima milla"],
+    "materiales_peligrosos": [
         "desechos peligrosos",
         "residuos industriales",
         "sustancias toxicas",
@@ -64,6 +57,8 @@ FORBIDDEN_GOODS_KEYWORDS = {
         "combustibles",
         "gasolina",
         "etanol",
+    ],
+    "seres_vivos_y_productos_animales": [
         "semovientes",
         "animales vivos",
         "animales muertos",
@@ -75,6 +70,8 @@ FORBIDDEN_GOODS_KEYWORDS = {
         "carnes",
         "despojos comestibles",
         "productos de origen animal",
+    ],
+    "objetos_de_valor_excepcional": [
         "objetos de arte",
         "colecciones",
         "antiguedades",
@@ -84,6 +81,8 @@ FORBIDDEN_GOODS_KEYWORDS = {
         "oro",
         "plata",
         "diamantes",
+    ],
+    "productos_perecederos": [
         "legumbres",
         "hortalizas",
         "plantas",
@@ -93,8 +92,9 @@ FORBIDDEN_GOODS_KEYWORDS = {
         "crustaceos",
         "moluscos",
         "invertebrados acuaticos",
-        "armas",
-        "municiones",
+    ],
+    "armamento": ["armas", "municiones"],
+    "hidrocarburos_y_derivados": [
         "aceites crudos de petroleo",
         "minerales bituminosos",
         "alquitranes",
@@ -104,14 +104,351 @@ FORBIDDEN_GOODS_KEYWORDS = {
         "vaselina",
         "parafina",
         "ceras minerales",
+    ],
+    "otros": [
         "navegacion aerea",
         "navegacion espacial",
         "navegacion maritima",
         "navegacion fluvial",
         "energia electrica",
         "gas de hulla",
-    ]
+    ],
+}
+
+FORBIDDEN_GOODS_KEYWORDS = {
+    _normalize_text(keyword)
+    for keywords in FORBIDDEN_GOODS_CATEGORIES.values()
+    for keyword in keywords
+}
+
+_FORBIDDEN_GOODS_KEYWORD_CATEGORIES = {
+    _normalize_text(keyword): category
+    for category, keywords in FORBIDDEN_GOODS_CATEGORIES.items()
+    for keyword in keywords
 }
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _trie_pattern(words: set[str]) -> str:
+    """
+    Builds a regex alternation for `words` factored by common prefixes, so the
+    engine tests each character once instead of once per keyword. Optional
+    tails are greedy, so the longest word at a position is tried first.
+    Spaces match any run of separators.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [
+            (r"[^a-z0-9]+" if char == " " else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        alternation = f"(?:{'|'.join(branches)})"
+        return f"{alternation}?" if "" in node else alternation
+
+    return emit(trie)
+
+
+# Single-pass matcher over every keyword. The keyword itself is captured and
+# the last word may also appear in plural; matching whole words keeps "oro"
+# from matching "decoro" and "aves" from matching "llaves".
+FORBIDDEN_GOODS_PATTERN = re.compile(
+    rf"(?<![a-z0-9])({_trie_pattern(set(_FORBIDDEN_GOODS_KEYWORD_CATEGORIES))})"
+    r"(?:es|s)?(?![a-z0-9])"
+)
+
+
+def find_forbidden_goods(text: str) -> list[tuple[str, str]]:
+    """
+    Finds every forbidden goods keyword in a text with a single scan of
+    FORBIDDEN_GOODS_PATTERN, preferring the longest keyword at each position.
+    Can be used on raw user messages as well as on `tipo_mercancia`.
+
+    Args:
+        text: The text to scan. It is normalized before matching.
+
+    Returns:
+        A list of (category, keyword) tuples in order of appearance.
+    """
+    matches = []
+    for keyword in FORBIDDEN_GOODS_PATTERN.findall(_normalize_text(text)):
+        if keyword not in _FORBIDDEN_GOODS_KEYWORD_CATEGORIES:
+            # Matched across punctuation, e.g. "animales, vivos".
+            keyword = " ".join(_WORD_PATTERN.findall(keyword))
+        matches.append((_FORBIDDEN_GOODS_KEYWORD_CATEGORIES[keyword], keyword))
+    return matches
+
+
+def find_forbidden_goods_categories(text: str) -> list[str]:
+    """Returns the distinct forbidden goods categories mentioned in a text."""
+    return list(dict.fromkeys(category for category, _ in find_forbidden_goods(text)))
+
+
+# Departments of Colombia, used to read inputs such as "Leticia, Amazonas".
+COLOMBIAN_DEPARTMENTS = {
+    "amazonas": "amazonas",
+    "antioquia": "antioquia",
+    "arauca": "arauca",
+    "atlantico": "atlantico",
+    "bogota": "bogota",
+    "bogota dc": "bogota",
+    "bolivar": "bolivar",
+    "boyaca": "boyaca",
+    "caldas": "caldas",
+    "caqueta": "caqueta",
+    "casanare": "casanare",
+    "cauca": "cauca",
+    "cesar": "cesar",
+    "choco": "choco",
+    "cordoba": "cordoba",
+    "cundinamarca": "cundinamarca",
+    "guainia": "guainia",
+    "guaviare": "guaviare",
+    "huila": "huila",
+    "guajira": "la guajira",
+    "la guajira": "la guajira",
+    "magdalena": "magdalena",
+    "meta": "meta",
+    "narino": "narino",
+    "norte de santander": "norte de santander",
+    "putumayo": "putumayo",
+    "quindio": "quindio",
+    "risaralda": "risaralda",
+    "san andres": "san andres",
+    "san andres y providencia": "san andres",
+    "archipielago de san andres": "san andres",
+    "santander": "santander",
+    "sucre": "sucre",
+    "tolima": "tolima",
+    "valle": "valle del cauca",
+    "valle del cauca": "valle del cauca",
+    "vaupes": "vaupes",
+    "vichada": "vichada",
+}
+
+# Departments where every municipality is outside the coverage area, so
+# naming the department alone is enough to reject the request.
+FULLY_BLACKLISTED_DEPARTMENTS = {
+    "amazonas", "arauca", "san andres", "guainia", "guaviare", "vaupes", "vichada",
+}
+
+CITY_ABBREVIATIONS = {
+    "sn": "san",
+    "sta": "santa",
+    "sto": "santo",
+    "pto": "puerto",
+    "pte": "puente",
+    "vlla": "villa",
+}
+
+# Words that introduce a department and carry no meaning for the lookup.
+_CITY_NOISE_WORDS = {"departamento", "depto", "dpto", "del", "de", "isla", "islas"}
+# Dropped only as a trailing country, as "Puerto Colombia" is a municipality.
+_COUNTRY_NAME = "colombia"
+
+
+def _city_tokens(text: str) -> list[str]:
+    tokens = _WORD_PATTERN.findall(_normalize_text(text))
+    return [CITY_ABBREVIATIONS.get(token, token) for token in tokens]
+
+
+def _strip_trailing_noise(tokens: list[str]) -> list[str]:
+    while tokens and tokens[-1] in _CITY_NOISE_WORDS:
+        tokens = tokens[:-1]
+    return tokens
+
+
+def _trigrams(name: str) -> set[str]:
+    padded = f"  {name} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Edit distance between two strings, or max_distance + 1 if it is larger."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b),
+                )
+            )
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def _max_city_distance(name: str) -> int:
+    # Short names are only matched exactly: a one-edit typo of a short name
+    # is too often another word.
+    if len(name) >= 10:
+        return 2
+    if len(name) >= 6:
+        return 1
+    return 0
+
+
+class CityGazetteer:
+    """
+    An index of the blacklisted municipalities keyed by department, with a
+    trigram index for typo-tolerant lookups.
+
+    Every other municipality of Colombia is indexed too. A name that is a
+    municipality is never corrected, and a typo is only read as a
+    blacklisted municipality when no other municipality is as close to it,
+    so "Pácora" or "El Peñol" are not taken for "Pacoa" or "El Peñón".
+    """
+
+    def __init__(
+        self,
+        cities_by_department: dict[str, list[str]],
+        municipalities_by_department: dict[str, list[str]],
+    ):
+        self.departments_by_city: dict[str, set[str]] = {}
+        for department, cities in cities_by_department.items():
+            for city in cities:
+                name = " ".join(_city_tokens(city))
+                self.departments_by_city.setdefault(name, set()).add(department)
+
+        self.municipalities = {
+            " ".join(_city_tokens(municipality))
+            for municipalities in municipalities_by_department.values()
+            for municipality in municipalities
+        }
+        self.municipalities.update(self.departments_by_city)
+
+        self.trigram_index: dict[str, set[str]] = {}
+        for name in self.municipalities:
+            for trigram in _trigrams(name):
+                self.trigram_index.setdefault(trigram, set()).add(name)
+
+        self.department_suffixes = sorted(
+            (tuple(name.split()) for name in COLOMBIAN_DEPARTMENTS),
+            key=len,
+            reverse=True,
+        )
+
+    def find(self, text: str) -> Optional[tuple[str, Optional[str]]]:
+        """
+        Looks up a place mentioned by the user, e.g. "Leticia, Amazonas",
+        "mitú vaupés" or "sn andres".
+
+        Returns:
+            A (municipality, department) tuple if the place is blacklisted, or
+            None. The department is None when only a whole department matched.
+
+        Covered municipalities close to a blacklisted name are not matched:
+
+        >>> [CITY_GAZETTEER.find(name) for name in (
+        ...     "Concepción", "El Peñol", "El Piñón", "Pácora", "Pueblo Rico", "Murillo"
+        ... )]
+        [None, None, None, None, None, None]
+        >>> CITY_GAZETTEER.find("Sn Jose del Guaviarre")
+        ('san jose del guaviare', 'guaviare')
+        """
+        tokens = _strip_trailing_noise(_city_tokens(text))
+        if (
+            len(tokens) > 1
+            and tokens[-1] == _COUNTRY_NAME
+            and " ".join(tokens) not in self.departments_by_city
+        ):
+            tokens = _strip_trailing_noise(tokens[:-1])
+        if not tokens:
+            return None
+
+        for name, department in self._candidates(tokens):
+            match = self._match(name, department)
+            if match:
+                return match
+        return None
+
+    def _candidates(self, tokens: list[str]):
+        """Yields (name, department) readings of the input, most literal first."""
+        yield " ".join(tokens), None
+        for suffix in self.department_suffixes:
+            if len(tokens) > len(suffix) and tuple(tokens[-len(suffix) :]) == suffix:
+                name_tokens = _strip_trailing_noise(tokens[: -len(suffix)])
+                if name_tokens:
+                    department = COLOMBIAN_DEPARTMENTS[" ".join(suffix)]
+                    yield " ".join(name_tokens), department
+                break
+
+    def _match(
+        self, name: str, department: Optional[str]
+    ) -> Optional[tuple[str, Optional[str]]]:
+        departments = self.departments_by_city.get(name)
+        if departments and (department is None or department in departments):
+            return name, department or sorted(departments)[0]
+
+        if department is None:
+            department_name = " ".join(t for t in name.split() if t not in _CITY_NOISE_WORDS)
+            if COLOMBIAN_DEPARTMENTS.get(department_name) in FULLY_BLACKLISTED_DEPARTMENTS:
+                return name, None
+
+        if name in self.municipalities or departments:
+            return None
+
+        max_distance = _max_city_distance(name)
+        if not max_distance:
+            return None
+
+        distances = {}
+        for candidate in self._fuzzy_candidates(name, max_distance):
+            distance = _bounded_levenshtein(name, candidate, max_distance)
+            if distance <= max_distance:
+                distances[candidate] = distance
+
+        best = None
+        for candidate, distance in distances.items():
+            candidate_departments = self.departments_by_city.get(candidate)
+            if not candidate_departments:
+                continue
+            if department is not None and department not in candidate_departments:
+                continue
+            if best is None or distance < best[0]:
+                best = (distance, candidate, department or sorted(candidate_departments)[0])
+        if best is None:
+            return None
+
+        # Another municipality as close to the input makes the typo ambiguous.
+        if any(
+            distance <= best[0] and candidate != best[1]
+            for candidate, distance in distances.items()
+        ):
+            return None
+        return best[1], best[2]
+
+    def _fuzzy_candidates(self, name: str, max_distance: int) -> set[str]:
+        # Each edit changes at most three trigrams, so a candidate within
+        # max_distance shares at least this many trigrams with the input.
+        trigrams = _trigrams(name)
+        min_shared = len(trigrams) - 3 * max_distance
+        counts: dict[str, int] = {}
+        for trigram in trigrams:
+            for candidate in self.trigram_index.get(trigram, ()):
+                counts[candidate] = counts.get(candidate, 0) + 1
+        return {candidate for candidate, count in counts.items() if count >= max(min_shared, 1)}
+
+
+CITY_GAZETTEER = CityGazetteer(
+    BLACKLISTED_CITIES_BY_DEPARTMENT, COLOMBIAN_MUNICIPALITIES_BY_DEPARTMENT
+)
 
 
 def es_mercancia_valida(tipo_mercancia: str) -> bool | str:
@@ -153,16 +490,15 @@ def es_mercancia_valida(tipo_mercancia: str) -> bool | str:
       - Navegación aérea, espacial, marítima o fluvial.
       - Energía eléctrica, gas de hulla.
     """
-    normalized_mercancia = _normalize_text(tipo_mercancia)
+    matches = find_forbidden_goods(tipo_mercancia)
 
-    if "ultima milla" in normalized_mercancia:
+    if any(keyword == "ultima milla" for _, keyword in matches):
         return PROMPT_SERVICIO_NO_PRESTADO_ULTIMA_MILLA
 
-    for keyword in FORBIDDEN_GOODS_KEYWORDS:
-        if keyword in normalized_mercancia:
-            return PROMPT_MERCANCIA_NO_TRANSPORTADA.format(
-                tipo_mercancia=tipo_mercancia
-            )
+    if matches:
+        return PROMPT_MERCANCIA_NO_TRANSPORTADA.format(
+            tipo_mercancia=tipo_mercancia
+        )
 
     return True
 
@@ -190,8 +526,7 @@ def es_ciudad_valida(ciudad: str):
     **Ciudades Colombianas Sin Cobertura:**
     Existe una lista interna de ciudades y municipios en Colombia a los que no se presta servicio. Esta herramienta también valida contra esa lista. No necesitas conocerla, solo llama a la herramienta.
     """
-    normalized_ciudad = _normalize_text(ciudad)
-    if normalized_ciudad in BLACKLISTED_CITIES:
+    if CITY_GAZETTEER.find(ciudad):
         return PROMPT_CIUDAD_NO_VALIDA.format(ciudad=ciudad.title())
     return True
 